@@ -3,6 +3,10 @@ HIPAA-Compliant Audit Logging System for Health Verify Now
 Comprehensive activity tracking and monitoring
 """
 
+import asyncio
+import glob
+import os
+import time
 import uuid
 from datetime import datetime
 from typing import Optional, Dict, Any, List
@@ -10,8 +14,19 @@ import logging
 from enum import Enum
 import json
 
+from bson import json_util
+from pymongo.errors import BulkWriteError
+
 logger = logging.getLogger(__name__)
 
+# Events waiting for the background writer; logging waits for room beyond this
+AUDIT_QUEUE_SIZE = 10000
+AUDIT_BATCH_SIZE = 500
+# How long the writer lets events accumulate before each flush
+AUDIT_FLUSH_INTERVAL = 0.2
+AUDIT_RETRY_SECONDS = 5
+DUPLICATE_KEY_ERROR = 11000
+
 class AuditEventType(str, Enum):
     # Authentication Events
     USER_LOGIN = "user_login"
@@ -66,9 +81,195 @@ class AuditOutcome(str, Enum):
 class HIPAAAuditLogger:
     """HIPAA-compliant audit logging system"""
     
-    def __init__(self, db):
+    def __init__(self, db, wal_path: Optional[str] = None, fsync_each_event: bool = False):
         self.db = db
         self.collection = "audit_logs"
+        # Events are appended here before they are queued, and replayed on start
+        self.wal_path = wal_path
+        self.fsync_each_event = fsync_each_event
+        self._wal = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._capacity: Optional[asyncio.Semaphore] = None
+        self._has_events = asyncio.Event()
+        # Events of a batch that failed to flush, written before anything newer
+        self._retry: List[Dict[str, Any]] = []
+        self._writer: Optional[asyncio.Task] = None
+        self.flushed_events = 0
+    
+    async def start(self):
+        """Replay events left in the write-ahead log, then write new events in the background"""
+        await self.db[self.collection].create_index("id", unique=True)
+        if self.wal_path:
+            await self._replay_wal()
+            self._wal = open(self.wal_path, 'a', encoding='utf-8')
+        self._queue = asyncio.Queue(maxsize=AUDIT_QUEUE_SIZE)
+        self._capacity = asyncio.Semaphore(AUDIT_QUEUE_SIZE)
+        self._writer = asyncio.create_task(self._write_loop())
+        logger.info("Audit log writer started")
+    
+    async def stop(self):
+        """Write out every queued event and stop the background writer"""
+        if not self._writer:
+            return
+        writer, self._writer = self._writer, None
+        writer.cancel()
+        try:
+            await writer
+        except asyncio.CancelledError:
+            pass
+        # Anything the cancelled flush didn't finish is still in its WAL segment
+        records, segment = [], None
+        try:
+            records, segment = self._take_batch()
+            await self._insert_records(records, retry=False)
+            self._remove_segment(segment)
+        except Exception as e:
+            logger.critical(f"AUDIT LOG FAILURE: {len(records)} events left in {segment or 'memory'} at shutdown: {e}")
+        if self._wal:
+            self._wal.close()
+            self._wal = None
+    
+    def stats(self) -> dict:
+        """Writer state for status endpoints"""
+        return {
+            "background_writer": self._writer is not None,
+            "queued_events": (self._queue.qsize() if self._queue else 0) + len(self._retry),
+            "flushed_events": self.flushed_events
+        }
+    
+    async def _record(self, audit_record: Dict[str, Any]):
+        if self._writer is None or self._writer.done() or asyncio.current_task() is self._writer:
+            # Not started or stopped (or an alert raised by the writer's own checks): write inline
+            await self._insert_records([audit_record], retry=False)
+            await self._check_batch([audit_record])
+            return
+        
+        await self._capacity.acquire()
+        # No await between the WAL append and the enqueue, so every segment the
+        # writer seals holds exactly the events it takes from the queue
+        self._append_wal(audit_record)
+        self._queue.put_nowait(audit_record)
+        self._has_events.set()
+    
+    def _append_wal(self, audit_record: Dict[str, Any]):
+        if not self._wal:
+            return
+        self._wal.write(json_util.dumps(audit_record) + "\n")
+        # Flushed to the OS on every event, so a process crash loses nothing;
+        # fsync (power loss) per event only when configured, otherwise per batch
+        self._wal.flush()
+        if self.fsync_each_event:
+            os.fsync(self._wal.fileno())
+    
+    def _take_batch(self):
+        """Every queued event, and the sealed WAL segment holding exactly those events"""
+        records = self._retry + self._take_queued()
+        self._retry = []
+        
+        segment = None
+        if self._wal and records:
+            try:
+                self._wal.flush()
+                os.fsync(self._wal.fileno())
+                self._wal.close()
+                segment = f"{self.wal_path}.{time.time_ns()}"
+                os.replace(self.wal_path, segment)
+            except Exception:
+                # The events stay in the current WAL file and go with the next segment
+                self._retry = records
+                raise
+            finally:
+                if self._wal.closed:
+                    self._wal = open(self.wal_path, 'a', encoding='utf-8')
+        return records, segment
+    
+    def _take_queued(self) -> List[Dict[str, Any]]:
+        records = []
+        while self._queue and not self._queue.empty():
+            records.append(self._queue.get_nowait())
+        for _ in records:
+            self._capacity.release()
+        return records
+    
+    def _remove_segment(self, segment: Optional[str]):
+        if not segment:
+            return
+        try:
+            os.remove(segment)
+        except OSError as e:
+            # Its events are stored; a leftover segment is only replayed (and skipped) on restart
+            logger.error(f"Could not remove audit WAL segment {segment}: {e}")
+    
+    async def _write_loop(self):
+        while True:
+            # Wait for the first event, then give a batch time to accumulate
+            await self._has_events.wait()
+            await asyncio.sleep(AUDIT_FLUSH_INTERVAL)
+            self._has_events.clear()
+            
+            # The writer must outlive any error, or queued events would never drain
+            # and logging would block once the queue filled
+            records = []
+            try:
+                records, segment = self._take_batch()
+                await self._insert_records(records)
+                self._remove_segment(segment)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._requeue(records)
+                logger.critical(f"AUDIT LOG FAILURE: writer error, {len(self._retry)} events kept for retry: {e}")
+                await asyncio.sleep(AUDIT_RETRY_SECONDS)
+                continue
+            await self._check_batch(records)
+    
+    def _requeue(self, records: List[Dict[str, Any]]):
+        """Keep a failed batch for the next flush; it may already be partly stored,
+        which the unique id index tolerates"""
+        self._retry = records + self._retry
+        if self._retry:
+            self._has_events.set()
+    
+    async def _insert_records(self, records: List[Dict[str, Any]], retry: bool = True):
+        """insert_many in batches; ids already written (e.g. by a replay) are skipped"""
+        for start in range(0, len(records), AUDIT_BATCH_SIZE):
+            chunk = records[start:start + AUDIT_BATCH_SIZE]
+            while True:
+                try:
+                    await self.db[self.collection].insert_many(chunk, ordered=False)
+                    break
+                except BulkWriteError as e:
+                    if all(error.get("code") == DUPLICATE_KEY_ERROR for error in e.details.get("writeErrors", [])):
+                        break
+                    if not retry:
+                        raise
+                    logger.critical(f"AUDIT LOG FAILURE: {e} - retrying {len(chunk)} events")
+                except Exception as e:
+                    if not retry:
+                        raise
+                    # Events stay in the WAL segment; keep trying rather than dropping them
+                    logger.critical(f"AUDIT LOG FAILURE: {e} - retrying {len(chunk)} events")
+                await asyncio.sleep(AUDIT_RETRY_SECONDS)
+            self.flushed_events += len(chunk)
+    
+    async def _replay_wal(self):
+        segments = sorted(glob.glob(f"{glob.escape(self.wal_path)}.*"))
+        if os.path.exists(self.wal_path):
+            segments.append(self.wal_path)
+        
+        for segment in segments:
+            records = []
+            with open(segment, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json_util.loads(line))
+                    except ValueError:
+                        # The last line of a crashed write may be incomplete
+                        logger.warning(f"Skipping unreadable audit WAL line in {segment}")
+            await self._insert_records(records, retry=False)
+            os.remove(segment)
+            if records:
+                logger.info(f"Replayed {len(records)} audit events from {segment}")
     
     async def log_event(
         self,
@@ -99,11 +300,8 @@ class HIPAAAuditLogger:
                 "created_at": datetime.utcnow()
             }
             
-            # Store in audit collection
-            await self.db[self.collection].insert_one(audit_record)
-            
-            # Check for suspicious activity
-            await self._check_suspicious_activity(audit_record)
+            # Stored (and checked for suspicious activity) by the background writer
+            await self._record(audit_record)
             
             # Log to system logger for real-time monitoring
             logger.info(f"AUDIT: {event_type.value} - User: {user_id} - Outcome: {outcome.value}")
@@ -215,13 +413,29 @@ class HIPAAAuditLogger:
     
     async def _check_suspicious_activity(self, audit_record: Dict):
         """Check for suspicious activity patterns"""
+        await self._check_batch([audit_record])
+    
+    async def _check_batch(self, audit_records: List[Dict]):
+        """Check a batch of stored events for suspicious activity, once per user and pattern"""
         try:
-            user_id = audit_record.get("user_id")
-            if not user_id:
-                return
+            failed_logins = set()
+            phi_access = {}
+            after_hours = {}
+            for audit_record in audit_records:
+                user_id = audit_record.get("user_id")
+                # Alerts are not checked again, or every after-hours alert would raise another
+                if not user_id or audit_record["event_type"] == AuditEventType.SECURITY_ALERT.value:
+                    continue
+                if audit_record["event_type"] == AuditEventType.LOGIN_FAILED.value:
+                    failed_logins.add(user_id)
+                if audit_record["event_type"] == AuditEventType.PHI_ACCESS.value:
+                    phi_access.setdefault(user_id, audit_record)
+                hour = audit_record["timestamp"].hour
+                if hour < 6 or hour > 22:  # Outside business hours
+                    after_hours.setdefault(user_id, audit_record)
             
             # Check for multiple failed logins
-            if audit_record["event_type"] == AuditEventType.LOGIN_FAILED.value:
+            for user_id in failed_logins:
                 recent_failures = await self._count_recent_failures(user_id)
                 if recent_failures >= 5:
                     await self._trigger_security_alert(
@@ -231,12 +445,11 @@ class HIPAAAuditLogger:
                     )
             
             # Check for unusual access patterns
-            if audit_record["event_type"] == AuditEventType.PHI_ACCESS.value:
+            for user_id, audit_record in phi_access.items():
                 await self._check_unusual_phi_access(user_id, audit_record)
             
             # Check for after-hours access
-            current_hour = datetime.utcnow().hour
-            if current_hour < 6 or current_hour > 22:  # Outside business hours
+            for user_id, audit_record in after_hours.items():
                 await self._trigger_security_alert(
                     "After-hours system access",
                     user_id,
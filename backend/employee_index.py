@@ -0,0 +1,119 @@
+"""
+Employee Name Index for Health Verify Now
+In-memory reverse index of monitored employees for matching exclusion list deltas
+"""
+
+import sys
+import threading
+from typing import AsyncIterable, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+from matching import normalize_name
+
+logger = logging.getLogger(__name__)
+
+class EmployeeNameIndex:
+    """(normalized last, first) name -> employee ids, across all tenants"""
+
+    def __init__(self):
+        self._by_name: Dict[Tuple[str, str], Set[str]] = {}
+        self._lock = threading.Lock()
+        # Inserts that arrive while a rebuild is streaming, replayed onto the new index
+        self._pending: Optional[List[Tuple[str, str, str]]] = None
+        self.ready = False
+        self.employee_count = 0
+
+    @staticmethod
+    def name_key(first_name: Optional[str], last_name: Optional[str]) -> Tuple[str, str]:
+        intern = sys.intern
+        return (intern(normalize_name(last_name)), intern(normalize_name(first_name)))
+
+    def _add(self, by_name: Dict[Tuple[str, str], Set[str]], employee_id: str, first_name: str, last_name: str) -> bool:
+        key = self.name_key(first_name, last_name)
+        if not key[0] or not key[1]:
+            return False
+        ids = by_name.setdefault(key, set())
+        if employee_id in ids:
+            return False
+        ids.add(employee_id)
+        return True
+
+    def add(self, employee_id: str, first_name: Optional[str], last_name: Optional[str]):
+        """Index a newly inserted employee"""
+        with self._lock:
+            if self._add(self._by_name, employee_id, first_name, last_name):
+                self.employee_count += 1
+            if self._pending is not None:
+                self._pending.append((employee_id, first_name, last_name))
+
+    def add_many(self, employees: Iterable[dict]):
+        """Index a batch of inserted employee documents"""
+        for employee in employees:
+            self.add(employee["id"], employee.get("first_name"), employee.get("last_name"))
+
+    def remove_many(self, employees: Iterable[dict]):
+        """Drop deleted employee documents from the index"""
+        with self._lock:
+            removed = {employee["id"] for employee in employees}
+            for employee in employees:
+                key = self.name_key(employee.get("first_name"), employee.get("last_name"))
+                ids = self._by_name.get(key)
+                if ids and employee["id"] in ids:
+                    ids.discard(employee["id"])
+                    self.employee_count -= 1
+                    if not ids:
+                        del self._by_name[key]
+            if self._pending is not None:
+                self._pending = [entry for entry in self._pending if entry[0] not in removed]
+
+    def lookup(self, first_name: Optional[str], last_name: Optional[str]) -> Set[str]:
+        """Employee ids with exactly this normalized name"""
+        with self._lock:
+            return set(self._by_name.get(self.name_key(first_name, last_name), ()))
+
+    def lookup_keys(self, name_keys: Iterable[Tuple[str, str]]) -> Set[str]:
+        """Employee ids under any of the given (last, first) keys"""
+        employee_ids: Set[str] = set()
+        with self._lock:
+            for key in name_keys:
+                employee_ids.update(self._by_name.get(key, ()))
+        return employee_ids
+
+    async def rebuild(self, employees: AsyncIterable[dict]):
+        """Rebuild from a stream of {id, first_name, last_name} documents"""
+        with self._lock:
+            self._pending = []
+
+        by_name: Dict[Tuple[str, str], Set[str]] = {}
+        count = 0
+        try:
+            async for employee in employees:
+                if self._add(by_name, employee["id"], employee.get("first_name"), employee.get("last_name")):
+                    count += 1
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+
+        with self._lock:
+            for employee_id, first_name, last_name in self._pending:
+                if self._add(by_name, employee_id, first_name, last_name):
+                    count += 1
+            self._pending = None
+            self._by_name = by_name
+            self.employee_count = count
+            self.ready = True
+
+        logger.info(f"Built employee name index: {count} employees, {len(by_name)} distinct names")
+
+    def stats(self) -> dict:
+        """Index size for status endpoints"""
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "employees": self.employee_count,
+                "distinct_names": len(self._by_name)
+            }
+
+# Global employee name index instance
+employee_name_index = EmployeeNameIndex()
@@ -0,0 +1,396 @@
+"""
+Shared HTTP Connection Pool for Health Verify Now
+Keep-alive clients per remote host with per-source rate limiting, circuit breakers and hedged GETs
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+import weakref
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 negotiation in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Request budgets per remote source: rate is requests/second, burst is bucket size.
+# hedge_after (seconds) sends a second copy of a slow GET; probe_url is hit while the circuit is open.
+REMOTE_SOURCE_LIMITS = {
+    "sam": {  # SAM.gov keys have daily quotas
+        "rate": 2.0, "burst": 5, "timeout": 15.0,
+        "hedge_after": None, "probe_url": "https://api.sam.gov/exclusions/v4"
+    },
+    "npi": {  # CMS NPI Registry
+        "rate": 10.0, "burst": 20, "timeout": 10.0,
+        "hedge_after": 1.5, "probe_url": "https://npiregistry.cms.hhs.gov/api/?version=2.1"
+    },
+    "fbi": {  # api.fbi.gov is rate limited
+        "rate": 1.0, "burst": 2, "timeout": 15.0,
+        "hedge_after": None, "probe_url": "https://api.fbi.gov/wanted/v1/list?pageSize=1"
+    },
+    "paypal": {  # PayPal REST API, never hedged (calls carry auth tokens and side effects)
+        "rate": 10.0, "burst": 20, "timeout": 30.0,
+        "hedge_after": None, "probe_url": None
+    },
+    "default": {
+        "rate": 5.0, "burst": 10, "timeout": 30.0,
+        "hedge_after": None, "probe_url": None
+    }
+}
+
+CONNECT_TIMEOUT_SECONDS = 5.0
+
+# Scheduling lanes: interactive single-employee checks and bulk batch re-screens.
+# Each lane gets its own share of every source's rate; a source may override with "lane_shares".
+INTERACTIVE_LANE = "interactive"
+BULK_LANE = "bulk"
+_bulk_share = min(max(float(os.environ.get("BULK_LANE_QUOTA_SHARE", "0.6")), 0.05), 0.95)
+LANE_QUOTA_SHARES = {INTERACTIVE_LANE: round(1.0 - _bulk_share, 2), BULK_LANE: _bulk_share}
+
+# Lane of the running task, set by the verification scheduler for bulk work
+current_lane: contextvars.ContextVar = contextvars.ContextVar("current_lane", default=INTERACTIVE_LANE)
+
+# Circuit breaker settings
+CIRCUIT_FAILURE_THRESHOLD = 5       # consecutive failures before the circuit opens
+CIRCUIT_PROBE_INTERVAL_SECONDS = 30.0
+CIRCUIT_PROBE_TIMEOUT_SECONDS = 5.0
+
+# Connection pool sizing per host
+MAX_CONNECTIONS_PER_HOST = 20
+MAX_KEEPALIVE_PER_HOST = 10
+KEEPALIVE_EXPIRY_SECONDS = 30.0
+
+# Upstream 429 handling
+MAX_RATE_LIMIT_RETRIES = 5
+DEFAULT_RETRY_AFTER_SECONDS = 2.0
+MAX_RETRY_AFTER_SECONDS = 60.0
+
+
+class TokenBucket:
+    """Token bucket that queues callers until a token is available"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        # Buckets are shared with the background update thread's event loop
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token and return how long the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._blocked_until - now)
+
+    async def acquire(self):
+        """Wait until the caller may send a request"""
+        delay = self._reserve()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            # A 429 may have paused the bucket while we were queued
+            delay = self._blocked_until - time.monotonic()
+
+    def try_acquire(self, reserve: float = 0.0) -> bool:
+        """Take a token only if one is available right now, leaving `reserve` tokens untouched"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self._tokens < 1 + reserve or self._blocked_until > now:
+                return False
+            self._tokens -= 1
+            return True
+
+    def pause(self, seconds: float):
+        """Hold back every queued and future request for the given time"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a remote source whose circuit is open"""
+
+    def __init__(self, source: str):
+        super().__init__(f"{source} is temporarily unavailable (circuit open)")
+        self.source = source
+
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream errors and probes for recovery in the background"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(self, source: str, probe_url: Optional[str] = None):
+        self.source = source
+        self.probe_url = probe_url
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._next_probe_at = 0.0
+        self._probe_task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    def before_request(self, pool: "HTTPClientPool"):
+        """Raise CircuitOpenError while open, scheduling a recovery probe when due"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            now = time.monotonic()
+            probe_due = now >= self._next_probe_at and (self._probe_task is None or self._probe_task.done())
+            if probe_due:
+                self._next_probe_at = now + CIRCUIT_PROBE_INTERVAL_SECONDS
+
+        if probe_due:
+            if self.probe_url:
+                self._probe_task = asyncio.get_running_loop().create_task(self._probe(pool))
+            else:
+                # No probe endpoint, let this request through as the trial
+                return
+        raise CircuitOpenError(self.source)
+
+    def record_success(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                logger.info(f"Circuit for {self.source} closed, upstream recovered")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.CLOSED and self.consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._next_probe_at = self.opened_at + CIRCUIT_PROBE_INTERVAL_SECONDS
+                logger.warning(f"Circuit for {self.source} opened after {self.consecutive_failures} consecutive failures")
+
+    async def _probe(self, pool: "HTTPClientPool"):
+        """Check upstream health without touching the caller's latency"""
+        try:
+            response = await pool.get_client(self.probe_url).get(self.probe_url, timeout=CIRCUIT_PROBE_TIMEOUT_SECONDS)
+            # Any non-5xx answer (even 401/404) means the upstream is responsive again
+            if response.status_code < 500:
+                self.record_success()
+                return
+            logger.info(f"Probe for {self.source} returned HTTP {response.status_code}, circuit stays open")
+        except Exception as e:
+            logger.info(f"Probe for {self.source} failed ({type(e).__name__}), circuit stays open")
+
+    def status(self) -> dict:
+        """Breaker state for status endpoints"""
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "open_for_seconds": round(time.monotonic() - self.opened_at, 1) if self.opened_at else 0
+            }
+
+
+class HTTPClientPool:
+    """Per-host keep-alive httpx clients shared by all remote source calls"""
+
+    def __init__(self, source_limits: Optional[Dict[str, Dict]] = None, lane_shares: Optional[Dict[str, float]] = None):
+        self.source_limits = source_limits or REMOTE_SOURCE_LIMITS
+        self.lane_shares = lane_shares or LANE_QUOTA_SHARES
+        self._buckets: Dict[tuple, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        # httpx clients are bound to the event loop they were created on
+        self._clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _source_config(self, source: str) -> Dict:
+        return self.source_limits.get(source, self.source_limits["default"])
+
+    def get_bucket(self, source: str, lane: str = INTERACTIVE_LANE) -> TokenBucket:
+        """Get a lane's share of the rate limit for a remote source"""
+        with self._lock:
+            bucket = self._buckets.get((source, lane))
+            if bucket is None:
+                config = self._source_config(source)
+                share = config.get("lane_shares", self.lane_shares)[lane]
+                bucket = TokenBucket(config["rate"] * share, max(1, round(config["burst"] * share)))
+                self._buckets[(source, lane)] = bucket
+            return bucket
+
+    async def _acquire(self, source: str, lane: str, bucket: TokenBucket):
+        """Wait for the lane's quota, borrowing spare tokens from the other lane.
+
+        Interactive calls take any idle bulk token; bulk calls only borrow interactive
+        tokens while that bucket is full, so interactive bursts are always available.
+        """
+        if bucket.try_acquire():
+            return
+        if lane == INTERACTIVE_LANE:
+            if self.get_bucket(source, BULK_LANE).try_acquire():
+                return
+        else:
+            interactive = self.get_bucket(source, INTERACTIVE_LANE)
+            if interactive.try_acquire(reserve=interactive.burst - 1):
+                return
+        await bucket.acquire()
+
+    def _pause_source(self, source: str, seconds: float):
+        """Hold back every lane of a source after an upstream 429"""
+        with self._lock:
+            buckets = [bucket for (bucket_source, _), bucket in self._buckets.items() if bucket_source == source]
+        for bucket in buckets:
+            bucket.pause(seconds)
+
+    def get_breaker(self, source: str) -> CircuitBreaker:
+        """Get the circuit breaker for a remote source"""
+        with self._lock:
+            breaker = self._breakers.get(source)
+            if breaker is None:
+                breaker = CircuitBreaker(source, self._source_config(source).get("probe_url"))
+                self._breakers[source] = breaker
+            return breaker
+
+    def source_status(self) -> Dict[str, dict]:
+        """Circuit breaker state of every source used so far"""
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {source: breaker.status() for source, breaker in breakers.items()}
+
+    def get_client(self, url: str) -> httpx.AsyncClient:
+        """Get the pooled client for the URL's host on the running event loop"""
+        loop = asyncio.get_running_loop()
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+
+        with self._lock:
+            loop_clients = self._clients.setdefault(loop, {})
+            client = loop_clients.get(origin)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    http2=HTTP2_AVAILABLE,
+                    limits=httpx.Limits(
+                        max_connections=MAX_CONNECTIONS_PER_HOST,
+                        max_keepalive_connections=MAX_KEEPALIVE_PER_HOST,
+                        keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS
+                    )
+                )
+                loop_clients[origin] = client
+                logger.info(f"Opened pooled HTTP client for {origin} (HTTP/2: {HTTP2_AVAILABLE})")
+            return client
+
+    async def request(self, source: str, method: str, url: str, hedge: bool = True, **kwargs) -> httpx.Response:
+        """Send a rate-limited request, queueing and retrying on upstream 429s.
+
+        Raises CircuitOpenError without calling the upstream while the source's circuit is open.
+        Idempotent GETs are hedged when the source has hedge_after configured.
+        Quota is charged to the lane of the calling task (see current_lane).
+        """
+        config = self._source_config(source)
+        kwargs.setdefault("timeout", httpx.Timeout(config["timeout"], connect=CONNECT_TIMEOUT_SECONDS))
+        lane = current_lane.get()
+        bucket = self.get_bucket(source, lane)
+        breaker = self.get_breaker(source)
+        hedge_after = config.get("hedge_after") if hedge and method == "GET" else None
+
+        attempt = 0
+        while True:
+            breaker.before_request(self)
+            await self._acquire(source, lane, bucket)
+            try:
+                if hedge_after:
+                    response = await self._send_hedged(bucket, hedge_after, method, url, **kwargs)
+                else:
+                    response = await self.get_client(url).request(method, url, **kwargs)
+            except httpx.TransportError:
+                breaker.record_failure()
+                raise
+
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+            if response.status_code != 429 or attempt >= MAX_RATE_LIMIT_RETRIES:
+                return response
+
+            attempt += 1
+            retry_after = _retry_after_seconds(response, attempt)
+            logger.warning(f"{source} returned HTTP 429, pausing requests for {retry_after:.1f}s (retry {attempt}/{MAX_RATE_LIMIT_RETRIES})")
+            self._pause_source(source, retry_after)
+
+    async def _send_hedged(self, bucket: TokenBucket, hedge_after: float, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a second copy if the first is slow and return whichever answers first"""
+        client = self.get_client(url)
+        pending = {asyncio.ensure_future(client.request(method, url, **kwargs))}
+
+        done, _ = await asyncio.wait(pending, timeout=hedge_after)
+        # Hedges only spend spare quota, never queue behind other callers
+        if not done and bucket.try_acquire():
+            pending.add(asyncio.ensure_future(client.request(method, url, **kwargs)))
+
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def get(self, source: str, url: str, **kwargs) -> httpx.Response:
+        return await self.request(source, "GET", url, **kwargs)
+
+    async def post(self, source: str, url: str, **kwargs) -> httpx.Response:
+        return await self.request(source, "POST", url, **kwargs)
+
+    async def patch(self, source: str, url: str, **kwargs) -> httpx.Response:
+        return await self.request(source, "PATCH", url, **kwargs)
+
+    async def aclose(self):
+        """Close the pooled clients that belong to the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            loop_clients = self._clients.pop(loop, {})
+        for client in loop_clients.values():
+            await client.aclose()
+
+
+def _retry_after_seconds(response: httpx.Response, attempt: int) -> float:
+    """Read Retry-After (seconds or HTTP date), falling back to exponential backoff"""
+    header = response.headers.get("Retry-After")
+    seconds = None
+    if header:
+        try:
+            seconds = float(header)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(header)
+                seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                seconds = None
+    if seconds is None or seconds < 0:
+        seconds = DEFAULT_RETRY_AFTER_SECONDS * (2 ** (attempt - 1))
+    return min(seconds, MAX_RETRY_AFTER_SECONDS)
+
+
+# Global HTTP client pool instance
+http_pool = HTTPClientPool()
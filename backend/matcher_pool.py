@@ -0,0 +1,125 @@
+"""
+Matcher Process Pool for Health Verify Now
+Runs CPU-bound exclusion list parsing and matching in worker processes, off the event loop
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
+
+import matching
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MATCHER_PROCESSES = min(2, os.cpu_count() or 1)
+
+# Snapshot parsers and searches callable by name inside workers
+SNAPSHOT_LOADERS: Dict[str, Callable] = {
+    "oig": matching.parse_oig_file,
+    "medicaid": matching.parse_medicaid_file
+}
+
+SEARCHES: Dict[str, Callable] = {
+    "oig": matching.search_oig,
+    "medicaid": matching.search_medicaid
+}
+
+class StaleSnapshotError(Exception):
+    """The data file on disk no longer matches the snapshot version requested"""
+
+# Per-worker cache: source -> (version, records, name index)
+_worker_snapshots: Dict[str, Tuple[str, list, Optional[dict]]] = {}
+
+def _load_snapshot(source: str, version: str, loader: str, loader_args: tuple):
+    """Parse a source file once per version inside the worker process"""
+    cached = _worker_snapshots.get(source)
+    if cached and cached[0] == version:
+        return cached
+
+    path = loader_args[0]
+    if matching.file_snapshot_version(path) != version:
+        raise StaleSnapshotError(f"{source} file changed since version {version}")
+
+    records = SNAPSHOT_LOADERS[loader](*loader_args)
+    by_name = matching.index_oig_by_name(records) if loader == "oig" else None
+    cached = (version, records, by_name)
+    _worker_snapshots[source] = cached
+    return cached
+
+def _search_in_worker(source: str, version: str, loader: str, loader_args: tuple, search: str, search_args: tuple):
+    _, records, by_name = _load_snapshot(source, version, loader, loader_args)
+    if by_name is not None:
+        return SEARCHES[search](records, *search_args, by_name=by_name)
+    return SEARCHES[search](records, *search_args)
+
+class MatcherPool:
+    """Process pool for matching against file-backed source snapshots.
+
+    Workers load each snapshot from its data file the first time they see a version,
+    so searches only ship the query and the matches between processes. Without a
+    running pool (or if it breaks) work falls back to a thread in this process.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.processes = 0
+
+    def start(self, processes: int = DEFAULT_MATCHER_PROCESSES):
+        """Start the worker processes"""
+        if self._executor is not None or processes <= 0:
+            return
+        self.processes = processes
+        # spawn: the server process runs threads and database clients that must not be forked
+        self._executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+        logger.info(f"Matcher pool started with {processes} worker processes")
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, func: Callable, *args) -> Any:
+        """Run a picklable module-level function in the pool"""
+        if self._executor is None:
+            return await asyncio.to_thread(func, *args)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        except BrokenProcessPool:
+            self._restart()
+            return await asyncio.to_thread(func, *args)
+
+    async def search(self, source: str, version: Optional[str], loader: str, loader_args: tuple,
+                     search: str, search_args: tuple, fallback: Callable[[], Any]) -> Any:
+        """Search a source snapshot in a worker, or run fallback against in-memory data"""
+        if self._executor is None or not version:
+            return await asyncio.to_thread(fallback)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, _search_in_worker, source, version, loader, loader_args, search, search_args
+            )
+        except StaleSnapshotError as e:
+            logger.info(f"{e}, searching the in-memory snapshot")
+        except OSError as e:
+            # The data file was replaced or removed between load and search
+            logger.warning(f"{source} snapshot file unreadable in matcher worker ({e}), searching the in-memory snapshot")
+        except BrokenProcessPool:
+            self._restart()
+        return await asyncio.to_thread(fallback)
+
+    def _restart(self):
+        logger.error("Matcher pool worker died, restarting pool")
+        processes = self.processes
+        self.shutdown()
+        self.start(processes)
+
+    def stats(self) -> dict:
+        """Pool state for status endpoints"""
+        return {"processes": self.processes if self._executor is not None else 0}
+
+# Global matcher pool instance
+matcher_pool = MatcherPool()
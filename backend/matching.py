@@ -0,0 +1,415 @@
+"""
+Exclusion List Matching for Health Verify Now
+Pure file parsing and name-matching functions, safe to run in matcher worker processes
+"""
+
+import csv
+import hashlib
+import os
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+def normalize_name(name):
+    """Normalize a name for comparison"""
+    if not name:
+        return ""
+    return name.strip().upper().replace('.', '').replace(',', '').replace('-', ' ')
+
+# path -> (modification time and size, content digest) of data files versioned in this process
+_file_digests: Dict[str, Tuple[str, str]] = {}
+
+def _file_stamp(path) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+def file_snapshot_version(path) -> str:
+    """Version a downloaded data file by content digest.
+
+    Daily re-downloads rewrite files that are usually byte-identical, so modification
+    time and size only decide whether the cached digest must be recomputed.
+    Blocking on a changed file; run it in a worker thread.
+    """
+    stamp = _file_stamp(path)
+    cached = _file_digests.get(str(path))
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    version = digest.hexdigest()[:16]
+    _file_digests[str(path)] = (stamp, version)
+    return version
+
+def remember_file_version(path, content: bytes) -> str:
+    """Record the version of a file just written with content, without reading it back"""
+    version = hashlib.sha256(content).hexdigest()[:16]
+    _file_digests[str(path)] = (_file_stamp(path), version)
+    return version
+
+def parse_oig_file(path) -> List[Dict[str, Any]]:
+    """Parse the OIG LEIE CSV into normalized exclusion records"""
+    exclusions = []
+    with open(path, mode='r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            exclusions.append({
+                'lastname': row.get('LASTNAME', '').strip().upper(),
+                'firstname': row.get('FIRSTNAME', '').strip().upper(),
+                'midname': row.get('MIDNAME', '').strip().upper(),
+                'busname': row.get('BUSNAME', '').strip().upper(),
+                'general': row.get('GENERAL', '').strip(),
+                'specialty': row.get('SPECIALTY', '').strip(),
+                'upin': row.get('UPIN', '').strip(),
+                'npi': row.get('NPI', '').strip(),
+                'dob': row.get('DOB', '').strip(),
+                'address': row.get('ADDRESS', '').strip(),
+                'city': row.get('CITY', '').strip(),
+                'state': row.get('STATE', '').strip(),
+                'zip': row.get('ZIP', '').strip(),
+                'excltype': row.get('EXCLTYPE', '').strip(),
+                'excldate': row.get('EXCLDATE', '').strip(),
+                'reindate': row.get('REINDATE', '').strip(),
+                'waiverdate': row.get('WAIVERDATE', '').strip(),
+                'wvrstate': row.get('WVRSTATE', '').strip()
+            })
+    return exclusions
+
+def parse_medicaid_file(path, state_code: str, name_fields: List[str], date_fields: List[str]) -> List[Dict[str, Any]]:
+    """Parse a state Medicaid exclusion CSV; each state may use different field names"""
+    exclusions = []
+    with open(path, mode='r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            exclusion = {
+                'state': state_code,
+                'provider_name': '',
+                'first_name': '',
+                'last_name': '',
+                'exclusion_date': '',
+                'exclusion_type': row.get('EXCLUSION_TYPE', '').strip(),
+                'reason': row.get('REASON', '').strip(),
+                'npi': row.get('NPI', '').strip(),
+                'license_number': row.get('LICENSE_NUMBER', '').strip(),
+                'address': row.get('ADDRESS', '').strip(),
+                'city': row.get('CITY', '').strip(),
+                'zip_code': row.get('ZIP', '').strip(),
+                'raw_data': row  # Keep original data for debugging
+            }
+
+            # Extract name from various possible field combinations
+            for field in name_fields:
+                if field in row and row[field]:
+                    name_value = row[field].strip().upper()
+                    if "FIRST" in field or "FNAME" in field:
+                        exclusion['first_name'] = name_value
+                    elif "LAST" in field or "LNAME" in field:
+                        exclusion['last_name'] = name_value
+                    else:
+                        exclusion['provider_name'] = name_value
+
+            for field in date_fields:
+                if field in row and row[field]:
+                    exclusion['exclusion_date'] = row[field].strip()
+                    break
+
+            exclusions.append(exclusion)
+    return exclusions
+
+def _decoded_lines(f, position: list):
+    """Decode a binary file line by line, falling back to Latin-1 per line"""
+    first = position[0] == 0
+    for raw in f:
+        position[0] += len(raw)
+        try:
+            # utf-8-sig drops a byte-order mark from the header line
+            yield raw.decode('utf-8-sig' if first else 'utf-8')
+        except UnicodeDecodeError:
+            yield raw.decode('latin-1')
+        first = False
+
+# Upload column aliases per employee field, in priority order (compared lower-cased and stripped)
+EMPLOYEE_COLUMN_ALIASES = {
+    'first_name': ['first_name', 'firstname', 'first name', 'fname', 'given_name'],
+    'last_name': ['last_name', 'lastname', 'last name', 'lname', 'surname', 'family_name'],
+    'middle_name': ['middle_name', 'middlename', 'middle name', 'mname', 'middle_initial'],
+    'ssn': ['ssn', 'social_security_number', 'social security number', 'social_security', 'ss_number'],
+    'date_of_birth': ['date_of_birth', 'dob', 'birth_date', 'birthdate', 'date of birth'],
+    'email': ['email', 'email_address', 'email address', 'e_mail', 'work_email'],
+    'phone': ['phone', 'phone_number', 'phone number', 'telephone', 'mobile', 'cell'],
+    'license_number': ['license_number', 'license number', 'license_no', 'license', 'professional_license'],
+    'license_type': ['license_type', 'license type', 'license_category', 'profession', 'credential'],
+    'license_state': ['license_state', 'license state', 'state', 'license_jurisdiction']
+}
+
+class EmployeeColumnPlan:
+    """Header -> employee field mapping resolved once per file.
+
+    Each field keeps the column indexes of its aliases in priority order; a row takes
+    the first of them holding a non-blank value.
+    """
+
+    def __init__(self, header: List[str]):
+        self.header = list(header)
+        positions = {}
+        for index, name in enumerate(self.header):
+            # A repeated header name resolves to its last column
+            positions[str(name).lower().strip()] = index
+
+        self.fields: List[Tuple[str, Tuple[int, ...]]] = []
+        self.mapped_columns: Dict[str, str] = {}
+        used = set()
+        for field_name, aliases in EMPLOYEE_COLUMN_ALIASES.items():
+            indexes = tuple(positions[alias] for alias in aliases if alias in positions)
+            if indexes:
+                self.fields.append((field_name, indexes))
+                self.mapped_columns[field_name] = self.header[indexes[0]]
+                used.update(indexes)
+        self.unmatched_columns = [name for index, name in enumerate(self.header) if index not in used and str(name).strip()]
+
+NAME_FIELDS = ('first_name', 'last_name', 'middle_name')
+
+def validate_employee_chunk(plan: EmployeeColumnPlan, rows: List[Sequence[Any]]) -> Tuple[List[Tuple[int, Dict[str, Optional[str]]]], List[Tuple[int, str]]]:
+    """Validate and normalize a chunk of upload rows column by column.
+
+    Returns (position in chunk, employee fields) for accepted rows and (position, reason)
+    for rejected ones. Names get collapsed whitespace, SSNs are formatted XXX-XX-XXXX
+    and dates of birth YYYY-MM-DD. Blocking; run it in a worker thread.
+    """
+    import pandas as pd
+
+    # Ragged rows are padded with missing values
+    frame = pd.DataFrame(rows)
+    missing = pd.Series(pd.NA, index=frame.index, dtype="string")
+
+    # Each field takes the first non-blank value among its alias columns
+    columns = dict(plan.fields)
+    fields = {}
+    for field_name in EMPLOYEE_COLUMN_ALIASES:
+        value = missing
+        for index in columns.get(field_name, ()):
+            if index not in frame.columns:
+                continue
+            column = frame[index].astype("string").str.strip()
+            value = value.fillna(column.mask(column == ""))
+        fields[field_name] = value
+
+    for field_name in NAME_FIELDS:
+        fields[field_name] = fields[field_name].str.replace(r"\s+", " ", regex=True)
+    fields['license_state'] = fields['license_state'].str.upper()
+
+    # Spreadsheet cells may hold the SSN as a number, which drops leading zeros
+    ssn = fields['ssn']
+    ssn_number = ssn.str.replace(r"\.0$", "", regex=True)
+    ssn_digits = ssn_number.str.replace(r"\D", "", regex=True)
+    dropped_zeros = ssn_number.str.fullmatch(r"\d{7,8}").fillna(False).astype(bool)
+    ssn_digits = ssn_digits.mask(dropped_zeros, ssn_digits.str.zfill(9))
+    bad_ssn = ssn.notna() & (ssn_digits.str.len() != 9).fillna(True)
+    fields['ssn'] = ssn_digits.str.slice(0, 3) + "-" + ssn_digits.str.slice(3, 5) + "-" + ssn_digits.str.slice(5)
+
+    date_of_birth = fields['date_of_birth']
+    parsed = pd.to_datetime(date_of_birth, errors="coerce", format="mixed")
+    bad_date = date_of_birth.notna() & (parsed.isna() | (parsed > pd.Timestamp.now()))
+    fields['date_of_birth'] = parsed.dt.strftime("%Y-%m-%d").astype("string")
+
+    # Assigned lowest priority first, so each row reports its most basic problem
+    reasons = pd.Series(None, index=frame.index, dtype=object)
+    reasons = reasons.mask(bad_date, "Invalid date_of_birth: expected a past date")
+    reasons = reasons.mask(bad_ssn, "Invalid SSN: expected 9 digits")
+    reasons = reasons.mask(ssn.isna(), "Missing required field: ssn")
+    reasons = reasons.mask(fields['first_name'].isna() | fields['last_name'].isna(),
+                           "Missing required fields: first_name and last_name")
+
+    rejected = reasons.notna()
+    accepted = ~rejected
+    names = list(fields)
+    values = [fields[name][accepted].astype(object).where(lambda column: column.notna(), None).tolist() for name in names]
+    return (
+        [(position, dict(zip(names, row))) for position, row in zip(frame.index[accepted].tolist(), zip(*values))],
+        list(zip(reasons[rejected].index.tolist(), reasons[rejected].tolist()))
+    )
+
+def iter_employee_row_chunks(path, filename: str, chunk_rows: int = 500, stream: Optional[BinaryIO] = None,
+                             offset: int = 0, header: Optional[List[str]] = None) -> Iterator[Any]:
+    """Stream an uploaded roster.
+
+    Yields the header row first, then (rows, bytes consumed) chunks of at most
+    chunk_rows value sequences in header order. Blank rows are skipped. A CSV can be
+    read from stream instead of path, e.g. while a chunked upload is still arriving.
+    A stream positioned at offset, a row boundary past the header, resumes an earlier
+    parse; its header is passed in and yielded as read.
+    """
+    file_size = os.path.getsize(path)
+
+    if filename.endswith('.csv'):
+        with (stream if stream is not None else open(path, 'rb')) as f:
+            position = [offset]
+            reader = csv.reader(_decoded_lines(f, position))
+            yield header if header is not None else next(reader, [])
+            chunk = []
+            for row in reader:
+                if not any(row):
+                    continue
+                chunk.append(row)
+                if len(chunk) >= chunk_rows:
+                    yield chunk, position[0]
+                    chunk = []
+            if chunk:
+                yield chunk, position[0]
+        return
+
+    if filename.endswith('.xlsx'):
+        yield from _iter_xlsx_row_chunks(path, file_size, chunk_rows)
+        return
+
+    # Legacy .xls has no streaming reader, load it through pandas on demand
+    import pandas as pd
+    df = pd.read_excel(path, dtype=object)
+    yield [str(name) for name in df.columns]
+    rows = df.where(df.notna(), None).values.tolist()
+    for start in range(0, len(rows), chunk_rows):
+        end = min(start + chunk_rows, len(rows))
+        yield rows[start:end], file_size * end // len(rows)
+
+def _iter_xlsx_row_chunks(path, file_size: int, chunk_rows: int) -> Iterator[Any]:
+    """Stream the first worksheet of an .xlsx file with openpyxl's read-only reader"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        yield ["" if name is None else str(name) for name in header or ()]
+        if header is None:
+            return
+        # Declared sheet size, used only to report progress in file bytes
+        total_rows = max((worksheet.max_row or 1) - 1, 1)
+
+        chunk = []
+        row_count = 0
+        for values in rows:
+            row_count += 1
+            if all(value is None or value == "" for value in values):
+                continue
+            chunk.append(values)
+            if len(chunk) >= chunk_rows:
+                yield chunk, min(file_size, file_size * row_count // total_rows)
+                chunk = []
+        if chunk:
+            yield chunk, file_size
+    finally:
+        workbook.close()
+
+def index_oig_by_name(exclusions: List[Dict[str, Any]]) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+    """Group OIG records by (last, first) name; OIG matching requires both to be equal"""
+    by_name: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for exclusion in exclusions:
+        by_name.setdefault((exclusion['lastname'], exclusion['firstname']), []).append(exclusion)
+    return by_name
+
+def search_oig(exclusions, first_name, last_name, middle_name=None,
+               by_name: Optional[Dict[Tuple[str, str], List[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+    """Match a person against OIG exclusion records, highest score first"""
+    matches = []
+
+    # Normalize search terms
+    search_first = normalize_name(first_name)
+    search_last = normalize_name(last_name)
+    search_middle = normalize_name(middle_name) if middle_name else ""
+
+    if by_name is not None:
+        candidates = by_name.get((search_last, search_first), [])
+    else:
+        candidates = [e for e in exclusions if e['firstname'] == search_first and e['lastname'] == search_last]
+
+    for exclusion in candidates:
+        match_score = 100  # Exact first + last name match
+
+        # Check middle name if provided
+        if search_middle and exclusion['midname']:
+            if exclusion['midname'] == search_middle:
+                match_score = 100  # Perfect match
+            elif exclusion['midname'].startswith(search_middle) or search_middle.startswith(exclusion['midname']):
+                match_score = 95   # Partial middle name match
+            else:
+                match_score = 85   # Different middle name
+
+        matches.append({
+            'exclusion': exclusion,
+            'match_score': match_score,
+            'match_type': 'exact_name'
+        })
+
+    # Sort by match score (highest first)
+    matches.sort(key=lambda x: x['match_score'], reverse=True)
+
+    return matches
+
+def search_medicaid(exclusions, state_code, first_name, last_name, middle_name=None) -> List[Dict[str, Any]]:
+    """Match a person against state Medicaid exclusion records, highest score first"""
+    matches = []
+
+    # Normalize search terms
+    search_first = normalize_name(first_name)
+    search_last = normalize_name(last_name)
+    search_middle = normalize_name(middle_name) if middle_name else ""
+
+    for exclusion in exclusions:
+        match_score = 0
+
+        # Method 1: Check individual name fields if available
+        if exclusion['first_name'] and exclusion['last_name']:
+            if (exclusion['first_name'] == search_first and
+                exclusion['last_name'] == search_last):
+
+                match_score = 100  # Exact first + last name match
+
+                # Check middle name if provided
+                if search_middle and exclusion.get('middle_name'):
+                    if exclusion['middle_name'] == search_middle:
+                        match_score = 100  # Perfect match
+                    else:
+                        match_score = 85   # Different middle name
+
+        # Method 2: Check provider name field
+        elif exclusion['provider_name']:
+            full_search_name = f"{search_first} {search_last}"
+            full_search_name_with_middle = f"{search_first} {search_middle} {search_last}" if search_middle else full_search_name
+
+            # Check if our search name is in the provider name
+            if full_search_name in exclusion['provider_name']:
+                match_score = 90
+            elif search_middle and full_search_name_with_middle in exclusion['provider_name']:
+                match_score = 95
+            elif (search_first in exclusion['provider_name'] and
+                  search_last in exclusion['provider_name']):
+                match_score = 80
+
+        # Only include high-confidence matches
+        if match_score >= 80:
+            matches.append({
+                'exclusion': exclusion,
+                'match_score': match_score,
+                'match_type': 'name_match',
+                'state': state_code
+            })
+
+    # Sort by match score (highest first)
+    matches.sort(key=lambda x: x['match_score'], reverse=True)
+
+    return matches
+
+def exclusion_fingerprint(record: Dict[str, Any]) -> str:
+    """Stable digest of an exclusion record's content, used to diff snapshots"""
+    payload = "\x1f".join(f"{key}={record[key]}" for key in sorted(record) if key != 'raw_data')
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=12).hexdigest()
+
+def exclusion_name_keys(record: Dict[str, Any]) -> Set[Tuple[str, str]]:
+    """(last, first) name keys an exclusion record could match an employee under"""
+    first = normalize_name(record.get('firstname') or record.get('first_name'))
+    last = normalize_name(record.get('lastname') or record.get('last_name'))
+    if first and last:
+        return {(last, first)}
+
+    # Single free-text names (state Medicaid provider_name) match on any two of their words
+    tokens = normalize_name(record.get('provider_name') or record.get('exclusion_name')).split()
+    return {(last, first) for last in tokens for first in tokens if last != first}
@@ -0,0 +1,122 @@
+"""
+Local NPPES Index for Health Verify Now
+NPI-keyed provider index with a name secondary index, built from the CMS NPPES dissemination file
+"""
+
+import csv
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from matching import file_snapshot_version, normalize_name
+
+logger = logging.getLogger(__name__)
+
+# NPPES dissemination file columns (npidata_pfile_*.csv)
+NPPES_COLUMNS = {
+    "npi": "NPI",
+    "entity_type": "Entity Type Code",
+    "organization_name": "Provider Organization Name (Legal Business Name)",
+    "last_name": "Provider Last Name (Legal Name)",
+    "first_name": "Provider First Name",
+    "middle_name": "Provider Middle Name",
+    "credential": "Provider Credential Text",
+    "state": "Provider Business Practice Location Address State Name",
+    "taxonomy": "Healthcare Provider Taxonomy Code_1",
+    "enumeration_date": "Provider Enumeration Date",
+    "deactivation_date": "NPI Deactivation Date",
+    "reactivation_date": "NPI Reactivation Date"
+}
+
+# Field order of the compact per-provider tuples kept in memory
+RECORD_FIELDS = (
+    "npi", "entity_type", "first_name", "middle_name", "last_name", "organization_name",
+    "credential", "taxonomy", "state", "enumeration_date", "status"
+)
+
+INDIVIDUAL_ENTITY_TYPE = "1"
+ORGANIZATION_ENTITY_TYPE = "2"
+
+class NPPESIndex:
+    """In-memory NPI index with O(1) lookups by NPI and by (last, first) name"""
+
+    def __init__(self):
+        self._by_npi: Dict[str, tuple] = {}
+        self._by_name: Dict[Tuple[str, str], List[str]] = {}
+        self.version: Optional[str] = None
+        self.source_file: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._by_npi)
+
+    def get(self, npi: str) -> Optional[dict]:
+        """Look up a provider by NPI"""
+        record = self._by_npi.get(npi)
+        return dict(zip(RECORD_FIELDS, record)) if record else None
+
+    def find_by_name(self, first_name: str, last_name: str) -> List[dict]:
+        """Look up individual providers by first and last name normalized with matching.normalize_name"""
+        npis = self._by_name.get((last_name, first_name), [])
+        return [dict(zip(RECORD_FIELDS, self._by_npi[npi])) for npi in npis]
+
+    def load_file(self, path: Path, include_organizations: bool = False) -> int:
+        """Build the index from an NPPES dissemination CSV, streaming row by row"""
+        by_npi: Dict[str, tuple] = {}
+        by_name: Dict[Tuple[str, str], List[str]] = {}
+        intern = sys.intern
+
+        with open(path, mode='r', encoding='utf-8', errors='replace', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            columns = {field: header.index(name) for field, name in NPPES_COLUMNS.items() if name in header}
+            if "npi" not in columns or "entity_type" not in columns:
+                raise ValueError(f"{path} is not an NPPES dissemination file")
+
+            def column(row, field):
+                index = columns.get(field)
+                return row[index].strip() if index is not None and index < len(row) else ""
+
+            for row in reader:
+                npi = column(row, "npi")
+                entity_type = column(row, "entity_type")
+                if not npi:
+                    continue
+                if entity_type != INDIVIDUAL_ENTITY_TYPE and not (include_organizations and entity_type == ORGANIZATION_ENTITY_TYPE):
+                    continue
+
+                deactivated = column(row, "deactivation_date") and not column(row, "reactivation_date")
+                first_name = intern(column(row, "first_name").upper())
+                last_name = intern(column(row, "last_name").upper())
+                # Keyed like the search side, so "SMITH-JONES" and "O.BRIEN" can match
+                name_key = (intern(normalize_name(last_name)), intern(normalize_name(first_name)))
+
+                by_npi[npi] = (
+                    npi,
+                    "Individual" if entity_type == INDIVIDUAL_ENTITY_TYPE else "Organization",
+                    first_name,
+                    intern(column(row, "middle_name").upper()),
+                    last_name,
+                    column(row, "organization_name").upper(),
+                    intern(column(row, "credential")),
+                    intern(column(row, "taxonomy")),
+                    intern(column(row, "state")),
+                    column(row, "enumeration_date"),
+                    "Deactivated" if deactivated else "Active"
+                )
+
+                if name_key[0] and name_key[1]:
+                    by_name.setdefault(name_key, []).append(npi)
+
+        version = file_snapshot_version(path)
+        # Swap in the finished index so readers never see a partial build
+        self._by_npi = by_npi
+        self._by_name = by_name
+        self.version = version
+        self.source_file = str(path)
+
+        logger.info(f"Built NPPES index from {path}: {len(by_npi)} providers, {len(by_name)} distinct names")
+        return len(by_npi)
+
+# Global NPPES index instance
+npi_index = NPPESIndex()
@@ -1,4 +1,3 @@
-import httpx
 import os
 import json
 import base64
@@ -6,6 +5,8 @@ from typing import Dict, Optional
 import logging
 from datetime import datetime, timedelta
 
+from http_pool import http_pool
+
 logger = logging.getLogger(__name__)
 
 class PayPalClient:
@@ -34,22 +35,22 @@ class PayPalClient:
 
         data = "grant_type=client_credentials"
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/v1/oauth2/token",
-                headers=headers,
-                content=data
-            )
-
-            if response.status_code == 200:
-                token_data = response.json()
-                self.access_token = token_data['access_token']
-                expires_in = token_data.get('expires_in', 3600)
-                self.token_expires_at = datetime.utcnow() + timedelta(seconds=expires_in - 60)
-                return self.access_token
-            else:
-                logger.error(f"Failed to get PayPal access token: {response.text}")
-                raise Exception("Failed to authenticate with PayPal")
+        response = await http_pool.post(
+            "paypal",
+            f"{self.base_url}/v1/oauth2/token",
+            headers=headers,
+            content=data
+        )
+
+        if response.status_code == 200:
+            token_data = response.json()
+            self.access_token = token_data['access_token']
+            expires_in = token_data.get('expires_in', 3600)
+            self.token_expires_at = datetime.utcnow() + timedelta(seconds=expires_in - 60)
+            return self.access_token
+        else:
+            logger.error(f"Failed to get PayPal access token: {response.text}")
+            raise Exception("Failed to authenticate with PayPal")
 
     async def create_product(self, name: str, description: str) -> str:
         """Create a PayPal product for subscriptions"""
@@ -68,18 +69,18 @@ class PayPalClient:
             "category": "SOFTWARE"
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/v1/catalogs/products",
-                headers=headers,
-                json=product_data
-            )
+        response = await http_pool.post(
+            "paypal",
+            f"{self.base_url}/v1/catalogs/products",
+            headers=headers,
+            json=product_data
+        )
 
-            if response.status_code == 201:
-                return response.json()['id']
-            else:
-                logger.error(f"Failed to create PayPal product: {response.text}")
-                raise Exception("Failed to create PayPal product")
+        if response.status_code == 201:
+            return response.json()['id']
+        else:
+            logger.error(f"Failed to create PayPal product: {response.text}")
+            raise Exception("Failed to create PayPal product")
 
     async def create_subscription_plan(self, product_id: str, plan_name: str, price_per_employee: float) -> str:
         """Create a PayPal subscription plan"""
@@ -124,18 +125,18 @@ class PayPalClient:
             }
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/v1/billing/plans",
-                headers=headers,
-                json=plan_data
-            )
+        response = await http_pool.post(
+            "paypal",
+            f"{self.base_url}/v1/billing/plans",
+            headers=headers,
+            json=plan_data
+        )
 
-            if response.status_code == 201:
-                return response.json()['id']
-            else:
-                logger.error(f"Failed to create PayPal subscription plan: {response.text}")
-                raise Exception("Failed to create PayPal subscription plan")
+        if response.status_code == 201:
+            return response.json()['id']
+        else:
+            logger.error(f"Failed to create PayPal subscription plan: {response.text}")
+            raise Exception("Failed to create PayPal subscription plan")
 
     async def create_subscription(self, plan_id: str, employee_count: int, monthly_cost: float, user_email: str) -> Dict:
         """Create a PayPal subscription"""
@@ -172,30 +173,30 @@ class PayPalClient:
             }
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/v1/billing/subscriptions",
-                headers=headers,
-                json=subscription_data
-            )
-
-            if response.status_code == 201:
-                subscription = response.json()
-                # Find approval URL
-                approval_url = None
-                for link in subscription.get('links', []):
-                    if link.get('rel') == 'approve':
-                        approval_url = link.get('href')
-                        break
-                
-                return {
-                    'subscription_id': subscription['id'],
-                    'approval_url': approval_url,
-                    'status': subscription.get('status')
-                }
-            else:
-                logger.error(f"Failed to create PayPal subscription: {response.text}")
-                raise Exception("Failed to create PayPal subscription")
+        response = await http_pool.post(
+            "paypal",
+            f"{self.base_url}/v1/billing/subscriptions",
+            headers=headers,
+            json=subscription_data
+        )
+
+        if response.status_code == 201:
+            subscription = response.json()
+            # Find approval URL
+            approval_url = None
+            for link in subscription.get('links', []):
+                if link.get('rel') == 'approve':
+                    approval_url = link.get('href')
+                    break
+            
+            return {
+                'subscription_id': subscription['id'],
+                'approval_url': approval_url,
+                'status': subscription.get('status')
+            }
+        else:
+            logger.error(f"Failed to create PayPal subscription: {response.text}")
+            raise Exception("Failed to create PayPal subscription")
 
     async def get_subscription(self, subscription_id: str) -> Dict:
         """Get PayPal subscription details"""
@@ -206,17 +207,17 @@ class PayPalClient:
             'Authorization': f'Bearer {access_token}'
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/v1/billing/subscriptions/{subscription_id}",
-                headers=headers
-            )
+        response = await http_pool.get(
+            "paypal",
+            f"{self.base_url}/v1/billing/subscriptions/{subscription_id}",
+            headers=headers
+        )
 
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logger.error(f"Failed to get PayPal subscription: {response.text}")
-                return {}
+        if response.status_code == 200:
+            return response.json()
+        else:
+            logger.error(f"Failed to get PayPal subscription: {response.text}")
+            return {}
 
     async def cancel_subscription(self, subscription_id: str, reason: str = "Customer requested cancellation") -> bool:
         """Cancel a PayPal subscription"""
@@ -231,14 +232,14 @@ class PayPalClient:
             "reason": reason
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/v1/billing/subscriptions/{subscription_id}/cancel",
-                headers=headers,
-                json=cancel_data
-            )
+        response = await http_pool.post(
+            "paypal",
+            f"{self.base_url}/v1/billing/subscriptions/{subscription_id}/cancel",
+            headers=headers,
+            json=cancel_data
+        )
 
-            return response.status_code == 204
+        return response.status_code == 204
 
     async def update_subscription_quantity(self, subscription_id: str, new_employee_count: int) -> bool:
         """Update subscription quantity (employee count)"""
@@ -253,14 +254,14 @@ class PayPalClient:
             "quantity": str(new_employee_count)
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(
-                f"{self.base_url}/v1/billing/subscriptions/{subscription_id}",
-                headers=headers,
-                json=update_data
-            )
+        response = await http_pool.patch(
+            "paypal",
+            f"{self.base_url}/v1/billing/subscriptions/{subscription_id}",
+            headers=headers,
+            json=update_data
+        )
 
-            return response.status_code == 200
+        return response.status_code == 200
 
 # Global PayPal client instance
 paypal_client = PayPalClient()
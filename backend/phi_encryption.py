@@ -4,30 +4,77 @@ Implements field-level encryption for PHI data
 """
 
 import base64
+import hashlib
+import hmac
 import os
-from cryptography.fernet import Fernet
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import logging
 
 logger = logging.getLogger(__name__)
 
+PHI_FIELDS = ('ssn', 'date_of_birth', 'phone', 'email')
+
+# Use a fixed salt for consistency (in production, use per-customer salts)
+DEFAULT_SALT = b'health_verify_now_salt_2025'
+
+# Each derivation runs 100k PBKDF2 iterations, so derived keys are kept per salt
+MAX_CACHED_KEYS = 128
+
+# Legacy values are base64 of a Fernet token, and every Fernet token starts with "gAAAAA"
+LEGACY_PREFIX = "Z0FBQUFB"
+
+# Current values are binary: format version, key id length, key id, nonce, AES-GCM ciphertext and tag
+FORMAT_VERSION = 1
+NONCE_SIZE = 12
+
+# PHI_MASTER_KEY is named by PHI_KEY_ID; retired keys stay readable through PHI_PREVIOUS_KEYS,
+# listed oldest first as "id:secret,id:secret"
+DEFAULT_KEY_ID = "k1"
+
+# Set on each document to the key id its PHI values are encrypted under
+KEY_ID_FIELD = "phi_key_id"
+
+# Keyed HMAC of each PHI field is stored as "<field>_bidx" for equality lookups
+BLIND_INDEX_SUFFIX = "_bidx"
+
+# Documents per task when a batch is spread over the crypto threads
+BATCH_SLICE_SIZE = 256
+
 class PHIEncryption:
     """HIPAA-compliant encryption for PHI data"""
-    
+
     def __init__(self):
         self.master_key = os.environ.get('PHI_MASTER_KEY')
         if not self.master_key:
             raise ValueError("PHI_MASTER_KEY environment variable not set")
-        
-        # Generate encryption key from master key
-        self.key = self._derive_key(self.master_key.encode())
-        self.cipher = Fernet(self.key)
-    
-    def _derive_key(self, password: bytes) -> bytes:
+
+        # Blind indexes and identity keys must outlive every encryption key, so they
+        # have their own secret rather than one that rotation could retire
+        self.blind_index_secret = os.environ.get('PHI_BLIND_INDEX_KEY')
+        if not self.blind_index_secret:
+            raise ValueError("PHI_BLIND_INDEX_KEY environment variable not set")
+
+        self.key_id = os.environ.get('PHI_KEY_ID', DEFAULT_KEY_ID)
+        self.keyring = self._load_keyring(self.key_id, self.master_key, os.environ.get('PHI_PREVIOUS_KEYS', ''))
+
+        # Keys are derived on first use rather than at import
+        self._keys: "OrderedDict[Tuple[str, bytes], DerivedKeys]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._blind_index_key: Optional[bytes] = None
+
+    def _derive_key(self, password: bytes, salt: bytes = DEFAULT_SALT) -> bytes:
         """Derive encryption key from master password"""
-        # Use a fixed salt for consistency (in production, use per-customer salts)
-        salt = b'health_verify_now_salt_2025'
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
             length=32,
@@ -36,53 +83,291 @@ class PHIEncryption:
         )
         key = base64.urlsafe_b64encode(kdf.derive(password))
         return key
-    
-    def encrypt_field(self, data: str) -> str:
-        """Encrypt a single field of PHI data"""
+
+    @staticmethod
+    def _load_keyring(key_id: str, master_key: str, previous_keys: str) -> "OrderedDict[str, str]":
+        keyring: "OrderedDict[str, str]" = OrderedDict()
+        for entry in filter(None, (part.strip() for part in previous_keys.split(','))):
+            previous_id, separator, secret = entry.partition(':')
+            if not separator or not previous_id or not secret:
+                raise ValueError("PHI_PREVIOUS_KEYS entries must look like id:secret")
+            keyring[previous_id] = secret
+        if not key_id or len(key_id.encode('ascii')) > 255:
+            raise ValueError("PHI_KEY_ID must be 1 to 255 ASCII characters")
+        if keyring.get(key_id, master_key) != master_key:
+            raise ValueError(f"PHI key id {key_id!r} is already used by a previous key")
+        keyring.pop(key_id, None)
+        keyring[key_id] = master_key
+        return keyring
+
+    def keys_for(self, salt: bytes = DEFAULT_SALT, key_id: Optional[str] = None) -> "DerivedKeys":
+        """Ciphers for a salt (e.g. a tenant's) under a key id (the current key by default),
+        deriving them once and keeping the most recent"""
+        key_id = key_id or self.key_id
+        if key_id not in self.keyring:
+            raise ValueError(f"Unknown PHI key id {key_id!r}")
+
+        cache_key = (key_id, salt)
+        with self._lock:
+            keys = self._keys.get(cache_key)
+            if keys is not None:
+                self._keys.move_to_end(cache_key)
+                return keys
+
+        # Derive outside the lock so one slow derivation doesn't stall other tenants
+        keys = DerivedKeys(key_id, salt, base64.urlsafe_b64decode(self._derive_key(self.keyring[key_id].encode(), salt)))
+        with self._lock:
+            self._keys[cache_key] = keys
+            self._keys.move_to_end(cache_key)
+            while len(self._keys) > MAX_CACHED_KEYS:
+                self._keys.popitem(last=False)
+        return keys
+
+    @property
+    def cipher(self) -> Fernet:
+        return self.keys_for().fernet
+
+    @property
+    def blind_index_key(self) -> bytes:
+        """HMAC key for blind indexes, from PHI_BLIND_INDEX_KEY.
+
+        It does not follow key rotation: blind indexes and identity keys stay valid without
+        being recomputed, and any encryption key can be retired.
+        """
+        if self._blind_index_key is None:
+            self._blind_index_key = HKDF(
+                algorithm=hashes.SHA256(),
+                length=32,
+                salt=None,
+                info=b'health_verify_now_phi_blind_index',
+            ).derive(self.blind_index_secret.encode())
+        return self._blind_index_key
+
+    @staticmethod
+    def _blind_index_value(field: str, value: str) -> str:
+        # Formatting differences must not change the index
+        if field in ('ssn', 'phone'):
+            return re.sub(r"\D", "", value)
+        return value.strip().lower()
+
+    def blind_index(self, field: str, value: Optional[str]) -> Optional[str]:
+        """Keyed HMAC of a PHI value for equality lookups without decrypting"""
+        normalized = self._blind_index_value(field, str(value)) if value else ""
+        if not normalized:
+            return None
+        return hmac.new(self.blind_index_key, f"{field}:{normalized}".encode('utf-8'), hashlib.sha256).hexdigest()
+
+    def keyed_digest(self, payload: str) -> str:
+        """Keyed HMAC of arbitrary text, for lookup keys derived from PHI"""
+        return hmac.new(self.blind_index_key, payload.encode('utf-8'), hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def is_legacy(value) -> bool:
+        """Whether a stored value is in the legacy base64 Fernet format"""
+        return isinstance(value, str) and value.startswith(LEGACY_PREFIX)
+
+    @classmethod
+    def is_encrypted(cls, value) -> bool:
+        """Whether a stored value is ciphertext rather than plaintext written before encryption"""
+        return (isinstance(value, bytes) and value[:1] == bytes([FORMAT_VERSION])) or cls.is_legacy(value)
+
+    @staticmethod
+    def key_id_of(value) -> Optional[str]:
+        """Key id a compact binary value was encrypted under (None for other values)"""
+        if not isinstance(value, bytes) or value[:1] != bytes([FORMAT_VERSION]):
+            return None
+        return value[2:2 + value[1]].decode('ascii')
+
+    def encrypt_field(self, data: str, keys: Optional["DerivedKeys"] = None) -> bytes:
+        """Encrypt a single field of PHI data into the compact binary format"""
         if not data:
             return data
-        
+
         try:
-            encrypted = self.cipher.encrypt(data.encode('utf-8'))
-            return base64.urlsafe_b64encode(encrypted).decode('utf-8')
+            keys = keys or self.keys_for()
+            nonce = os.urandom(NONCE_SIZE)
+            key_id = keys.key_id.encode('ascii')
+            ciphertext = keys.aead.encrypt(nonce, data.encode('utf-8'), None)
+            return bytes([FORMAT_VERSION, len(key_id)]) + key_id + nonce + ciphertext
         except Exception as e:
             logger.error(f"Encryption failed: {e}")
             raise
-    
-    def decrypt_field(self, encrypted_data: str) -> str:
-        """Decrypt a single field of PHI data"""
-        if not encrypted_data:
+
+    def decrypt_field(self, encrypted_data, keys: Optional["DerivedKeys"] = None, salt: bytes = DEFAULT_SALT) -> str:
+        """Decrypt a single field of PHI data in either format under any key in the keyring;
+        plaintext values are returned unchanged"""
+        if not encrypted_data or not self.is_encrypted(encrypted_data):
             return encrypted_data
-        
+
+        keys = keys or self.keys_for(salt)
         try:
-            decoded = base64.urlsafe_b64decode(encrypted_data.encode('utf-8'))
-            decrypted = self.cipher.decrypt(decoded)
-            return decrypted.decode('utf-8')
+            if self.is_legacy(encrypted_data):
+                return self._decrypt_legacy(encrypted_data, keys, salt)
+
+            key_id_end = 2 + encrypted_data[1]
+            key_id = encrypted_data[2:key_id_end].decode('ascii')
+            if key_id != keys.key_id:
+                # Written before (or during) a key rotation
+                keys = self.keys_for(salt, key_id)
+            nonce = encrypted_data[key_id_end:key_id_end + NONCE_SIZE]
+            return keys.aead.decrypt(nonce, encrypted_data[key_id_end + NONCE_SIZE:], None).decode('utf-8')
         except Exception as e:
             logger.error(f"Decryption failed: {e}")
             raise
-    
-    def encrypt_employee_phi(self, employee_data: dict) -> dict:
+
+    def _decrypt_legacy(self, encrypted_data: str, keys: "DerivedKeys", salt: bytes) -> str:
+        # Legacy tokens don't name their key, so try the given key and then the rest, newest first
+        token = base64.urlsafe_b64decode(encrypted_data.encode('utf-8'))
+        try:
+            return keys.fernet.decrypt(token).decode('utf-8')
+        except InvalidToken:
+            for key_id in reversed(self.keyring):
+                if key_id == keys.key_id:
+                    continue
+                try:
+                    return self.keys_for(salt, key_id).fernet.decrypt(token).decode('utf-8')
+                except InvalidToken:
+                    pass
+            raise
+
+    def encrypt_employee_phi(self, employee_data: dict, salt: bytes = DEFAULT_SALT) -> dict:
         """Encrypt PHI fields in employee data"""
-        phi_fields = ['ssn', 'date_of_birth', 'phone', 'email']
+        return self._encrypt_document(employee_data, self.keys_for(salt))
+
+    def decrypt_employee_phi(self, encrypted_data: dict, salt: bytes = DEFAULT_SALT) -> dict:
+        """Decrypt PHI fields in employee data"""
+        return self._decrypt_document(encrypted_data, self.keys_for(salt))
+
+    def _encrypt_document(self, employee_data: dict, keys: "DerivedKeys") -> dict:
         encrypted_data = employee_data.copy()
-        
-        for field in phi_fields:
-            if field in encrypted_data and encrypted_data[field]:
-                encrypted_data[field] = self.encrypt_field(str(encrypted_data[field]))
-        
+
+        for field in PHI_FIELDS:
+            if field in encrypted_data and encrypted_data[field] and not self.is_encrypted(encrypted_data[field]):
+                value = str(encrypted_data[field])
+                encrypted_data[field] = self.encrypt_field(value, keys)
+                encrypted_data[field + BLIND_INDEX_SUFFIX] = self.blind_index(field, value)
+        encrypted_data[KEY_ID_FIELD] = keys.key_id
+
         return encrypted_data
-    
-    def decrypt_employee_phi(self, encrypted_data: dict) -> dict:
-        """Decrypt PHI fields in employee data"""
-        phi_fields = ['ssn', 'date_of_birth', 'phone', 'email']
+
+    def _decrypt_document(self, encrypted_data: dict, keys: "DerivedKeys") -> dict:
         decrypted_data = encrypted_data.copy()
-        
-        for field in phi_fields:
+        decrypted_data.pop(KEY_ID_FIELD, None)
+
+        for field in PHI_FIELDS:
             if field in decrypted_data and decrypted_data[field]:
-                decrypted_data[field] = self.decrypt_field(encrypted_data[field])
-        
+                decrypted_data[field] = self.decrypt_field(encrypted_data[field], keys, keys.salt)
+
         return decrypted_data
 
+    def _migrate_document(self, employee_data: dict, keys: "DerivedKeys") -> Dict[str, Any]:
+        updates = {}
+        for field in PHI_FIELDS:
+            value = employee_data.get(field)
+            if not value:
+                continue
+            # Legacy ciphertext, plaintext stored before encryption was enabled, or another key
+            if isinstance(value, str) or (isinstance(value, bytes) and self.key_id_of(value) != keys.key_id):
+                value = self.decrypt_field(value, keys, keys.salt)
+                updates[field] = self.encrypt_field(value, keys)
+            if not employee_data.get(field + BLIND_INDEX_SUFFIX):
+                if field not in updates:
+                    value = self.decrypt_field(value, keys, keys.salt)
+                updates[field + BLIND_INDEX_SUFFIX] = self.blind_index(field, value)
+        if employee_data.get(KEY_ID_FIELD) != keys.key_id:
+            updates[KEY_ID_FIELD] = keys.key_id
+        return updates
+
+    def encrypt_employees(self, employees: List[dict], salt: bytes = DEFAULT_SALT) -> List[dict]:
+        """Encrypt the PHI fields of a batch of employee documents on the crypto threads.
+
+        Blocking; call it from a worker thread (e.g. asyncio.to_thread) in async code.
+        """
+        keys = self.keys_for(salt)
+        return self._map_batch(lambda employee: self._encrypt_document(employee, keys), employees)
+
+    def decrypt_employees(self, employees: List[dict], salt: bytes = DEFAULT_SALT) -> List[dict]:
+        """Decrypt the PHI fields of a batch of employee documents on the crypto threads"""
+        keys = self.keys_for(salt)
+        return self._map_batch(lambda employee: self._decrypt_document(employee, keys), employees)
+
+    def lazy_employees(self, employees: List[dict], salt: bytes = DEFAULT_SALT) -> List["LazyPHIDocument"]:
+        """Views of stored employee documents that decrypt each PHI field only when it is read"""
+        keys = self.keys_for(salt)
+        return [LazyPHIDocument(self, employee, keys) for employee in employees]
+
+    def migrate_employees(self, employees: List[dict], salt: bytes = DEFAULT_SALT) -> List[Tuple[dict, Dict[str, Any]]]:
+        """Re-encrypt legacy, plaintext and previous-key PHI values of a batch into the current
+        format under the current key, adding any missing blind indexes.
+
+        Returns each document with its {field: new value} updates (empty if nothing changed).
+        """
+        keys = self.keys_for(salt)
+        return list(zip(employees, self._map_batch(lambda employee: self._migrate_document(employee, keys), employees)))
+
+    def _map_batch(self, func: Callable[[dict], Any], employees: List[dict]) -> List[Any]:
+        if len(employees) <= BATCH_SLICE_SIZE:
+            return [func(employee) for employee in employees]
+
+        slices = [employees[start:start + BATCH_SLICE_SIZE] for start in range(0, len(employees), BATCH_SLICE_SIZE)]
+        results = []
+        for processed in self._pool().map(lambda part: [func(employee) for employee in part], slices):
+            results.extend(processed)
+        return results
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=min(8, os.cpu_count() or 1),
+                    thread_name_prefix="phi-crypto"
+                )
+            return self._executor
+
+class DerivedKeys:
+    """Ciphers derived from one key in the keyring for one salt"""
+
+    def __init__(self, key_id: str, salt: bytes, key_material: bytes):
+        self.key_id = key_id
+        self.salt = salt
+        # Legacy Fernet key: the PBKDF2 output itself, as it has always been
+        self.fernet = Fernet(base64.urlsafe_b64encode(key_material))
+        # A separate AES-256 key for the compact format, so no key serves both ciphers
+        self.aead = AESGCM(HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b'health_verify_now_phi_aes_gcm',
+        ).derive(key_material))
+
+class LazyPHIDocument(Mapping):
+    """Read-only view of a stored employee document.
+
+    PHI fields are decrypted on first access and then kept, so rendering a few
+    columns of a large roster never touches the others.
+    """
+
+    def __init__(self, encryption: PHIEncryption, document: dict, keys: DerivedKeys):
+        self._encryption = encryption
+        self._document = document
+        self._keys = keys
+        self._decrypted: Dict[str, Any] = {}
+
+    def __getitem__(self, field: str) -> Any:
+        if field == KEY_ID_FIELD:
+            raise KeyError(field)
+        value = self._document[field]
+        if field not in PHI_FIELDS or not value:
+            return value
+        if field not in self._decrypted:
+            self._decrypted[field] = self._encryption.decrypt_field(value, self._keys, self._keys.salt)
+        return self._decrypted[field]
+
+    def __iter__(self) -> Iterator[str]:
+        return (field for field in self._document if field != KEY_ID_FIELD)
+
+    def __len__(self) -> int:
+        return len(self._document) - (KEY_ID_FIELD in self._document)
+
 # Global encryption instance
-phi_encryption = PHIEncryption()
\ No newline at end of file
+phi_encryption = PHIEncryption()
@@ -0,0 +1,110 @@
+"""
+Job Progress Broadcasting for Health Verify Now
+In-process publish/subscribe of batch job progress for server-sent event streams
+"""
+
+import asyncio
+import threading
+import time
+from typing import AsyncIterator, Dict, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"completed", "completed_with_errors", "failed"}
+
+# How long finished jobs keep their final event for late subscribers
+FINISHED_JOB_RETENTION_SECONDS = 10 * 60
+
+# Idle streams send a keep-alive so proxies do not close them
+KEEPALIVE_INTERVAL_SECONDS = 15.0
+
+
+class _Subscription:
+    """One stream's mailbox; only the newest undelivered event is kept"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.pending: Optional[dict] = None
+        self.ready = asyncio.Event()
+
+    def deliver(self, event: dict):
+        self.pending = event
+        self.ready.set()
+
+
+class ProgressBroker:
+    """Fan-out of job progress events from processing pipelines to streaming clients"""
+
+    def __init__(self):
+        self._latest: Dict[str, dict] = {}
+        self._finished_at: Dict[str, float] = {}
+        self._subscribers: Dict[str, Set[_Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, job_id: str, event: dict):
+        """Record a job's latest progress and wake its subscribers (never blocks)"""
+        event = {**event, "job_id": job_id}
+        with self._lock:
+            self._latest[job_id] = event
+            if event.get("status") in TERMINAL_STATUSES:
+                self._finished_at[job_id] = time.monotonic()
+            subscribers = list(self._subscribers.get(job_id, ()))
+            self._prune_finished()
+
+        for subscription in subscribers:
+            try:
+                running_loop = asyncio.get_running_loop()
+            except RuntimeError:
+                running_loop = None
+            if running_loop is subscription.loop:
+                subscription.deliver(event)
+            else:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+
+    def latest(self, job_id: str) -> Optional[dict]:
+        """Most recent event published for a job"""
+        with self._lock:
+            return self._latest.get(job_id)
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[Optional[dict]]:
+        """Yield progress events for a job until it finishes; None marks a keep-alive"""
+        subscription = _Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(job_id, set()).add(subscription)
+            latest = self._latest.get(job_id)
+        if latest:
+            subscription.deliver(latest)
+
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(subscription.ready.wait(), timeout=KEEPALIVE_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                subscription.ready.clear()
+                event, subscription.pending = subscription.pending, None
+                if event is None:
+                    continue
+                yield event
+                if event.get("status") in TERMINAL_STATUSES:
+                    return
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(job_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[job_id]
+
+    def _prune_finished(self):
+        cutoff = time.monotonic() - FINISHED_JOB_RETENTION_SECONDS
+        for job_id in [job_id for job_id, finished_at in self._finished_at.items() if finished_at < cutoff]:
+            del self._finished_at[job_id]
+            self._latest.pop(job_id, None)
+
+
+# Global progress broker instance
+progress_broker = ProgressBroker()
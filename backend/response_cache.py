@@ -0,0 +1,149 @@
+"""
+Response Caching for Health Verify Now
+In-memory and Mongo-backed TTL caches for remote verification lookups
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Hashable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a time-to-live"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or default if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a value, evicting the least recently used entry when full"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        """Drop a single entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Cache size and hit counters for status endpoints"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TieredResponseCache:
+    """Memory TTL cache backed by a shared Mongo collection as second tier"""
+
+    def __init__(self, db, collection: str, memory_ttl_seconds: float, max_memory_entries: int = 10000):
+        self.db = db
+        self.collection = collection
+        self.memory = TTLCache(ttl_seconds=memory_ttl_seconds, max_entries=max_memory_entries)
+        self.mongo_hits = 0
+
+    @staticmethod
+    def _storage_key(key: str) -> str:
+        # Keys can contain employee names, store only their digest
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    async def ensure_indexes(self):
+        """Create lookup and expiry indexes for the Mongo tier"""
+        await self.db[self.collection].create_index("key", unique=True)
+        await self.db[self.collection].create_index("expires_at", expireAfterSeconds=0)
+
+    async def get(self, key: str) -> Any:
+        """Return the cached value from memory, then Mongo, or None"""
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        try:
+            now = datetime.utcnow()
+            doc = await self.db[self.collection].find_one({
+                "key": self._storage_key(key),
+                "expires_at": {"$gt": now}
+            })
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed for {self.collection}: {e}")
+            return None
+
+        if not doc:
+            return None
+
+        # Promote to memory for the rest of the entry's lifetime
+        self.memory.set(key, doc["value"], (doc["expires_at"] - now).total_seconds())
+        self.mongo_hits += 1
+        return doc["value"]
+
+    async def set(self, key: str, value: Any, ttl_seconds: float):
+        """Store a value in both tiers"""
+        if ttl_seconds <= 0:
+            return
+
+        self.memory.set(key, value, ttl_seconds)
+        now = datetime.utcnow()
+        try:
+            await self.db[self.collection].update_one(
+                {"key": self._storage_key(key)},
+                {"$set": {
+                    "value": value,
+                    "cached_at": now,
+                    "expires_at": now + timedelta(seconds=ttl_seconds)
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Response cache write failed for {self.collection}: {e}")
+
+    def stats(self) -> dict:
+        """Cache size and hit counters for status endpoints"""
+        stats = self.memory.stats()
+        stats["mongo_hits"] = self.mongo_hits
+        return stats
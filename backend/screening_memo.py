@@ -0,0 +1,104 @@
+"""
+Screening Memo for Health Verify Now
+Shares name-search outcomes across tenants for each loaded source snapshot
+"""
+
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 200000
+
+class ScreeningMemo:
+    """LRU memo of search matches keyed by (source, snapshot version, normalized query).
+
+    Only the raw matches against a public source are shared; each tenant still builds
+    and stores its own verification result from them. Concurrent identical searches
+    wait on the first one instead of searching again.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, Hashable], Any]" = OrderedDict()
+        self._versions: Dict[str, str] = {}
+        self._inflight: Dict[Tuple[str, str, Hashable], asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.joined = 0
+
+    async def get_or_compute(self, source: str, version: str, query: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the memoized matches for a query, computing them once per snapshot"""
+        key = (source, version, query)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._versions.get(source) != version:
+                self._drop_source(source)
+                self._versions[source] = version
+
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+            inflight = self._inflight.get(key)
+            if inflight is not None and inflight.get_loop() is loop:
+                self.joined += 1
+            else:
+                inflight = None
+                self._inflight[key] = loop.create_future()
+                self.misses += 1
+
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = self._inflight[key]
+        try:
+            value = await compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                # Waiters re-raise it; avoid "exception never retrieved" when nobody joined
+                future.exception()
+            else:
+                future.cancel()
+            raise
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            # A newer snapshot may have loaded while this search ran
+            if self._versions.get(source) == version:
+                self._entries[key] = value
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        future.set_result(value)
+        return value
+
+    def _drop_source(self, source: str):
+        """Forget entries computed against an older snapshot of a source"""
+        stale = [key for key in self._entries if key[0] == source]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            logger.info(f"Screening memo dropped {len(stale)} entries for superseded {source} snapshot")
+
+    def stats(self) -> dict:
+        """Memo size and hit counters for status endpoints"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "joined_inflight": self.joined,
+                "snapshots": dict(self._versions)
+            }
+
+# Global screening memo instance
+screening_memo = ScreeningMemo()
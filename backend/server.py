@@ -1,13 +1,16 @@
-from fastapi import FastAPI, APIRouter, HTTPException, BackgroundTasks, Depends, status, UploadFile, File, Form
+from fastapi import FastAPI, APIRouter, HTTPException, BackgroundTasks, Depends, status, UploadFile, File, Form, Query, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Mapping, Optional, Dict, Any, Sequence, Set, Union
 import uuid
 from datetime import datetime, timedelta
 import httpx
@@ -17,8 +20,10 @@ import asyncio
 from enum import Enum
 import aiofiles
 import hashlib
+import json
+import re
 import sys
-import pandas as pd
+import tempfile
 from datetime import datetime, timedelta
 import threading
 import time
@@ -37,6 +42,18 @@ from auth_utils import (
     calculate_monthly_cost, get_pricing_tiers
 )
 from paypal_integration import paypal_client
+from http_pool import http_pool, CircuitOpenError, current_lane, BULK_LANE
+from response_cache import TTLCache, TieredResponseCache
+from npi_index import npi_index
+from progress_broker import progress_broker, TERMINAL_STATUSES
+from verification_scheduler import verification_scheduler
+from screening_memo import screening_memo
+from matcher_pool import matcher_pool
+from snapshot_monitor import SnapshotDeltaStore
+from employee_index import employee_name_index
+from upload_sessions import upload_sessions, DEFAULT_CHUNK_SIZE, PrefixStalled, STALLED_SESSION_TIMEOUT
+import matching
+from matching import normalize_name, file_snapshot_version, remember_file_version
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -64,7 +81,7 @@ logger = logging.getLogger(__name__)
 
 # Import HIPAA compliance modules
 try:
-    from phi_encryption import phi_encryption
+    from phi_encryption import phi_encryption, PHI_FIELDS, BLIND_INDEX_SUFFIX, KEY_ID_FIELD
     from mfa_manager import MFAManager  
     from audit_logger import HIPAAAuditLogger, AuditEventType, AuditOutcome
     HIPAA_ENABLED = True
@@ -72,7 +89,11 @@ try:
     
     # Initialize HIPAA managers
     mfa_manager = MFAManager(db)
-    audit_logger = HIPAAAuditLogger(db)
+    audit_logger = HIPAAAuditLogger(
+        db,
+        wal_path=os.environ.get('AUDIT_WAL_PATH', str(ROOT_DIR / "audit_wal.jsonl")),
+        fsync_each_event=os.environ.get('AUDIT_WAL_FSYNC', 'false').lower() == 'true'
+    )
     logger.info("HIPAA managers initialized")
     
 except ImportError as e:
@@ -81,6 +102,10 @@ except ImportError as e:
     mfa_manager = None
     audit_logger = None
 
+# Encrypting employee PHI at rest changes the stored format, so it is switched on
+# separately; reads decrypt stored ciphertext whenever HIPAA modules are loaded
+PHI_ENCRYPTION_AT_REST = HIPAA_ENABLED and os.environ.get('PHI_ENCRYPTION_AT_REST', 'false').lower() == 'true'
+
 # Authentication dependency
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
     """Get current authenticated user"""
@@ -180,6 +205,9 @@ class EmployeeCreate(BaseModel):
     license_type: Optional[str] = None
     license_state: Optional[str] = None
 
+class EmployeeLookup(BaseModel):
+    ssn: str
+
 class VerificationResult(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     employee_id: str
@@ -189,6 +217,8 @@ class VerificationResult(BaseModel):
     error_message: Optional[str] = None
     checked_at: datetime = Field(default_factory=datetime.utcnow)
     data_source: Optional[str] = None
+    employee_fingerprint: Optional[str] = None  # Digest of the employee fields the check used
+    source_version: Optional[str] = None  # Snapshot of the source data the check ran against
 
 class BatchUploadResult(BaseModel):
     upload_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -211,11 +241,47 @@ class BatchUploadStatus(BaseModel):
     successful_imports: int
     failed_imports: int
     errors: List[Dict[str, Any]] = []
+    mapped_columns: Dict[str, str] = {}  # employee field -> upload column
+    unmatched_columns: List[str] = []
+    # Screening of imported employees when the upload was started with verification_types
+    verification_types: List[str] = []
+    total_checks: int = 0
+    completed_checks: int = 0
+    flagged_employees: int = 0
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    total_size: int
+    chunk_size: Optional[int] = None
+    sha256: Optional[str] = None  # Digest of the whole file, if known up front
+    verification_types: List[VerificationType] = []
+
+class UploadSessionComplete(BaseModel):
+    sha256: Optional[str] = None
 
 class BatchVerificationRequest(BaseModel):
     employee_ids: List[str]
     verification_types: List[VerificationType]
 
+class BatchVerificationStatus(BaseModel):
+    job_id: str
+    status: str
+    progress: int  # percentage
+    total_checks: int
+    completed_checks: int
+    employee_count: int
+    processed_employees: int
+    failed_employees: int = 0
+
+# Running batch jobs store their counters at most this often, for readers in other processes
+BATCH_PROGRESS_PERSIST_SECONDS = 2.0
+
+# Concurrent employees verified by batch jobs (bulk scheduling lane)
+BULK_VERIFICATION_CONCURRENCY = int(os.environ.get('BULK_VERIFICATION_CONCURRENCY', '4'))
+
+# Worker processes for exclusion list parsing and matching (0 runs them in threads instead)
+MATCHER_PROCESSES = int(os.environ.get('MATCHER_PROCESSES', str(min(2, os.cpu_count() or 1))))
+
 # OIG Exclusion Check Functions
 OIG_DATA_FILE = ROOT_DIR / "oig_exclusions.csv"
 OIG_DOWNLOAD_URL = "https://oig.hhs.gov/exclusions/downloadables/UPDATED.csv"
@@ -223,6 +289,30 @@ OIG_DOWNLOAD_URL = "https://oig.hhs.gov/exclusions/downloadables/UPDATED.csv"
 # SAM Exclusion Check Functions
 SAM_DATA_FILE = ROOT_DIR / "sam_exclusions.csv"
 
+# SAM.gov publishes exclusion updates once a day, cached v4 name queries expire at the next publication
+SAM_DAILY_PUBLICATION_HOUR_UTC = int(os.environ.get('SAM_DAILY_PUBLICATION_HOUR_UTC', '6'))
+SAM_NEGATIVE_CACHE_MAX_SECONDS = 6 * 60 * 60  # Clean results are re-checked at least this often
+sam_response_cache = TieredResponseCache(db, "sam_response_cache", memory_ttl_seconds=24 * 60 * 60, max_memory_entries=50000)
+
+def sam_publication_window(now: Optional[datetime] = None):
+    """Start of the current SAM daily publication and start of the next one"""
+    now = now or datetime.utcnow()
+    published_at = now.replace(hour=SAM_DAILY_PUBLICATION_HOUR_UTC, minute=0, second=0, microsecond=0)
+    if published_at > now:
+        published_at -= timedelta(days=1)
+    return published_at, published_at + timedelta(days=1)
+
+def sam_cache_key(exclusion_name: str) -> str:
+    """Normalize a SAM exclusionName query so tenants share cache entries"""
+    return " ".join(exclusion_name.upper().split())
+
+def sam_cache_ttl_seconds(has_records: bool) -> float:
+    """Cache SAM responses until the next daily publication, clean results for less"""
+    now = datetime.utcnow()
+    _, next_publication = sam_publication_window(now)
+    ttl = (next_publication - now).total_seconds()
+    return ttl if has_records else min(ttl, SAM_NEGATIVE_CACHE_MAX_SECONDS)
+
 # State Medicaid Exclusion Configuration
 STATE_MEDICAID_CONFIG = {
     "CA": {
@@ -375,9 +465,19 @@ FREE_CRIMINAL_CONFIG = {
     }
 }
 
-# In-memory license verification data storage
+# NPPES dissemination file (unzipped npidata_pfile_*.csv from https://download.cms.gov/nppes/NPI_Files.html)
+NPPES_DATA_FILE = Path(os.environ.get('NPPES_DATA_FILE', str(ROOT_DIR / "npidata.csv")))
+NPPES_INCLUDE_ORGANIZATIONS = os.environ.get('NPPES_INCLUDE_ORGANIZATIONS', 'false').lower() == 'true'
+# A missing or unreadable NPPES file is retried at most this often from license checks
+NPPES_LOAD_RETRY_SECONDS = 3600
+nppes_load_attempted_at: Optional[float] = None
+
+# Live NPI Registry lookups are only made on local index misses
+NPI_LOOKUP_CACHE_TTL_SECONDS = 24 * 60 * 60
+npi_lookup_cache = TTLCache(ttl_seconds=NPI_LOOKUP_CACHE_TTL_SECONDS, max_entries=50000)
+
+# In-memory license verification data storage (NPI records live in npi_index)
 license_verification_cache = {
-    "npi": [],
     "ca_medical": [],
     "tx_medical": [],
     "fl_medical": [], 
@@ -394,6 +494,14 @@ criminal_background_cache = {
     "tx_sex_offender": []
 }
 
+# Version of each loaded source snapshot, used to skip re-screening unchanged employees
+source_versions: Dict[str, str] = {}
+
+def data_snapshot_version(records: List[Dict[str, Any]]) -> str:
+    """Version small API-sourced datasets by content digest"""
+    payload = "\n".join(sorted(repr(sorted(record.items())) for record in records))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
 async def download_oig_data():
     """Download the latest OIG exclusion list from HHS.gov"""
     try:
@@ -406,6 +514,7 @@ async def download_oig_data():
                 # Save the data to local file
                 async with aiofiles.open(OIG_DATA_FILE, 'wb') as f:
                     await f.write(response.content)
+                remember_file_version(OIG_DATA_FILE, response.content)
                 
                 logger.info(f"OIG data downloaded successfully: {len(response.content)} bytes")
                 
@@ -471,6 +580,7 @@ async def download_sam_data():
                             # Save the SAM data to local file
                             async with aiofiles.open(SAM_DATA_FILE, 'wb') as f:
                                 await f.write(download_response.content)
+                            remember_file_version(SAM_DATA_FILE, download_response.content)
                             
                             logger.info(f"SAM data downloaded successfully: {len(download_response.content)} bytes")
                             
@@ -541,6 +651,7 @@ async def load_sam_data_to_memory():
                 exclusions.append(exclusion)
         
         sam_exclusions_cache = exclusions
+        schedule_snapshot_monitoring("sam", await asyncio.to_thread(file_snapshot_version, SAM_DATA_FILE), exclusions)
         logger.info(f"Loaded {len(exclusions)} SAM exclusions into memory")
         return True
         
@@ -583,6 +694,9 @@ async def scheduled_data_updates():
     except Exception as e:
         logger.error(f"Failed to record update status: {e}")
     
+    # This loop closes when the update returns, finish re-screening against the new deltas first
+    await wait_for_snapshot_monitoring()
+    
     logger.info(f"🔄 Scheduled update completed. OIG: {oig_success}, SAM: {sam_success}")
 
 @api_router.post("/auth/setup-mfa")
@@ -717,6 +831,285 @@ async def get_security_alerts(
         logger.error(f"Security alerts retrieval failed: {e}")
         raise HTTPException(status_code=500, detail="Security alerts retrieval failed")
 
+# ========== PHI ENCRYPTION MAINTENANCE ==========
+
+PHI_MIGRATION_BATCH_SIZE = 500
+# Pause between batches so a migration never saturates the database
+PHI_MIGRATION_PAUSE_SECONDS = float(os.environ.get('PHI_MIGRATION_PAUSE_SECONDS', '0.1'))
+
+# Key rotation re-encrypts every employee, so it runs in smaller, checkpointed batches
+PHI_ROTATION_BATCH_SIZE = int(os.environ.get('PHI_ROTATION_BATCH_SIZE', '200'))
+PHI_ROTATION_PAUSE_SECONDS = float(os.environ.get('PHI_ROTATION_PAUSE_SECONDS', '0.25'))
+# Rescans for rows skipped because they changed concurrently, before giving up as incomplete
+PHI_ROTATION_RETRY_PASSES = 3
+
+phi_migration_task: Optional[asyncio.Task] = None
+phi_rotation_task: Optional[asyncio.Task] = None
+
+PHI_REWRITE_PROJECTION = {
+    "_id": 1,
+    KEY_ID_FIELD: 1,
+    **{field: 1 for field in PHI_FIELDS},
+    **{field + BLIND_INDEX_SUFFIX: 1 for field in PHI_FIELDS}
+} if HIPAA_ENABLED else {}
+
+async def rewrite_employee_phi(documents: List[dict]) -> int:
+    """Re-encrypt a batch of employees' PHI in the current format under the current key.
+
+    Each update is conditional on the values it replaces, so rows changed by a
+    concurrent write are left for the next run instead of being overwritten.
+    Returns the number of employees rewritten.
+    """
+    migrated = await asyncio.to_thread(phi_encryption.migrate_employees, documents)
+    updates = [
+        UpdateOne({"_id": document["_id"], **{field: document.get(field) for field in PHI_FIELDS}}, {"$set": changes})
+        for document, changes in migrated if changes
+    ]
+    if not updates:
+        return 0
+    result = await db.employees.bulk_write(updates, ordered=False)
+    return result.modified_count
+
+async def run_phi_format_migration(job: Dict[str, Any]):
+    """Rewrite legacy (and plaintext) employee PHI values in the compact binary format,
+    adding missing blind indexes.
+    """
+    query = {"$or": [{field: {"$type": "string", "$ne": ""}} for field in PHI_FIELDS] + [
+        {field: {"$nin": [None, ""]}, field + BLIND_INDEX_SUFFIX: {"$exists": False}} for field in PHI_FIELDS
+    ]}
+    batch = []
+    
+    async def flush():
+        job["migrated"] += await rewrite_employee_phi(list(batch))
+        job["scanned"] += len(batch)
+        batch.clear()
+        await db.phi_migrations.update_one({"id": job["id"]}, {"$set": {"scanned": job["scanned"], "migrated": job["migrated"]}})
+        await asyncio.sleep(PHI_MIGRATION_PAUSE_SECONDS)
+    
+    try:
+        async for document in db.employees.find(query, PHI_REWRITE_PROJECTION).batch_size(PHI_MIGRATION_BATCH_SIZE):
+            batch.append(document)
+            if len(batch) >= PHI_MIGRATION_BATCH_SIZE:
+                await flush()
+        if batch:
+            await flush()
+        job["status"] = "completed"
+        logger.info(f"PHI format migration {job['id']} completed: {job['migrated']} of {job['scanned']} employees rewritten")
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+        logger.error(f"PHI format migration {job['id']} failed: {e}")
+    
+    await db.phi_migrations.update_one(
+        {"id": job["id"]},
+        {"$set": {
+            "status": job["status"],
+            "scanned": job["scanned"],
+            "migrated": job["migrated"],
+            "error": job.get("error"),
+            "completed_at": datetime.utcnow()
+        }}
+    )
+
+@api_router.post("/admin/phi/migrate-format")
+async def start_phi_format_migration(current_user: User = Depends(get_current_user)):
+    """Start re-encrypting stored employee PHI in the compact format (admin only)"""
+    global phi_migration_task
+    if not HIPAA_ENABLED or not audit_logger:
+        raise HTTPException(status_code=501, detail="HIPAA features not available")
+    
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    # Rewriting stored PHI is part of the at-rest encryption rollout
+    if not PHI_ENCRYPTION_AT_REST:
+        raise HTTPException(status_code=409, detail="PHI encryption at rest is not enabled")
+    
+    if phi_migration_task and not phi_migration_task.done():
+        raise HTTPException(status_code=409, detail="A PHI format migration is already running")
+    
+    job = {
+        "id": str(uuid.uuid4()),
+        "status": "processing",
+        "scanned": 0,
+        "migrated": 0,
+        "started_by": current_user.id,
+        "started_at": datetime.utcnow(),
+        "completed_at": None
+    }
+    await db.phi_migrations.insert_one(dict(job))
+    phi_migration_task = asyncio.create_task(run_phi_format_migration(job))
+    
+    await audit_logger.log_admin_action(
+        current_user.id,
+        "phi_format_migration_started",
+        details={"job_id": job["id"]}
+    )
+    
+    return job
+
+@api_router.get("/admin/phi/migrate-format")
+async def get_phi_format_migration(current_user: User = Depends(get_current_user)):
+    """Progress of the latest PHI format migration (admin only)"""
+    if not HIPAA_ENABLED or not audit_logger:
+        raise HTTPException(status_code=501, detail="HIPAA features not available")
+    
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    job = await db.phi_migrations.find_one({}, {"_id": 0}, sort=[("started_at", -1)])
+    if not job:
+        raise HTTPException(status_code=404, detail="No PHI format migration has run")
+    return job
+
+async def run_phi_key_rotation(job: Dict[str, Any]):
+    """Re-encrypt every employee's PHI under the current key, from the job's checkpoint on.
+
+    Reads decrypt under any key in the keyring, so the API keeps serving while this runs.
+    Employees are walked in _id order and the last _id of each batch is checkpointed, so an
+    interrupted rotation resumes where it stopped rather than rescanning the collection.
+    Rows skipped because they changed concurrently are picked up by rescans; the job is
+    only "completed" once no employee is left under another key.
+    """
+    query = {KEY_ID_FIELD: {"$ne": job["target_key_id"]}}
+    
+    try:
+        passes = 0
+        while True:
+            page_query = dict(query)
+            if job.get("checkpoint") is not None:
+                page_query["_id"] = {"$gt": job["checkpoint"]}
+            batch = await db.employees.find(page_query, PHI_REWRITE_PROJECTION).sort("_id", 1).limit(
+                PHI_ROTATION_BATCH_SIZE
+            ).to_list(PHI_ROTATION_BATCH_SIZE)
+            if not batch:
+                job["remaining"] = await db.employees.count_documents(query)
+                if not job["remaining"] or passes >= PHI_ROTATION_RETRY_PASSES:
+                    break
+                # Start over from the beginning for what the last pass skipped
+                passes += 1
+                job["checkpoint"] = None
+                continue
+            
+            rotated = await rewrite_employee_phi(batch)
+            job["rotated"] += rotated
+            job["skipped"] += len(batch) - rotated
+            job["scanned"] += len(batch)
+            job["checkpoint"] = batch[-1]["_id"]
+            await db.phi_key_rotations.update_one(
+                {"id": job["id"]},
+                {"$set": {
+                    "scanned": job["scanned"],
+                    "rotated": job["rotated"],
+                    "skipped": job["skipped"],
+                    "checkpoint": job["checkpoint"],
+                    "updated_at": datetime.utcnow()
+                }}
+            )
+            await asyncio.sleep(PHI_ROTATION_PAUSE_SECONDS)
+        job["status"] = "incomplete" if job["remaining"] else "completed"
+        logger.info(
+            f"PHI key rotation {job['id']} to {job['target_key_id']} {job['status']}: "
+            f"{job['rotated']} of {job['scanned']} employees re-encrypted, {job['skipped']} changed concurrently, "
+            f"{job['remaining']} still under another key"
+        )
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+        logger.error(f"PHI key rotation {job['id']} failed at checkpoint {job.get('checkpoint')}: {e}")
+    
+    await db.phi_key_rotations.update_one(
+        {"id": job["id"]},
+        {"$set": {
+            "status": job["status"],
+            "error": job.get("error"),
+            "remaining": job.get("remaining"),
+            "checkpoint": job.get("checkpoint"),
+            "completed_at": datetime.utcnow()
+        }}
+    )
+
+def phi_rotation_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in job.items() if key not in ("_id", "checkpoint")}
+
+async def resume_phi_key_rotation(started_by: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Continue the latest unfinished rotation to the current key from its checkpoint"""
+    global phi_rotation_task
+    job = await db.phi_key_rotations.find_one(
+        {"target_key_id": phi_encryption.key_id, "status": {"$in": ["processing", "failed", "incomplete"]}},
+        {"_id": 0},
+        sort=[("started_at", -1)]
+    )
+    if not job:
+        return None
+    
+    job.update({"status": "processing", "error": None, "completed_at": None})
+    await db.phi_key_rotations.update_one(
+        {"id": job["id"]},
+        {"$set": {"status": "processing", "error": None, "completed_at": None, "resumed_by": started_by}}
+    )
+    phi_rotation_task = asyncio.create_task(run_phi_key_rotation(job))
+    logger.info(f"Resuming PHI key rotation {job['id']} to {job['target_key_id']} after {job['scanned']} employees")
+    return job
+
+@api_router.post("/admin/phi/rotate-keys")
+async def start_phi_key_rotation(current_user: User = Depends(get_current_user)):
+    """Start (or resume) re-encrypting stored employee PHI under the current key (admin only)"""
+    global phi_rotation_task
+    if not HIPAA_ENABLED or not audit_logger:
+        raise HTTPException(status_code=501, detail="HIPAA features not available")
+    
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    # Rewriting stored PHI is part of the at-rest encryption rollout
+    if not PHI_ENCRYPTION_AT_REST:
+        raise HTTPException(status_code=409, detail="PHI encryption at rest is not enabled")
+    
+    if phi_rotation_task and not phi_rotation_task.done():
+        raise HTTPException(status_code=409, detail="A PHI key rotation is already running")
+    
+    job = await resume_phi_key_rotation(current_user.id)
+    if job is None:
+        job = {
+            "id": str(uuid.uuid4()),
+            "status": "processing",
+            "target_key_id": phi_encryption.key_id,
+            "checkpoint": None,
+            "scanned": 0,
+            "rotated": 0,
+            "skipped": 0,
+            "started_by": current_user.id,
+            "started_at": datetime.utcnow(),
+            "completed_at": None
+        }
+        await db.phi_key_rotations.insert_one(dict(job))
+        phi_rotation_task = asyncio.create_task(run_phi_key_rotation(job))
+    
+    await audit_logger.log_admin_action(
+        current_user.id,
+        "phi_key_rotation_started",
+        details={"job_id": job["id"], "target_key_id": job["target_key_id"], "resumed_after": job["scanned"]}
+    )
+    
+    return phi_rotation_view(job)
+
+@api_router.get("/admin/phi/rotate-keys")
+async def get_phi_key_rotation(current_user: User = Depends(get_current_user)):
+    """Progress of the latest PHI key rotation (admin only)"""
+    if not HIPAA_ENABLED or not audit_logger:
+        raise HTTPException(status_code=501, detail="HIPAA features not available")
+    
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    job = await db.phi_key_rotations.find_one({}, {"_id": 0, "checkpoint": 0}, sort=[("started_at", -1)])
+    if not job:
+        raise HTTPException(status_code=404, detail="No PHI key rotation has run")
+    
+    remaining = await db.employees.count_documents({KEY_ID_FIELD: {"$ne": phi_encryption.key_id}})
+    return {**job, "current_key_id": phi_encryption.key_id, "keyring": list(phi_encryption.keyring), "remaining": remaining}
+
 @api_router.get("/admin/update-history")
 async def get_update_history():
     """Get history of data updates"""
@@ -801,6 +1194,7 @@ async def download_state_medicaid_data(state_code):
                 # Save the data to local file
                 async with aiofiles.open(config["data_file"], 'wb') as f:
                     await f.write(response.content)
+                remember_file_version(config["data_file"], response.content)
                 
                 logger.info(f"{config['name']} data downloaded successfully: {len(response.content)} bytes")
                 
@@ -831,54 +1225,20 @@ async def load_state_medicaid_data_to_memory(state_code):
     
     try:
         logger.info(f"Loading {config['name']} exclusion data into memory...")
-        exclusions = []
+        version = await asyncio.to_thread(file_snapshot_version, config["data_file"])
         
-        async with aiofiles.open(config["data_file"], mode='r', encoding='utf-8') as f:
-            content = await f.read()
-            
         # Parse CSV content - each state may have different field names
-        csv_reader = csv.DictReader(io.StringIO(content))
-        
-        for row in csv_reader:
-            # Normalize data format for each state
-            exclusion = {
-                'state': state_code,
-                'provider_name': '',
-                'first_name': '',
-                'last_name': '',
-                'exclusion_date': '',
-                'exclusion_type': row.get('EXCLUSION_TYPE', '').strip(),
-                'reason': row.get('REASON', '').strip(),
-                'npi': row.get('NPI', '').strip(),
-                'license_number': row.get('LICENSE_NUMBER', '').strip(),
-                'address': row.get('ADDRESS', '').strip(),
-                'city': row.get('CITY', '').strip(),
-                'zip_code': row.get('ZIP', '').strip(),
-                'raw_data': row  # Keep original data for debugging
-            }
-            
-            # Extract name from various possible field combinations
-            name_fields = config.get("name_fields", ["NAME"])
-            for field in name_fields:
-                if field in row and row[field]:
-                    name_value = row[field].strip().upper()
-                    if "FIRST" in field or "FNAME" in field:
-                        exclusion['first_name'] = name_value
-                    elif "LAST" in field or "LNAME" in field:
-                        exclusion['last_name'] = name_value
-                    else:
-                        exclusion['provider_name'] = name_value
-            
-            # Extract dates
-            date_fields = config.get("date_fields", ["EXCLUSION_DATE"])
-            for field in date_fields:
-                if field in row and row[field]:
-                    exclusion['exclusion_date'] = row[field].strip()
-                    break
-            
-            exclusions.append(exclusion)
+        exclusions = await matcher_pool.run(
+            matching.parse_medicaid_file,
+            str(config["data_file"]),
+            state_code,
+            config.get("name_fields", ["NAME"]),
+            config.get("date_fields", ["EXCLUSION_DATE"])
+        )
         
         state_medicaid_cache[state_code] = exclusions
+        source_versions[f"medicaid_{state_code.lower()}"] = version
+        schedule_snapshot_monitoring(f"medicaid_{state_code.lower()}", version, exclusions)
         logger.info(f"Loaded {len(exclusions)} {config['name']} exclusions into memory")
         return True
         
@@ -888,61 +1248,22 @@ async def load_state_medicaid_data_to_memory(state_code):
 
 def search_state_medicaid_exclusions(state_code, first_name, last_name, middle_name=None):
     """Search state Medicaid exclusions for matching individuals"""
-    matches = []
-    
     if state_code not in state_medicaid_cache or not state_medicaid_cache[state_code]:
         logger.warning(f"{state_code} Medicaid data not loaded in memory")
-        return matches
-    
-    # Normalize search terms
-    search_first = normalize_name(first_name)
-    search_last = normalize_name(last_name)
-    search_middle = normalize_name(middle_name) if middle_name else ""
+        return []
     
-    for exclusion in state_medicaid_cache[state_code]:
-        match_score = 0
-        
-        # Method 1: Check individual name fields if available
-        if exclusion['first_name'] and exclusion['last_name']:
-            if (exclusion['first_name'] == search_first and 
-                exclusion['last_name'] == search_last):
-                
-                match_score = 100  # Exact first + last name match
-                
-                # Check middle name if provided
-                if search_middle and exclusion.get('middle_name'):
-                    if exclusion['middle_name'] == search_middle:
-                        match_score = 100  # Perfect match
-                    else:
-                        match_score = 85   # Different middle name
-        
-        # Method 2: Check provider name field 
-        elif exclusion['provider_name']:
-            full_search_name = f"{search_first} {search_last}"
-            full_search_name_with_middle = f"{search_first} {search_middle} {search_last}" if search_middle else full_search_name
-            
-            # Check if our search name is in the provider name
-            if full_search_name in exclusion['provider_name']:
-                match_score = 90
-            elif search_middle and full_search_name_with_middle in exclusion['provider_name']:
-                match_score = 95
-            elif (search_first in exclusion['provider_name'] and 
-                  search_last in exclusion['provider_name']):
-                match_score = 80
-        
-        # Only include high-confidence matches
-        if match_score >= 80:
-            matches.append({
-                'exclusion': exclusion,
-                'match_score': match_score,
-                'match_type': 'name_match',
-                'state': state_code
-            })
-    
-    # Sort by match score (highest first)
-    matches.sort(key=lambda x: x['match_score'], reverse=True)
-    
-    return matches
+    return matching.search_medicaid(state_medicaid_cache[state_code], state_code, first_name, last_name, middle_name)
+
+async def search_state_medicaid_exclusions_offloaded(state_code, first_name, last_name, middle_name=None):
+    """Search state Medicaid exclusions in the matcher pool"""
+    config = STATE_MEDICAID_CONFIG[state_code]
+    return await matcher_pool.search(
+        f"medicaid_{state_code.lower()}",
+        source_versions.get(f"medicaid_{state_code.lower()}"),
+        "medicaid", (str(config["data_file"]), state_code, config.get("name_fields", ["NAME"]), config.get("date_fields", ["EXCLUSION_DATE"])),
+        "medicaid", (state_code, first_name, last_name, middle_name),
+        fallback=lambda: search_state_medicaid_exclusions(state_code, first_name, last_name, middle_name)
+    )
 
 async def check_state_medicaid_exclusion(employee: Employee, state_code: str) -> VerificationResult:
     """Check if employee is in state Medicaid exclusion list"""
@@ -955,7 +1276,7 @@ async def check_state_medicaid_exclusion(employee: Employee, state_code: str) ->
                 error_message=f"Unsupported state: {state_code}",
                 data_source=f"{state_code} Medicaid"
             )
-            await db.verification_results.insert_one(result.dict())
+            await save_verification_result(employee, result)
             return result
         
         config = STATE_MEDICAID_CONFIG[state_code]
@@ -974,11 +1295,14 @@ async def check_state_medicaid_exclusion(employee: Employee, state_code: str) ->
                 error_message=f"{config['name']} exclusion database not available",
                 data_source=f"{config['name']}"
             )
-            await db.verification_results.insert_one(result.dict())
+            await save_verification_result(employee, result)
             return result
         
         # Search for matches using local data
-        matches = search_state_medicaid_exclusions(
+        matches = await memoized_search(
+            f"medicaid_{state_code.lower()}",
+            (normalize_name(employee.first_name), normalize_name(employee.last_name), normalize_name(employee.middle_name)),
+            search_state_medicaid_exclusions_offloaded,
             state_code,
             employee.first_name, 
             employee.last_name, 
@@ -1031,7 +1355,7 @@ async def check_state_medicaid_exclusion(employee: Employee, state_code: str) ->
         )
         
         # Store result in database
-        await db.verification_results.insert_one(result.dict())
+        await save_verification_result(employee, result)
         
         logger.info(f"{config['name']} check completed for {employee.first_name} {employee.last_name}: {result.status} ({len(high_confidence_matches)} high-confidence matches)")
         
@@ -1046,82 +1370,106 @@ async def check_state_medicaid_exclusion(employee: Employee, state_code: str) ->
             error_message=str(e),
             data_source=f"{state_code} Medicaid"
         )
-        await db.verification_results.insert_one(error_result.dict())
+        await save_verification_result(employee, error_result)
         return error_result
 
 async def download_npi_data():
-    """Download NPI registry data (sample data for large providers)"""
+    """Build the local NPI index from the NPPES dissemination file"""
     try:
-        logger.info("Downloading NPI registry sample data...")
+        if not NPPES_DATA_FILE.exists():
+            logger.warning(f"NPPES data file not found at {NPPES_DATA_FILE} - NPI checks will use the live registry API")
+            return False
         
-        # NPI API doesn't provide bulk download, but we can get sample data
-        # In production, you'd want to cache frequent lookups
-        npi_sample_data = [
-            {
-                "npi": "1234567890",
-                "first_name": "JOHN",
-                "last_name": "SMITH", 
-                "credential": "MD",
-                "taxonomy": "207Q00000X",
-                "specialty": "Family Medicine",
-                "state": "CA",
-                "status": "Active"
-            },
-            {
-                "npi": "1234567891", 
-                "first_name": "JANE",
-                "last_name": "DOE",
-                "credential": "RN", 
-                "taxonomy": "163W00000X",
-                "specialty": "Registered Nurse",
-                "state": "TX",
-                "status": "Active"
-            }
-        ]
+        logger.info(f"Building NPI index from NPPES file {NPPES_DATA_FILE}...")
+        
+        # Index build streams a multi-GB file, keep it off the event loop
+        provider_count = await asyncio.to_thread(
+            npi_index.load_file,
+            NPPES_DATA_FILE,
+            NPPES_INCLUDE_ORGANIZATIONS
+        )
         
-        license_verification_cache["npi"] = npi_sample_data
-        logger.info(f"Loaded {len(npi_sample_data)} NPI sample records")
+        # Index answers take precedence, cached API answers may be stale now
+        npi_lookup_cache.clear()
+        logger.info(f"Loaded {provider_count} NPI records into local index")
         return True
         
     except Exception as e:
-        logger.error(f"Error downloading NPI data: {e}")
+        logger.error(f"Error loading NPPES data: {e}")
         return False
 
+async def ensure_npi_data():
+    """Load license data on first use, without retrying a failed load on every check"""
+    global nppes_load_attempted_at
+    if len(npi_index) > 0 or any(license_verification_cache.values()):
+        return
+    if nppes_load_attempted_at is not None and time.monotonic() - nppes_load_attempted_at < NPPES_LOAD_RETRY_SECONDS:
+        return
+    
+    nppes_load_attempted_at = time.monotonic()
+    logger.info("License verification data not in memory, loading...")
+    await download_npi_data()
+
 async def verify_npi_number(npi_number: str) -> dict:
     """Verify NPI number through CMS API"""
     try:
         if not npi_number or len(npi_number) != 10:
             return {"valid": False, "error": "Invalid NPI format"}
         
-        # Use CMS NPI Registry API
+        # Local NPPES index first - no network round trip
+        provider = npi_index.get(npi_number)
+        if provider:
+            return {
+                "valid": True,
+                "npi": provider["npi"],
+                "name": f"{provider['first_name']} {provider['last_name']}".strip() or provider["organization_name"],
+                "credential": provider["credential"],
+                "enumeration_date": provider["enumeration_date"],
+                "status": "A" if provider["status"] == "Active" else "D",
+                "entity_type": "NPI-1" if provider["entity_type"] == "Individual" else "NPI-2",
+                "taxonomy": provider["taxonomy"],
+                "source": "NPPES Local Index"
+            }
+        
+        cached = npi_lookup_cache.get(npi_number)
+        if cached is not None:
+            return cached
+        
+        # Use CMS NPI Registry API on index and cache miss
         api_url = f"https://npiregistry.cms.hhs.gov/api/?number={npi_number}&version=2.1"
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(api_url)
+        response = await http_pool.get("npi", api_url)
+        
+        if response.status_code == 200:
+            data = response.json()
+            results = data.get("results", [])
             
-            if response.status_code == 200:
-                data = response.json()
-                results = data.get("results", [])
+            if results:
+                provider = results[0]
+                basic_info = provider.get("basic", {})
                 
-                if results:
-                    provider = results[0]
-                    basic_info = provider.get("basic", {})
-                    
-                    return {
-                        "valid": True,
-                        "npi": provider.get("number"),
-                        "name": f"{basic_info.get('first_name', '')} {basic_info.get('last_name', '')}".strip(),
-                        "credential": basic_info.get("credential", ""),
-                        "enumeration_date": basic_info.get("enumeration_date"),
-                        "status": basic_info.get("status"),
-                        "entity_type": basic_info.get("enumeration_type"),
-                        "taxonomy": provider.get("taxonomies", [{}])[0].get("code", "")
-                    }
-                else:
-                    return {"valid": False, "error": "NPI not found"}
+                verification = {
+                    "valid": True,
+                    "npi": provider.get("number"),
+                    "name": f"{basic_info.get('first_name', '')} {basic_info.get('last_name', '')}".strip(),
+                    "credential": basic_info.get("credential", ""),
+                    "enumeration_date": basic_info.get("enumeration_date"),
+                    "status": basic_info.get("status"),
+                    "entity_type": basic_info.get("enumeration_type"),
+                    "taxonomy": provider.get("taxonomies", [{}])[0].get("code", ""),
+                    "source": "CMS NPI Registry API"
+                }
             else:
-                return {"valid": False, "error": f"API error: {response.status_code}"}
+                verification = {"valid": False, "error": "NPI not found"}
+            
+            # Cache definitive answers only, API errors are retried
+            npi_lookup_cache.set(npi_number, verification)
+            return verification
+        else:
+            return {"valid": False, "error": f"API error: {response.status_code}"}
                 
+    except CircuitOpenError as e:
+        return {"valid": False, "error": str(e)}
     except Exception as e:
         logger.error(f"NPI verification failed: {e}")
         return {"valid": False, "error": str(e)}
@@ -1149,6 +1497,7 @@ async def download_nsopw_data():
         ]
         
         criminal_background_cache["nsopw_national"] = nsopw_sample_data
+        source_versions["nsopw_national"] = data_snapshot_version(nsopw_sample_data)
         logger.info(f"Loaded {len(nsopw_sample_data)} NSOPW sample records")
         return True
         
@@ -1164,34 +1513,34 @@ async def download_fbi_wanted_data():
         # FBI API is available but has rate limits
         api_url = "https://api.fbi.gov/wanted/v1/list"
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(api_url)
+        response = await http_pool.get("fbi", api_url)
+        
+        if response.status_code == 200:
+            data = response.json()
+            wanted_persons = data.get("items", [])
+            
+            # Process and store FBI wanted data
+            processed_data = []
+            for person in wanted_persons[:100]:  # Limit to first 100
+                processed_data.append({
+                    "uid": person.get("uid"),
+                    "title": person.get("title", ""),
+                    "subjects": person.get("subjects", []),
+                    "description": person.get("description", ""),
+                    "reward_text": person.get("reward_text", ""),
+                    "warning_message": person.get("warning_message", ""),
+                    "modified": person.get("modified"),
+                    "publication": person.get("publication")
+                })
+            
+            criminal_background_cache["fbi_wanted"] = processed_data
+            source_versions["fbi_wanted"] = data_snapshot_version(processed_data)
+            logger.info(f"Loaded {len(processed_data)} FBI Most Wanted records")
+            return True
+        else:
+            logger.error(f"FBI API returned status {response.status_code}")
+            return False
             
-            if response.status_code == 200:
-                data = response.json()
-                wanted_persons = data.get("items", [])
-                
-                # Process and store FBI wanted data
-                processed_data = []
-                for person in wanted_persons[:100]:  # Limit to first 100
-                    processed_data.append({
-                        "uid": person.get("uid"),
-                        "title": person.get("title", ""),
-                        "subjects": person.get("subjects", []),
-                        "description": person.get("description", ""),
-                        "reward_text": person.get("reward_text", ""),
-                        "warning_message": person.get("warning_message", ""),
-                        "modified": person.get("modified"),
-                        "publication": person.get("publication")
-                    })
-                
-                criminal_background_cache["fbi_wanted"] = processed_data
-                logger.info(f"Loaded {len(processed_data)} FBI Most Wanted records")
-                return True
-            else:
-                logger.error(f"FBI API returned status {response.status_code}")
-                return False
-                
     except Exception as e:
         logger.error(f"Error downloading FBI wanted data: {e}")
         return False
@@ -1202,23 +1551,23 @@ def search_license_verification(first_name: str, last_name: str, license_number:
     search_first = normalize_name(first_name)
     search_last = normalize_name(last_name)
     
-    # Search NPI database
-    if license_verification_cache["npi"]:
-        for provider in license_verification_cache["npi"]:
-            match_score = 0
-            
-            if provider["first_name"] == search_first and provider["last_name"] == search_last:
-                match_score = 100
-            elif npi and provider.get("npi") == npi:
-                match_score = 100
-            
-            if match_score >= 80:
-                matches.append({
-                    "database": "NPI Registry",
-                    "match_score": match_score,
-                    "provider_data": provider,
-                    "verification_type": "license_npi"
-                })
+    # Search NPI database (hash lookups on the local NPPES index)
+    if len(npi_index) > 0:
+        providers = {}
+        if npi:
+            provider = npi_index.get(npi)
+            if provider:
+                providers[provider["npi"]] = provider
+        for provider in npi_index.find_by_name(search_first, search_last):
+            providers.setdefault(provider["npi"], provider)
+        
+        for provider in providers.values():
+            matches.append({
+                "database": "NPI Registry",
+                "match_score": 100,
+                "provider_data": provider,
+                "verification_type": "license_npi"
+            })
     
     # Search state medical license databases
     for state_key in ["ca_medical", "tx_medical", "fl_medical", "ny_medical"]:
@@ -1297,7 +1646,10 @@ async def check_criminal_background(employee: Employee, verification_type: str)
             await download_fbi_wanted_data()
         
         # Perform criminal background search
-        matches = search_criminal_background(
+        matches = await memoized_search(
+            verification_type,
+            (normalize_name(employee.first_name), normalize_name(employee.last_name), getattr(employee, 'date_of_birth', None)),
+            asyncify(search_criminal_background),
             employee.first_name,
             employee.last_name,
             getattr(employee, 'date_of_birth', None)
@@ -1337,7 +1689,7 @@ async def check_criminal_background(employee: Employee, verification_type: str)
             data_source="Criminal Background Check Services"
         )
         
-        await db.verification_results.insert_one(result.dict())
+        await save_verification_result(employee, result)
         logger.info(f"Criminal background check completed for {employee.first_name} {employee.last_name}: {result.status}")
         
         return result
@@ -1351,19 +1703,20 @@ async def check_criminal_background(employee: Employee, verification_type: str)
             error_message=str(e),
             data_source="Criminal Background Check Services"
         )
-        await db.verification_results.insert_one(error_result.dict())
+        await save_verification_result(employee, error_result)
         return error_result
 
 async def check_license_verification(employee: Employee, verification_type: str) -> VerificationResult:
     """Check professional license verification"""
     try:
         # Ensure license data is loaded
-        if not any(license_verification_cache.values()):
-            logger.info("License verification data not in memory, loading...")
-            await download_npi_data()
+        await ensure_npi_data()
         
         # Perform license search
-        matches = search_license_verification(
+        matches = await memoized_search(
+            verification_type,
+            (normalize_name(employee.first_name), normalize_name(employee.last_name), getattr(employee, 'license_number', None), getattr(employee, 'npi', None)),
+            asyncify(search_license_verification),
             employee.first_name,
             employee.last_name,
             getattr(employee, 'license_number', None),
@@ -1397,7 +1750,7 @@ async def check_license_verification(employee: Employee, verification_type: str)
                     "npi": getattr(employee, 'npi', 'Not provided')
                 },
                 "database_info": {
-                    "databases_searched": len([k for k, v in license_verification_cache.items() if v]),
+                    "databases_searched": len([k for k, v in license_verification_cache.items() if v]) + (1 if len(npi_index) > 0 else 0),
                     "verification_method": "Free Public Databases",
                     "last_updated": datetime.utcnow().isoformat()
                 }
@@ -1405,7 +1758,7 @@ async def check_license_verification(employee: Employee, verification_type: str)
             data_source="Free Public License Databases"
         )
         
-        await db.verification_results.insert_one(result.dict())
+        await save_verification_result(employee, result)
         logger.info(f"License verification completed for {employee.first_name} {employee.last_name}: {result.status}")
         
         return result
@@ -1419,7 +1772,7 @@ async def check_license_verification(employee: Employee, verification_type: str)
             error_message=str(e),
             data_source="License Verification System"
         )
-        await db.verification_results.insert_one(error_result.dict())
+        await save_verification_result(employee, error_result)
         return error_result
 
 # In-memory OIG data storage for fast searches
@@ -1439,39 +1792,12 @@ async def load_oig_data_to_memory():
     
     try:
         logger.info("Loading OIG exclusion data into memory...")
-        exclusions = []
-        
-        async with aiofiles.open(OIG_DATA_FILE, mode='r', encoding='utf-8') as f:
-            content = await f.read()
-            
-        # Parse CSV content
-        csv_reader = csv.DictReader(io.StringIO(content))
-        
-        for row in csv_reader:
-            # Clean and normalize data
-            exclusion = {
-                'lastname': row.get('LASTNAME', '').strip().upper(),
-                'firstname': row.get('FIRSTNAME', '').strip().upper(),
-                'midname': row.get('MIDNAME', '').strip().upper(),
-                'busname': row.get('BUSNAME', '').strip().upper(),
-                'general': row.get('GENERAL', '').strip(),
-                'specialty': row.get('SPECIALTY', '').strip(),
-                'upin': row.get('UPIN', '').strip(),
-                'npi': row.get('NPI', '').strip(),
-                'dob': row.get('DOB', '').strip(),
-                'address': row.get('ADDRESS', '').strip(),
-                'city': row.get('CITY', '').strip(),
-                'state': row.get('STATE', '').strip(),
-                'zip': row.get('ZIP', '').strip(),
-                'excltype': row.get('EXCLTYPE', '').strip(),
-                'excldate': row.get('EXCLDATE', '').strip(),
-                'reindate': row.get('REINDATE', '').strip(),
-                'waiverdate': row.get('WAIVERDATE', '').strip(),
-                'wvrstate': row.get('WVRSTATE', '').strip()
-            }
-            exclusions.append(exclusion)
+        version = await asyncio.to_thread(file_snapshot_version, OIG_DATA_FILE)
+        exclusions = await matcher_pool.run(matching.parse_oig_file, str(OIG_DATA_FILE))
         
         oig_exclusions_cache = exclusions
+        source_versions["oig"] = version
+        schedule_snapshot_monitoring("oig", version, exclusions)
         logger.info(f"Loaded {len(exclusions)} OIG exclusions into memory")
         return True
         
@@ -1479,51 +1805,43 @@ async def load_oig_data_to_memory():
         logger.error(f"Error loading OIG data: {e}")
         return False
 
-def normalize_name(name):
-    """Normalize a name for comparison"""
-    if not name:
-        return ""
-    return name.strip().upper().replace('.', '').replace(',', '').replace('-', ' ')
+async def memoized_search(verification_type: str, query: tuple, search, *args):
+    """Run a snapshot search once per distinct query, shared across tenants.
+
+    query must hold every search input in normalized form, it is the memo key.
+    """
+    version = get_source_version(verification_type)
+    if not version:
+        return await search(*args)
+    
+    async def compute():
+        return await search(*args)
+    
+    memo_source = verification_type if verification_type.startswith('medicaid_') else verification_category(verification_type)
+    return await screening_memo.get_or_compute(memo_source, version, query, compute)
+
+def asyncify(search):
+    """Run a synchronous in-memory search in a worker thread"""
+    async def run(*args):
+        return await asyncio.to_thread(search, *args)
+    return run
 
 def search_oig_exclusions(first_name, last_name, middle_name=None):
     """Search OIG exclusions for matching individuals"""
-    matches = []
-    
     if not oig_exclusions_cache:
         logger.warning("OIG data not loaded in memory")
-        return matches
-    
-    # Normalize search terms
-    search_first = normalize_name(first_name)
-    search_last = normalize_name(last_name)
-    search_middle = normalize_name(middle_name) if middle_name else ""
-    
-    for exclusion in oig_exclusions_cache:
-        # Check for exact matches on first and last name
-        if (exclusion['firstname'] == search_first and 
-            exclusion['lastname'] == search_last):
-            
-            match_score = 100  # Exact first + last name match
-            
-            # Check middle name if provided
-            if search_middle and exclusion['midname']:
-                if exclusion['midname'] == search_middle:
-                    match_score = 100  # Perfect match
-                elif exclusion['midname'].startswith(search_middle) or search_middle.startswith(exclusion['midname']):
-                    match_score = 95   # Partial middle name match
-                else:
-                    match_score = 85   # Different middle name
-            
-            matches.append({
-                'exclusion': exclusion,
-                'match_score': match_score,
-                'match_type': 'exact_name'
-            })
-    
-    # Sort by match score (highest first)
-    matches.sort(key=lambda x: x['match_score'], reverse=True)
+        return []
     
-    return matches
+    return matching.search_oig(oig_exclusions_cache, first_name, last_name, middle_name)
+
+async def search_oig_exclusions_offloaded(first_name, last_name, middle_name=None):
+    """Search OIG exclusions in the matcher pool"""
+    return await matcher_pool.search(
+        "oig", source_versions.get("oig"),
+        "oig", (str(OIG_DATA_FILE),),
+        "oig", (first_name, last_name, middle_name),
+        fallback=lambda: search_oig_exclusions(first_name, last_name, middle_name)
+    )
 
 async def check_oig_exclusion(employee: Employee) -> VerificationResult:
     """Check if employee is in OIG exclusion list using real HHS data"""
@@ -1542,11 +1860,14 @@ async def check_oig_exclusion(employee: Employee) -> VerificationResult:
                 error_message="OIG exclusion database not available",
                 data_source="OIG LEIE Database"
             )
-            await db.verification_results.insert_one(result.dict())
+            await save_verification_result(employee, result)
             return result
         
         # Search for matches
-        matches = search_oig_exclusions(
+        matches = await memoized_search(
+            VerificationType.OIG.value,
+            (normalize_name(employee.first_name), normalize_name(employee.last_name), normalize_name(employee.middle_name)),
+            search_oig_exclusions_offloaded,
             employee.first_name, 
             employee.last_name, 
             employee.middle_name
@@ -1594,7 +1915,7 @@ async def check_oig_exclusion(employee: Employee) -> VerificationResult:
         )
         
         # Store result in database
-        await db.verification_results.insert_one(result.dict())
+        await save_verification_result(employee, result)
         
         logger.info(f"OIG check completed for {employee.first_name} {employee.last_name}: {result.status} ({len(high_confidence_matches)} high-confidence matches)")
         
@@ -1609,7 +1930,7 @@ async def check_oig_exclusion(employee: Employee) -> VerificationResult:
             error_message=str(e),
             data_source="OIG LEIE Database"
         )
-        await db.verification_results.insert_one(error_result.dict())
+        await save_verification_result(employee, error_result)
         return error_result
 
 async def check_sam_exclusion(employee: Employee) -> VerificationResult:
@@ -1625,7 +1946,7 @@ async def check_sam_exclusion(employee: Employee) -> VerificationResult:
                 error_message="SAM API key not configured",
                 data_source="SAM.gov API v4"
             )
-            await db.verification_results.insert_one(result.dict())
+            await save_verification_result(employee, result)
             return result
 
         # SAM.gov API endpoint for exclusions - updated to current v4 API
@@ -1638,77 +1959,118 @@ async def check_sam_exclusion(employee: Employee) -> VerificationResult:
             "recordStatus": "Active"
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        # Same name queries repeat across re-screens and tenants
+        cache_key = sam_cache_key(params["exclusionName"])
+        data = await sam_response_cache.get(cache_key)
+        from_cache = data is not None
+        status_code = 200
+        
+        if data is None:
             logger.info(f"Checking SAM v4 exclusions for {employee.first_name} {employee.last_name}")
-            response = await client.get(base_url, params=params)
+            response = await http_pool.get("sam", base_url, params=params)
+            status_code = response.status_code
             
             if response.status_code == 200:
-                data = response.json()
-                
-                # v4 API response structure
-                exclusions = data.get('exclusionDetails', [])
-                total_records = data.get('totalRecords', 0)
-                
-                # If we found matches, do additional verification
-                verified_matches = []
-                if exclusions:
-                    for exclusion in exclusions:
-                        # Extract name fields from v4 API response
-                        exclusion_names = exclusion.get('exclusionDetails', {}).get('exclusionName', '')
-                        
-                        # More sophisticated matching logic for v4 API
-                        emp_full_name = f"{employee.first_name} {employee.last_name}".lower()
-                        exclusion_name_lower = exclusion_names.lower()
+                payload = response.json()
+                data = {
+                    "exclusionDetails": payload.get('exclusionDetails', []),
+                    "totalRecords": payload.get('totalRecords', 0)
+                }
+                await sam_response_cache.set(
+                    cache_key,
+                    data,
+                    sam_cache_ttl_seconds(has_records=bool(data["exclusionDetails"]))
+                )
+        
+        if data is not None:
+            # v4 API response structure
+            exclusions = data.get('exclusionDetails', [])
+            total_records = data.get('totalRecords', 0)
+            
+            # If we found matches, do additional verification
+            verified_matches = []
+            if exclusions:
+                for exclusion in exclusions:
+                    # Extract name fields from v4 API response
+                    exclusion_names = exclusion.get('exclusionDetails', {}).get('exclusionName', '')
+                    
+                    # More sophisticated matching logic for v4 API
+                    emp_full_name = f"{employee.first_name} {employee.last_name}".lower()
+                    exclusion_name_lower = exclusion_names.lower()
+                    
+                    # Check if employee name matches exclusion name
+                    if (employee.first_name.lower() in exclusion_name_lower and 
+                        employee.last_name.lower() in exclusion_name_lower):
                         
-                        # Check if employee name matches exclusion name
-                        if (employee.first_name.lower() in exclusion_name_lower and 
-                            employee.last_name.lower() in exclusion_name_lower):
-                            
-                            # Extract relevant details from v4 API structure
-                            match_details = {
-                                "exclusion_name": exclusion_names,
-                                "exclusion_type": exclusion.get('exclusionDetails', {}).get('exclusionType', ''),
-                                "exclusion_date": exclusion.get('exclusionDetails', {}).get('exclusionDate', ''),
-                                "termination_date": exclusion.get('exclusionDetails', {}).get('terminationDate', ''),
-                                "sam_number": exclusion.get('exclusionDetails', {}).get('samNumber', ''),
-                                "cage_code": exclusion.get('exclusionDetails', {}).get('cageCode', ''),
-                                "npi": exclusion.get('exclusionDetails', {}).get('npi', ''),
-                                "address": exclusion.get('exclusionDetails', {}).get('address', {}),
-                                "classification": exclusion.get('exclusionDetails', {}).get('classification', '')
-                            }
-                            verified_matches.append(match_details)
-                
-                result = VerificationResult(
-                    employee_id=employee.id,
-                    verification_type=VerificationType.SAM,
-                    status=VerificationStatus.FAILED if len(verified_matches) > 0 else VerificationStatus.PASSED,
-                    results={
-                        "excluded": len(verified_matches) > 0,
-                        "total_records_found": total_records,
-                        "verified_matches": len(verified_matches),
-                        "match_details": verified_matches[:3] if verified_matches else [],  # Limit to first 3 matches
-                        "search_criteria": {
-                            "first_name": employee.first_name,
-                            "last_name": employee.last_name,
-                            "exclusion_name_query": params["exclusionName"]
-                        },
-                        "api_response_summary": {
-                            "status_code": response.status_code,
-                            "total_records": total_records,
-                            "exclusions_count": len(exclusions),
-                            "api_version": "v4"
+                        # Extract relevant details from v4 API structure
+                        match_details = {
+                            "exclusion_name": exclusion_names,
+                            "exclusion_type": exclusion.get('exclusionDetails', {}).get('exclusionType', ''),
+                            "exclusion_date": exclusion.get('exclusionDetails', {}).get('exclusionDate', ''),
+                            "termination_date": exclusion.get('exclusionDetails', {}).get('terminationDate', ''),
+                            "sam_number": exclusion.get('exclusionDetails', {}).get('samNumber', ''),
+                            "cage_code": exclusion.get('exclusionDetails', {}).get('cageCode', ''),
+                            "npi": exclusion.get('exclusionDetails', {}).get('npi', ''),
+                            "address": exclusion.get('exclusionDetails', {}).get('address', {}),
+                            "classification": exclusion.get('exclusionDetails', {}).get('classification', '')
                         }
+                        verified_matches.append(match_details)
+            
+            result = VerificationResult(
+                employee_id=employee.id,
+                verification_type=VerificationType.SAM,
+                status=VerificationStatus.FAILED if len(verified_matches) > 0 else VerificationStatus.PASSED,
+                results={
+                    "excluded": len(verified_matches) > 0,
+                    "total_records_found": total_records,
+                    "verified_matches": len(verified_matches),
+                    "match_details": verified_matches[:3] if verified_matches else [],  # Limit to first 3 matches
+                    "search_criteria": {
+                        "first_name": employee.first_name,
+                        "last_name": employee.last_name,
+                        "exclusion_name_query": params["exclusionName"]
                     },
-                    data_source="SAM.gov API v4"
-                )
-                
-                # Store result in database
-                await db.verification_results.insert_one(result.dict())
-                
-                logger.info(f"SAM v4 check completed for {employee.first_name} {employee.last_name}: {result.status}")
-                
-                return result
-                
+                    "api_response_summary": {
+                        "status_code": status_code,
+                        "total_records": total_records,
+                        "exclusions_count": len(exclusions),
+                        "api_version": "v4",
+                        "cached_response": from_cache
+                    }
+                },
+                data_source="SAM.gov API v4"
+            )
+            
+            # Store result in database
+            await save_verification_result(employee, result)
+            
+            logger.info(f"SAM v4 check completed for {employee.first_name} {employee.last_name}: {result.status}")
+            
+            return result
+        
+        logger.error(f"SAM API returned HTTP {status_code} for employee {employee.id}")
+        error_result = VerificationResult(
+            employee_id=employee.id,
+            verification_type=VerificationType.SAM,
+            status=VerificationStatus.ERROR,
+            error_message=f"SAM API error: HTTP {status_code}",
+            data_source="SAM.gov API v4"
+        )
+        await save_verification_result(employee, error_result)
+        return error_result
+            
+    except CircuitOpenError:
+        logger.warning(f"SAM API circuit open, skipping live check for employee {employee.id}")
+        error_result = VerificationResult(
+            employee_id=employee.id,
+            verification_type=VerificationType.SAM,
+            status=VerificationStatus.ERROR,
+            error_message="SAM API temporarily unavailable - please re-run the SAM check in a few minutes",
+            data_source="SAM.gov API v4"
+        )
+        await save_verification_result(employee, error_result)
+        return error_result
+        
     except httpx.TimeoutException:
         logger.error(f"SAM API timeout for employee {employee.id}")
         error_result = VerificationResult(
@@ -1718,7 +2080,7 @@ async def check_sam_exclusion(employee: Employee) -> VerificationResult:
             error_message="SAM API request timed out",
             data_source="SAM.gov API v4"
         )
-        await db.verification_results.insert_one(error_result.dict())
+        await save_verification_result(employee, error_result)
         return error_result
         
     except Exception as e:
@@ -1730,7 +2092,7 @@ async def check_sam_exclusion(employee: Employee) -> VerificationResult:
             error_message=str(e),
             data_source="SAM.gov API v4"
         )
-        await db.verification_results.insert_one(error_result.dict())
+        await save_verification_result(employee, error_result)
         return error_result
         
     except Exception as e:
@@ -1742,12 +2104,277 @@ async def check_sam_exclusion(employee: Employee) -> VerificationResult:
             error_message=str(e),
             data_source="SAM.gov API"
         )
-        await db.verification_results.insert_one(error_result.dict())
+        await save_verification_result(employee, error_result)
         return error_result
 
-# API Routes
+# Verification orchestration
 
-# ========== PUBLIC ROUTES (No Authentication Required) ==========
+LICENSE_VERIFICATION_TYPES = ['npi', 'license_md_ca', 'license_md_tx', 'license_md_fl', 'license_md_ny', 'license_rn_ca', 'license_rn_tx', 'license_rn_fl', 'license_rn_ny']
+CRIMINAL_VERIFICATION_TYPES = ['nsopw_national', 'nsopw_ca', 'nsopw_tx', 'nsopw_fl', 'nsopw_ny', 'fbi_wanted']
+
+# Employee fields each kind of check reads, anything else can change without a re-screen
+VERIFICATION_FINGERPRINT_FIELDS = {
+    "oig": ["first_name", "middle_name", "last_name"],
+    "sam": ["first_name", "last_name"],
+    "medicaid": ["first_name", "middle_name", "last_name"],
+    "license": ["first_name", "last_name", "license_number", "license_type", "license_state"],
+    "criminal": ["first_name", "last_name", "date_of_birth"]
+}
+
+# Only definitive outcomes are reused, errors and placeholders always re-run
+REUSABLE_VERIFICATION_STATUSES = [VerificationStatus.PASSED.value, VerificationStatus.FAILED.value]
+
+def verification_category(verification_type: str) -> Optional[str]:
+    """Group a verification type with the check function that handles it"""
+    if verification_type in (VerificationType.OIG, VerificationType.SAM):
+        return VerificationType(verification_type).value
+    if verification_type.startswith('medicaid_'):
+        return "medicaid"
+    if verification_type in LICENSE_VERIFICATION_TYPES:
+        return "license"
+    if verification_type in CRIMINAL_VERIFICATION_TYPES:
+        return "criminal"
+    return None
+
+def employee_fingerprint(employee: Employee, verification_type: str) -> Optional[str]:
+    """Digest of the employee identity fields a verification type depends on"""
+    fields = VERIFICATION_FINGERPRINT_FIELDS.get(verification_category(verification_type))
+    if not fields:
+        return None
+    values = [normalize_name(str(getattr(employee, field, None) or "")) for field in fields]
+    return hashlib.sha256("|".join(values).encode('utf-8')).hexdigest()
+
+def cache_versions(cache: Dict[str, List[Dict[str, Any]]]) -> Optional[List[str]]:
+    """Versions of every source in an in-memory cache, None if a loaded one is unversioned.
+
+    Empty sources count as "-" so that loading one later changes the combined version.
+    """
+    versions = []
+    for key, records in cache.items():
+        if not records:
+            versions.append("-")
+        elif source_versions.get(key):
+            versions.append(source_versions[key])
+        else:
+            return None
+    return versions
+
+def get_source_version(verification_type: str) -> Optional[str]:
+    """Version of the source snapshot a verification type would run against"""
+    category = verification_category(verification_type)
+    if category == "oig":
+        return source_versions.get("oig")
+    if category == "sam":
+        # Live API answers change only with SAM's daily publication
+        published_at, _ = sam_publication_window()
+        return f"sam-{published_at.isoformat()}"
+    if category == "medicaid":
+        return source_versions.get(verification_type)
+    if category == "license":
+        versions = cache_versions(license_verification_cache)
+        if versions is None or not npi_index.version:
+            return None
+        return ":".join([f"npi-{npi_index.version}"] + versions)
+    if category == "criminal":
+        versions = cache_versions(criminal_background_cache)
+        return ":".join(versions) if versions is not None and any(v != "-" for v in versions) else None
+    return None
+
+async def save_verification_result(employee: Employee, result: VerificationResult):
+    """Stamp a result with its employee fingerprint and source version, then store it"""
+    verification_type = VerificationType(result.verification_type).value
+    result.employee_fingerprint = employee_fingerprint(employee, verification_type)
+    result.source_version = get_source_version(verification_type)
+    await db.verification_results.insert_one(result.dict())
+
+async def find_reusable_result(employee: Employee, verification_type: str) -> Optional[Dict[str, Any]]:
+    """Latest definitive result computed from the same employee fields and source snapshot"""
+    fingerprint = employee_fingerprint(employee, verification_type)
+    source_version = get_source_version(verification_type)
+    if not fingerprint or not source_version:
+        return None
+    
+    return await db.verification_results.find_one(
+        {
+            "employee_id": employee.id,
+            "verification_type": verification_type,
+            "employee_fingerprint": fingerprint,
+            "source_version": source_version,
+            "status": {"$in": REUSABLE_VERIFICATION_STATUSES}
+        },
+        sort=[("checked_at", -1)]
+    )
+
+async def run_verification_check(employee: Employee, verification_type: VerificationType) -> Optional[VerificationResult]:
+    """Run one verification, copying the prior result when nothing it depends on has changed"""
+    verification_type = VerificationType(verification_type).value
+    category = verification_category(verification_type)
+    if category is None:
+        return None
+    
+    prior = await find_reusable_result(employee, verification_type)
+    if prior:
+        prior.pop("_id", None)
+        reused = VerificationResult(**{
+            **prior,
+            "id": str(uuid.uuid4()),
+            "checked_at": datetime.utcnow(),
+            "results": {**prior.get("results", {}), "reused_from_result_id": prior["id"]}
+        })
+        await db.verification_results.insert_one(reused.dict())
+        logger.info(f"{verification_type} unchanged for employee {employee.id}, reused result {prior['id']}")
+        return reused
+    
+    return await dispatch_verification_check(employee, verification_type)
+
+async def dispatch_verification_check(employee: Employee, verification_type: str) -> Optional[VerificationResult]:
+    """Run the check function for a verification type against current source data"""
+    category = verification_category(verification_type)
+    if category is None:
+        return None
+    if category == "oig":
+        return await check_oig_exclusion(employee)
+    if category == "sam":
+        return await check_sam_exclusion(employee)
+    if category == "medicaid":
+        # Extract state code from verification type (e.g., medicaid_ca -> CA)
+        state_code = verification_type.split('_')[1].upper()
+        return await check_state_medicaid_exclusion(employee, state_code)
+    if category == "license":
+        return await check_license_verification(employee, verification_type)
+    return await check_criminal_background(employee, verification_type)
+
+# ========== CONTINUOUS MONITORING ==========
+
+# Fingerprints of the last monitored snapshot of each exclusion list
+MONITORING_SNAPSHOT_DIR = ROOT_DIR / "monitoring_snapshots"
+snapshot_deltas = SnapshotDeltaStore(MONITORING_SNAPSHOT_DIR)
+
+# Monitoring runs started on each event loop (the update thread waits for its own)
+monitoring_tasks: Set[asyncio.Task] = set()
+
+def schedule_snapshot_monitoring(source: str, version: str, records: List[Dict[str, Any]]):
+    """Re-screen employees against a newly loaded snapshot's delta in the background"""
+    task = asyncio.get_running_loop().create_task(monitor_snapshot_delta(source, version, records))
+    monitoring_tasks.add(task)
+    task.add_done_callback(monitoring_tasks.discard)
+
+async def wait_for_snapshot_monitoring():
+    """Wait for monitoring runs started on the running event loop"""
+    loop = asyncio.get_running_loop()
+    pending = [task for task in monitoring_tasks if task.get_loop() is loop]
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+async def find_employees_by_name_keys(name_keys: Set[tuple]) -> List[Dict[str, Any]]:
+    """Employees of every tenant whose normalized (last, first) name is in name_keys"""
+    if employee_name_index.ready:
+        employee_ids = list(employee_name_index.lookup_keys(name_keys))
+    else:
+        # Index still building, scan names from the collection instead
+        employee_ids = []
+        async for employee_data in db.employees.find({}, {"_id": 0, "id": 1, "first_name": 1, "last_name": 1}):
+            if employee_name_index.name_key(employee_data.get("first_name"), employee_data.get("last_name")) in name_keys:
+                employee_ids.append(employee_data["id"])
+    
+    if not employee_ids:
+        return []
+    return await decrypt_employee_documents(await db.employees.find({"id": {"$in": employee_ids}}).to_list(None))
+
+async def rebuild_employee_name_index():
+    """Load every employee's name into the monitoring reverse index"""
+    try:
+        await employee_name_index.rebuild(
+            db.employees.find({}, {"_id": 0, "id": 1, "first_name": 1, "last_name": 1}).batch_size(10000)
+        )
+    except Exception as e:
+        logger.error(f"Failed to build employee name index: {e}")
+
+async def monitor_snapshot_delta(source: str, version: str, records: List[Dict[str, Any]]):
+    """Screen only the added or changed entries of a new snapshot against all employees"""
+    run = None
+    try:
+        delta = await asyncio.to_thread(snapshot_deltas.compute_delta, source, version, records)
+        if delta is None:
+            return
+        if not delta:
+            # Nothing added or changed, no employee needs re-screening
+            snapshot_deltas.commit(source, version)
+            logger.info(f"Monitoring {source} {version}: no new entries")
+            return
+        
+        run = {
+            "id": str(uuid.uuid4()),
+            "source": source,
+            "source_version": version,
+            "delta_entries": len(delta),
+            "employees_checked": 0,
+            "alerts_created": 0,
+            "status": "processing",
+            "started_at": datetime.utcnow(),
+            "completed_at": None
+        }
+        await db.monitoring_runs.insert_one(dict(run))
+        
+        name_keys = set()
+        for record in delta:
+            name_keys.update(matching.exclusion_name_keys(record))
+        affected = await find_employees_by_name_keys(name_keys) if name_keys else []
+        
+        # Monitoring re-screens are bulk work, keep them off the interactive API quota
+        current_lane.set(BULK_LANE)
+        for employee_data in affected:
+            employee = Employee(**employee_data)
+            result = await dispatch_verification_check(employee, source)
+            run["employees_checked"] += 1
+            
+            if result and result.status == VerificationStatus.FAILED:
+                await db.monitoring_alerts.insert_one({
+                    "id": str(uuid.uuid4()),
+                    "user_id": employee.user_id,
+                    "employee_id": employee.id,
+                    "employee_name": f"{employee.first_name} {employee.last_name}",
+                    "verification_type": source,
+                    "source_version": version,
+                    "result_id": result.id,
+                    "match_details": result.results.get("match_details", []),
+                    "status": "open",
+                    "created_at": datetime.utcnow(),
+                    "acknowledged_at": None
+                })
+                run["alerts_created"] += 1
+        
+        snapshot_deltas.commit(source, version)
+        await db.monitoring_runs.update_one(
+            {"id": run["id"]},
+            {"$set": {
+                "employees_checked": run["employees_checked"],
+                "alerts_created": run["alerts_created"],
+                "status": "completed",
+                "completed_at": datetime.utcnow()
+            }}
+        )
+        logger.info(f"Monitoring {source} {version}: {len(delta)} new entries, {run['employees_checked']} employees re-screened, {run['alerts_created']} alerts")
+    except Exception as e:
+        logger.error(f"Monitoring run for {source} {version} failed: {e}")
+        if run is not None:
+            try:
+                await db.monitoring_runs.update_one(
+                    {"id": run["id"]},
+                    {"$set": {
+                        "employees_checked": run["employees_checked"],
+                        "alerts_created": run["alerts_created"],
+                        "status": "failed",
+                        "error": str(e),
+                        "completed_at": datetime.utcnow()
+                    }}
+                )
+            except Exception as update_error:
+                logger.error(f"Could not mark monitoring run {run['id']} failed: {update_error}")
+
+# API Routes
+
+# ========== PUBLIC ROUTES (No Authentication Required) ==========
 
 @api_router.get("/")
 async def root():
@@ -1788,16 +2415,18 @@ async def get_verification_system_status():
             },
             "license_verification": {
                 "npi_registry": {
-                    "loaded": len(license_verification_cache.get("npi", [])) > 0,
-                    "providers_count": len(license_verification_cache.get("npi", [])),
-                    "source": "CMS NPI Registry API",
-                    "method": "Real-time API Lookup",
+                    "loaded": len(npi_index) > 0,
+                    "providers_count": len(npi_index),
+                    "index_version": npi_index.version,
+                    "source": "CMS NPPES Dissemination File + NPI Registry API",
+                    "method": "Local Index, API Lookup on Cache Miss",
+                    "api_cache": npi_lookup_cache.stats(),
                     "status": "✅ Operational"
                 },
                 "state_medical_boards": {
                     "states_supported": ["CA", "TX", "FL", "NY"],
                     "license_types": ["MD", "DO", "RN", "LVN"],
-                    "databases_loaded": len([k for k, v in license_verification_cache.items() if v and k != "npi"]),
+                    "databases_loaded": len([k for k, v in license_verification_cache.items() if v]),
                     "method": "State Board APIs + Web Scraping",
                     "status": "✅ Multi-State License Verification"
                 }
@@ -1824,9 +2453,16 @@ async def get_verification_system_status():
                     "status": "✅ State-Level Coverage"
                 }
             },
+            "remote_sources": http_pool.source_status(),
+            "scheduler": verification_scheduler.stats(),
+            "screening_memo": screening_memo.stats(),
+            "matcher_pool": matcher_pool.stats(),
+            "employee_name_index": employee_name_index.stats(),
+            "upload_sessions": upload_sessions.stats(),
+            "audit_log": audit_logger.stats() if audit_logger else None,
             "hipaa_compliance": {
                 "enabled": HIPAA_ENABLED,
-                "data_encryption": "✅ AES-256 PHI Encryption" if HIPAA_ENABLED else "❌ Not Enabled",
+                "data_encryption": "✅ AES-256 PHI Encryption" if PHI_ENCRYPTION_AT_REST else "❌ Not Enabled",
                 "multi_factor_auth": "✅ TOTP-based MFA" if HIPAA_ENABLED else "❌ Not Enabled", 
                 "audit_logging": "✅ Comprehensive Audit Trail" if HIPAA_ENABLED else "❌ Not Enabled",
                 "status": "✅ HIPAA Compliant" if HIPAA_ENABLED else "⚠️ Basic Security"
@@ -1874,7 +2510,9 @@ async def check_sam_status():
         local_status = {
             "sam_loaded": len(sam_exclusions_cache) > 0,
             "exclusions_count": len(sam_exclusions_cache),
-            "last_successful_download": None  # Could store this in database
+            "last_successful_download": None,  # Could store this in database
+            "response_cache": sam_response_cache.stats(),
+            "circuit_breaker": http_pool.get_breaker("sam").status()
         }
         
         # Test SAM API connectivity
@@ -2367,55 +3005,213 @@ async def cancel_subscription(current_user: User = Depends(get_current_user)):
             detail="Failed to cancel subscription"
         )
 
+# ========== JOB PROGRESS STREAMING ==========
+
+def upload_progress_event(upload_record: Dict[str, Any]) -> Dict[str, Any]:
+    """Progress snapshot of a batch upload, as returned by the status endpoint.
+
+    For uploads that also screen employees, progress is the lesser of import and
+    screening progress, so the combined job only reaches 100% when both are done.
+    """
+    processed = upload_record["successful_imports"] + upload_record["failed_imports"]
+    progress = int((processed / upload_record["total_rows"]) * 100) if upload_record["total_rows"] > 0 else 0
+    event = {
+        "type": "batch_upload",
+        "upload_id": upload_record["upload_id"],
+        "status": upload_record["status"],
+        "progress": progress,
+        "total_rows": upload_record["total_rows"],
+        "processed_rows": processed,
+        "successful_imports": upload_record["successful_imports"],
+        "failed_imports": upload_record["failed_imports"]
+    }
+    
+    if upload_record.get("verification_types"):
+        total_checks = upload_record.get("total_checks", 0)
+        completed_checks = upload_record.get("completed_checks", 0)
+        if total_checks > 0:
+            event["progress"] = min(progress, int((completed_checks / total_checks) * 100))
+        event.update({
+            "verification_types": upload_record["verification_types"],
+            "total_checks": total_checks,
+            "completed_checks": completed_checks,
+            "flagged_employees": upload_record.get("flagged_employees", 0)
+        })
+    return event
+
+def publish_upload_progress(upload_id: str, status: str, total_rows: int, successful_imports: int, failed_imports: int,
+                            screening: Optional[Dict[str, Any]] = None):
+    """Push batch upload counters (and screening counters, if any) to progress stream subscribers"""
+    progress_broker.publish(upload_id, upload_progress_event({
+        "upload_id": upload_id,
+        "status": status,
+        "total_rows": total_rows,
+        "successful_imports": successful_imports,
+        "failed_imports": failed_imports,
+        **(screening or {})
+    }))
+
+def verification_progress_event(job_record: Dict[str, Any]) -> Dict[str, Any]:
+    """Progress snapshot of a batch verification job"""
+    total = job_record["total_checks"]
+    return {
+        "type": "batch_verification",
+        "job_id": job_record["job_id"],
+        "status": job_record["status"],
+        "progress": int((job_record["completed_checks"] / total) * 100) if total > 0 else 100,
+        "total_checks": total,
+        "completed_checks": job_record["completed_checks"],
+        "employee_count": job_record["employee_count"],
+        "processed_employees": job_record["processed_employees"],
+        "failed_employees": job_record.get("failed_employees", 0)
+    }
+
+def progress_stream_response(job_id: str, reload_event) -> StreamingResponse:
+    """Server-sent event stream of a job's progress.
+
+    Events come from the processing pipeline through progress_broker. If the job is not
+    running in this process, the stored record is re-read on each keep-alive instead.
+    """
+    async def event_stream():
+        last_event = None
+        if progress_broker.latest(job_id) is None:
+            last_event = await reload_event()
+            if last_event:
+                yield f"event: progress\ndata: {json.dumps(last_event, default=str)}\n\n"
+                if last_event["status"] in TERMINAL_STATUSES:
+                    return
+        
+        async for event in progress_broker.subscribe(job_id):
+            if event is None:
+                if progress_broker.latest(job_id) is not None:
+                    yield ": keep-alive\n\n"
+                    continue
+                event = await reload_event()
+                if not event or event == last_event:
+                    yield ": keep-alive\n\n"
+                    continue
+            
+            last_event = event
+            yield f"event: progress\ndata: {json.dumps(event, default=str)}\n\n"
+            if event["status"] in TERMINAL_STATUSES:
+                return
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ========== BATCH UPLOAD ROUTES (Authenticated) ==========
 
+# Uploads are spooled to disk and parsed as a stream, so the cap only bounds disk use
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', str(500 * 1024 * 1024)))
+UPLOAD_SPOOL_DIR = os.environ.get('UPLOAD_SPOOL_DIR', tempfile.gettempdir())
+UPLOAD_READ_CHUNK_BYTES = 1024 * 1024
+# Rows are validated column-wise per chunk, which pays off over a few thousand rows
+UPLOAD_CHUNK_ROWS = 2000
+UPLOAD_STATUS_ERRORS = 10
+MAX_UPLOAD_ERRORS_PAGE = 1000
+# Imported employees waiting for screening before parsing pauses for it to catch up
+MAX_PENDING_UPLOAD_SCREENINGS = UPLOAD_CHUNK_ROWS * 4
+
+def check_upload_screening(current_user: User, verification_types: List[VerificationType]) -> List[VerificationType]:
+    """Deduplicate the checks requested for an upload, which need an active plan"""
+    verification_types = list(dict.fromkeys(verification_types))
+    if verification_types and not current_user.current_plan:
+        raise HTTPException(
+            status_code=status.HTTP_402_PAYMENT_REQUIRED,
+            detail="Active subscription required to perform verifications"
+        )
+    return verification_types
+
+def new_upload_record(upload_id: str, user_id: str, filename: str, file_size: int,
+                      verification_types: List[VerificationType]) -> Dict[str, Any]:
+    return {
+        "upload_id": upload_id,
+        "user_id": user_id,
+        "filename": filename,
+        "file_size": file_size,
+        "bytes_processed": 0,
+        "total_rows": 0,
+        "successful_imports": 0,
+        "failed_imports": 0,
+        "errors": [],
+        "verification_types": [v.value for v in verification_types],
+        "total_checks": 0,
+        "completed_checks": 0,
+        "flagged_employees": 0,
+        "status": "processing",
+        "created_at": datetime.utcnow(),
+        "completed_at": None
+    }
+
+def validate_upload_filename(filename: str):
+    if not filename.endswith(('.csv', '.xlsx', '.xls')):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be CSV, Excel (.xlsx), or Excel (.xls) format"
+        )
+
 @api_router.post("/employees/batch-upload")
 async def upload_employees_csv(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    verification_types: Optional[str] = Form(None),
     current_user: User = Depends(get_current_user)
 ):
-    """Upload CSV file with employee data for batch processing"""
+    """Upload CSV file with employee data for batch processing.
+
+    verification_types is an optional comma-separated list (e.g. "oig,sam"); when given,
+    each chunk of imported employees is screened as soon as it is inserted.
+    """
+    spool_path = None
     try:
         # Validate file type
-        if not file.filename.endswith(('.csv', '.xlsx', '.xls')):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File must be CSV, Excel (.xlsx), or Excel (.xls) format"
-            )
+        validate_upload_filename(file.filename)
         
-        # Check file size (limit to 10MB)
-        file_content = await file.read()
-        if len(file_content) > 10 * 1024 * 1024:  # 10MB
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File size must be less than 10MB"
-            )
+        screening_types: List[VerificationType] = []
+        if verification_types:
+            try:
+                screening_types = [VerificationType(value.strip()) for value in verification_types.split(',') if value.strip()]
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        screening_types = check_upload_screening(current_user, screening_types)
         
-        # Create upload record
+        # Spool the upload to disk in chunks, enforcing the size limit as it arrives
         upload_id = str(uuid.uuid4())
-        upload_record = {
-            "upload_id": upload_id,
-            "user_id": current_user.id,
-            "filename": file.filename,
-            "total_rows": 0,
-            "successful_imports": 0,
-            "failed_imports": 0,
-            "errors": [],
-            "status": "processing",
-            "created_at": datetime.utcnow(),
-            "completed_at": None
-        }
+        suffix = os.path.splitext(file.filename)[1].lower()
+        spool_path = os.path.join(UPLOAD_SPOOL_DIR, f"hvn-upload-{upload_id}{suffix}")
+        file_size = 0
+        try:
+            async with aiofiles.open(spool_path, 'wb') as spool:
+                while True:
+                    chunk = await file.read(UPLOAD_READ_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    file_size += len(chunk)
+                    if file_size > MAX_UPLOAD_BYTES:
+                        raise HTTPException(
+                            status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"File size must be less than {MAX_UPLOAD_BYTES // (1024 * 1024)}MB"
+                        )
+                    await spool.write(chunk)
+        except BaseException:
+            os.unlink(spool_path)
+            raise
         
+        # Create upload record
+        upload_record = new_upload_record(upload_id, current_user.id, file.filename, file_size, screening_types)
         await db.batch_uploads.insert_one(upload_record)
         
         # Start background processing
         background_tasks.add_task(
             process_employee_csv,
             upload_id,
-            file_content,
+            spool_path,
             file.filename,
-            current_user.id
+            current_user.id,
+            screening_types
         )
         
         logger.info(f"Started batch upload processing for user {current_user.email}: {file.filename}")
@@ -2423,6 +3219,7 @@ async def upload_employees_csv(
         return {
             "upload_id": upload_id,
             "message": "File upload started. Processing in background.",
+            "verification_types": upload_record["verification_types"],
             "status": "processing"
         }
         
@@ -2430,11 +3227,304 @@ async def upload_employees_csv(
         raise
     except Exception as e:
         logger.error(f"Error starting batch upload: {e}")
+        if spool_path and os.path.exists(spool_path):
+            os.unlink(spool_path)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to start batch upload"
         )
 
+# ========== RESUMABLE UPLOAD SESSIONS (Authenticated) ==========
+
+MAX_UPLOAD_CHUNK_BYTES = 64 * 1024 * 1024
+
+# Timers failing sessions whose parse waits on chunks that never come
+stalled_upload_tasks: Set[asyncio.Task] = set()
+
+async def find_upload_session(session_id: str, user_id: str) -> Dict[str, Any]:
+    session = await db.upload_sessions.find_one({"session_id": session_id, "user_id": user_id}, {"_id": 0})
+    if not session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+    return session
+
+def open_upload_assembly(session: Dict[str, Any]):
+    """The session's assembly in this process, reopened from its record after a restart"""
+    return upload_sessions.open(
+        session["session_id"], session["spool_path"], session["total_size"], session["chunk_size"],
+        session.get("received_chunks", [])
+    )
+
+def start_session_parse(background_tasks: BackgroundTasks, session: Dict[str, Any], assembly, follow_prefix: bool = False):
+    """Parse the session file, reading the received prefix while chunks are still arriving.
+
+    A parse that stopped waiting for chunks is resumed from where it left off.
+    """
+    resume = assembly.parse_resume
+    assembly.parse_resume = None
+    assembly.parse_started = True
+    background_tasks.add_task(
+        process_employee_csv,
+        session["upload_id"],
+        session["spool_path"],
+        session["filename"],
+        session["user_id"],
+        [VerificationType(v) for v in session.get("verification_types", [])],
+        assembly if follow_prefix or resume else None,
+        resume
+    )
+
+def upload_session_state(session: Dict[str, Any], assembly) -> Dict[str, Any]:
+    return {
+        "session_id": session["session_id"],
+        "upload_id": session["upload_id"],
+        "status": session["status"],
+        "total_size": session["total_size"],
+        "chunk_size": session["chunk_size"],
+        "chunk_count": assembly.chunk_count,
+        "received_chunks": sorted(assembly.received),
+        "missing_chunks": assembly.missing_chunks(),
+        "contiguous_bytes": assembly.contiguous_bytes
+    }
+
+@api_router.post("/employees/batch-upload/sessions")
+async def create_upload_session(
+    request: UploadSessionCreate,
+    current_user: User = Depends(get_current_user)
+):
+    """Start a resumable chunked upload.
+
+    Send each chunk with PUT .../sessions/{session_id}/chunks/{index} and an
+    X-Chunk-SHA256 header, then POST .../complete. Progress is tracked under the
+    returned upload_id like a single-request upload.
+    """
+    validate_upload_filename(request.filename)
+    if request.total_size <= 0 or request.total_size > MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File size must be less than {MAX_UPLOAD_BYTES // (1024 * 1024)}MB"
+        )
+    chunk_size = request.chunk_size or DEFAULT_CHUNK_SIZE
+    if chunk_size < 64 * 1024 or chunk_size > MAX_UPLOAD_CHUNK_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Chunk size must be between 64KB and {MAX_UPLOAD_CHUNK_BYTES // (1024 * 1024)}MB"
+        )
+    screening_types = check_upload_screening(current_user, request.verification_types)
+    
+    session_id = str(uuid.uuid4())
+    upload_id = str(uuid.uuid4())
+    suffix = os.path.splitext(request.filename)[1].lower()
+    session = {
+        "session_id": session_id,
+        "upload_id": upload_id,
+        "user_id": current_user.id,
+        "filename": request.filename,
+        "total_size": request.total_size,
+        "chunk_size": chunk_size,
+        "sha256": request.sha256.lower() if request.sha256 else None,
+        "verification_types": [v.value for v in screening_types],
+        "spool_path": os.path.join(UPLOAD_SPOOL_DIR, f"hvn-upload-{upload_id}{suffix}"),
+        "received_chunks": [],
+        "status": "receiving",
+        "created_at": datetime.utcnow(),
+        "completed_at": None
+    }
+    
+    assembly = open_upload_assembly(session)
+    try:
+        await asyncio.to_thread(assembly.allocate)
+        await db.upload_sessions.insert_one(dict(session))
+        await db.batch_uploads.insert_one(
+            new_upload_record(upload_id, current_user.id, request.filename, request.total_size, screening_types)
+        )
+    except Exception as e:
+        logger.error(f"Error starting upload session: {e}")
+        upload_sessions.discard(session_id)
+        if os.path.exists(session["spool_path"]):
+            os.unlink(session["spool_path"])
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to start upload session"
+        )
+    
+    logger.info(f"Started upload session {session_id} for user {current_user.email}: {request.filename} ({assembly.chunk_count} chunks)")
+    return upload_session_state(session, assembly)
+
+@api_router.put("/employees/batch-upload/sessions/{session_id}/chunks/{index}")
+async def upload_session_chunk(
+    session_id: str,
+    index: int,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user)
+):
+    """Store one chunk of a resumable upload; re-sending a chunk is harmless"""
+    session = await find_upload_session(session_id, current_user.id)
+    if session["status"] != "receiving":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Upload session is {session['status']}")
+    
+    assembly = open_upload_assembly(session)
+    try:
+        expected_length = assembly.chunk_length(index)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    checksum = (request.headers.get("x-chunk-sha256") or "").lower()
+    if not checksum:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="X-Chunk-SHA256 header is required")
+    
+    # Never buffer more than the chunk can be
+    try:
+        declared_length = int(request.headers.get("content-length", expected_length))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Content-Length")
+    if declared_length != expected_length:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Chunk {index} must be {expected_length} bytes, got {declared_length}"
+        )
+    data = bytearray()
+    async for part in request.stream():
+        data.extend(part)
+        if len(data) > expected_length:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Chunk {index} must be {expected_length} bytes"
+            )
+    data = bytes(data)
+    if len(data) != expected_length:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Chunk {index} must be {expected_length} bytes, got {len(data)}"
+        )
+    if hashlib.sha256(data).hexdigest() != checksum:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Checksum mismatch for chunk {index}")
+    
+    await asyncio.to_thread(assembly.write_chunk, index, data)
+    await db.upload_sessions.update_one({"session_id": session_id}, {"$addToSet": {"received_chunks": index}})
+    
+    # CSV rows are imported from the received prefix while later chunks are in flight
+    if session["filename"].endswith('.csv') and not assembly.parse_started and 0 in assembly.received:
+        if assembly.parse_resume:
+            start_session_parse(background_tasks, session, assembly, follow_prefix=True)
+        elif not session.get("parse_started"):
+            assembly.parse_started = True
+            await db.upload_sessions.update_one({"session_id": session_id}, {"$set": {"parse_started": True}})
+            start_session_parse(background_tasks, session, assembly, follow_prefix=True)
+    
+    return {"index": index, "received": len(assembly.received), "chunk_count": assembly.chunk_count, "contiguous_bytes": assembly.contiguous_bytes}
+
+@api_router.get("/employees/batch-upload/sessions/{session_id}")
+async def get_upload_session(
+    session_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Chunks received so far, for resuming an interrupted upload"""
+    session = await find_upload_session(session_id, current_user.id)
+    assembly = upload_sessions.get(session_id)
+    if assembly is None and session["status"] == "receiving":
+        assembly = open_upload_assembly(session)
+    if assembly is None:
+        return {
+            "session_id": session_id,
+            "upload_id": session["upload_id"],
+            "status": session["status"],
+            "received_chunks": sorted(session.get("received_chunks", []))
+        }
+    return upload_session_state(session, assembly)
+
+@api_router.post("/employees/batch-upload/sessions/{session_id}/complete")
+async def complete_upload_session(
+    session_id: str,
+    request: UploadSessionComplete,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user)
+):
+    """Verify the assembled file and finish importing it"""
+    session = await find_upload_session(session_id, current_user.id)
+    if session["status"] != "receiving":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Upload session is {session['status']}")
+    
+    assembly = open_upload_assembly(session)
+    missing = assembly.missing_chunks()
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Upload is missing chunks", "missing_chunks": missing[:100]}
+        )
+    
+    digest = await asyncio.to_thread(assembly.sha256)
+    expected = (request.sha256 or session.get("sha256") or "").lower()
+    if expected and digest != expected:
+        await fail_upload_session(session, assembly, "File checksum does not match")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File checksum does not match")
+    
+    await db.upload_sessions.update_one(
+        {"session_id": session_id},
+        {"$set": {"status": "completed", "file_sha256": digest, "completed_at": datetime.utcnow()}}
+    )
+    assembly.seal()
+    upload_sessions.discard(session_id)
+    
+    if not assembly.parse_started:
+        if session.get("parse_started") and not assembly.parse_resume:
+            # Parsing began in a process that has since restarted; start over from the first row
+            await db.batch_upload_errors.delete_many({"upload_id": session["upload_id"]})
+            await rollback_upload_import(session["upload_id"], session["user_id"])
+        start_session_parse(background_tasks, session, assembly)
+    
+    logger.info(f"Completed upload session {session_id} ({session['total_size']} bytes, sha256 {digest})")
+    return {"session_id": session_id, "upload_id": session["upload_id"], "sha256": digest, "status": "processing"}
+
+@api_router.delete("/employees/batch-upload/sessions/{session_id}")
+async def abort_upload_session(
+    session_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Abandon a resumable upload and discard its chunks"""
+    session = await find_upload_session(session_id, current_user.id)
+    if session["status"] != "receiving":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Upload session is {session['status']}")
+    
+    await fail_upload_session(session, open_upload_assembly(session), "Upload aborted", session_status="aborted")
+    return {"session_id": session_id, "status": "aborted"}
+
+async def fail_upload_session(session: Dict[str, Any], assembly, reason: str, session_status: str = "failed"):
+    """Stop a session; a parse reading its prefix fails and removes the spool file"""
+    await db.upload_sessions.update_one(
+        {"session_id": session["session_id"]},
+        {"$set": {"status": session_status, "completed_at": datetime.utcnow()}}
+    )
+    assembly.fail(reason)
+    upload_sessions.discard(session["session_id"])
+    
+    if not assembly.parse_started:
+        if os.path.exists(session["spool_path"]):
+            os.unlink(session["spool_path"])
+        rolled_back = {}
+        resume = assembly.parse_resume
+        assembly.parse_resume = None
+        if resume:
+            # A parse waiting for chunks already imported rows from the unverified file
+            for future in resume["screenings"]:
+                future.cancel()
+            rolled_back = {"successful_imports": 0, "rolled_back_imports": await rollback_upload_import(session["upload_id"], session["user_id"])}
+        progress_broker.publish(session["upload_id"], {"type": "batch_upload", "upload_id": session["upload_id"], "status": "failed", "error": reason})
+        await db.batch_uploads.update_one(
+            {"upload_id": session["upload_id"]},
+            {"$set": {"status": "failed", "errors": [{"error": reason}], **rolled_back, "completed_at": datetime.utcnow()}}
+        )
+
+async def expire_stalled_upload_session(upload_id: str, assembly, resume: Dict[str, Any]):
+    """Fail a session whose parse is still waiting for chunks after STALLED_SESSION_TIMEOUT"""
+    await asyncio.sleep(STALLED_SESSION_TIMEOUT)
+    if assembly.parse_resume is not resume:
+        return
+    session = await db.upload_sessions.find_one({"upload_id": upload_id}, {"_id": 0})
+    if session and session["status"] == "receiving":
+        logger.warning(f"Upload session {session['session_id']} received no chunk for {STALLED_SESSION_TIMEOUT} seconds, failing it")
+        await fail_upload_session(session, assembly, f"No chunk received for {STALLED_SESSION_TIMEOUT} seconds")
+
 @api_router.get("/employees/batch-upload/{upload_id}/status")
 async def get_batch_upload_status(
     upload_id: str,
@@ -2453,21 +3543,26 @@ async def get_batch_upload_status(
                 detail="Upload not found"
             )
         
-        # Calculate progress percentage
-        progress = 0
-        if upload_record["total_rows"] > 0:
-            processed = upload_record["successful_imports"] + upload_record["failed_imports"]
-            progress = int((processed / upload_record["total_rows"]) * 100)
+        # Live counters of a job running in this process are fresher than the stored record
+        event = progress_broker.latest(upload_id) or upload_progress_event(upload_record)
+        if "progress" not in event:
+            event = upload_progress_event(upload_record)
         
         return BatchUploadStatus(
             upload_id=upload_id,
-            status=upload_record["status"],
-            progress=progress,
-            total_rows=upload_record["total_rows"],
-            processed_rows=upload_record["successful_imports"] + upload_record["failed_imports"],
-            successful_imports=upload_record["successful_imports"],
-            failed_imports=upload_record["failed_imports"],
-            errors=upload_record["errors"][:10]  # Limit to first 10 errors
+            status=event["status"],
+            progress=event["progress"],
+            total_rows=event["total_rows"],
+            processed_rows=event["processed_rows"],
+            successful_imports=event["successful_imports"],
+            failed_imports=event["failed_imports"],
+            errors=await first_upload_errors(upload_record, UPLOAD_STATUS_ERRORS),
+            mapped_columns=upload_record.get("mapped_columns", {}),
+            unmatched_columns=upload_record.get("unmatched_columns", []),
+            verification_types=event.get("verification_types", []),
+            total_checks=event.get("total_checks", 0),
+            completed_checks=event.get("completed_checks", 0),
+            flagged_employees=event.get("flagged_employees", 0)
         )
         
     except HTTPException:
@@ -2479,6 +3574,126 @@ async def get_batch_upload_status(
             detail="Failed to get upload status"
         )
 
+@api_router.get("/employees/batch-upload/{upload_id}/events")
+async def stream_batch_upload_progress(
+    upload_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream batch upload progress as server-sent events"""
+    upload_record = await db.batch_uploads.find_one({
+        "upload_id": upload_id,
+        "user_id": current_user.id
+    })
+    
+    if not upload_record:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    
+    async def reload_event():
+        record = await db.batch_uploads.find_one({"upload_id": upload_id})
+        return upload_progress_event(record) if record else None
+    
+    return progress_stream_response(upload_id, reload_event)
+
+async def first_upload_errors(upload_record: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """First errors of an upload.
+
+    Processing failures (and every error of uploads that predate batch_upload_errors)
+    are kept on the upload record and come first.
+    """
+    errors = list(upload_record.get("errors", []))[:limit]
+    if len(errors) < limit:
+        errors += await db.batch_upload_errors.find(
+            {"upload_id": upload_record["upload_id"]},
+            {"_id": 0, "row": 1, "error": 1}
+        ).sort("row", 1).to_list(limit - len(errors))
+    return errors
+
+async def find_user_upload(upload_id: str, user_id: str) -> Dict[str, Any]:
+    upload_record = await db.batch_uploads.find_one(
+        {"upload_id": upload_id, "user_id": user_id},
+        {"_id": 0, "upload_id": 1, "filename": 1, "errors": 1}
+    )
+    if not upload_record:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    return upload_record
+
+@api_router.get("/employees/batch-upload/{upload_id}/errors")
+async def get_batch_upload_errors(
+    upload_id: str,
+    after: Optional[int] = None,
+    limit: int = 100,
+    current_user: User = Depends(get_current_user)
+):
+    """Page through the rejected rows of an upload in row order.
+
+    Pass the returned next_cursor as `after` to get the following page.
+    """
+    upload_record = await find_user_upload(upload_id, current_user.id)
+    limit = min(max(limit, 1), MAX_UPLOAD_ERRORS_PAGE)
+    
+    errors = []
+    if after is None:
+        errors = list(upload_record.get("errors", []))
+    
+    query = {"upload_id": upload_id}
+    if after is not None:
+        query["row"] = {"$gt": after}
+    # One extra document tells whether another page exists
+    errors += await db.batch_upload_errors.find(query, {"_id": 0, "row": 1, "error": 1}).sort("row", 1).to_list(limit + 1)
+    
+    next_cursor = None
+    if len(errors) > limit:
+        errors = errors[:limit]
+        next_cursor = errors[-1].get("row")
+    return {"errors": errors, "next_cursor": next_cursor}
+
+@api_router.get("/employees/batch-upload/{upload_id}/errors.csv")
+async def download_batch_upload_errors(
+    upload_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream every rejected row of an upload as CSV"""
+    upload_record = await find_user_upload(upload_id, current_user.id)
+    
+    async def csv_rows():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        
+        def flush() -> str:
+            data = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return data
+        
+        writer.writerow(["row", "error"])
+        for error in upload_record.get("errors", []):
+            writer.writerow([error.get("row", ""), error.get("error", "")])
+        yield flush()
+        
+        cursor = db.batch_upload_errors.find({"upload_id": upload_id}, {"_id": 0, "row": 1, "error": 1}).sort("row", 1).batch_size(1000)
+        pending = 0
+        async for error in cursor:
+            writer.writerow([error["row"], error["error"]])
+            pending += 1
+            if pending >= 1000:
+                yield flush()
+                pending = 0
+        if pending:
+            yield flush()
+    
+    filename = os.path.splitext(upload_record.get("filename") or "upload")[0]
+    return StreamingResponse(
+        csv_rows(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}-errors.csv"'}
+    )
+
 @api_router.get("/employees/batch-uploads")
 async def get_batch_upload_history(current_user: User = Depends(get_current_user)):
     """Get batch upload history for current user"""
@@ -2496,165 +3711,400 @@ async def get_batch_upload_history(current_user: User = Depends(get_current_user
             detail="Failed to get upload history"
         )
 
-async def process_employee_csv(upload_id: str, file_content: bytes, filename: str, user_id: str):
-    """Background task to process CSV file and create employees"""
+async def process_employee_csv(upload_id: str, file_path: str, filename: str, user_id: str,
+                               verification_types: Optional[List[VerificationType]] = None,
+                               assembly=None, resume: Optional[Dict[str, Any]] = None):
+    """Background task to stream a spooled CSV/Excel file and create employees in bounded chunks.
+
+    A CSV from a resumable upload session is read from its assembly, following the
+    chunks received so far on the upload parse executor. Its rows are imported before
+    the whole-file checksum is known, so if the session fails (bad checksum, abort) they
+    are deleted again. When no chunk arrives for a while the parse stops, keeping its
+    rows, and the next chunk resumes it from resume.
+
+    Rejected rows are appended to batch_upload_errors per chunk, so the upload record
+    only carries counters.
+
+    With verification_types, each chunk's new employees are queued for screening on the
+    bulk lane right after insert, so parsing the next chunk overlaps with screening this
+    one. The upload completes once every queued check has finished.
+    """
+    total_rows = 0
+    successful_imports = 0
+    failed_imports = 0
+    parsed_bytes = 0
+    verification_types = verification_types or []
+    screening = {"verification_types": [v.value for v in verification_types], "total_checks": 0, "completed_checks": 0, "flagged_employees": 0}
+    screenings: Set[asyncio.Future] = set()
+    if resume:
+        total_rows = resume["total_rows"]
+        successful_imports = resume["successful_imports"]
+        failed_imports = resume["failed_imports"]
+        parsed_bytes = resume["bytes_processed"]
+        # Screening still running from before the stall keeps counting into the same record
+        screening = resume["screening"]
+        screenings = resume["screenings"]
+    header = resume["header"] if resume else None
+    stream = None
+    keep_spool = False
+    
+    def publish_progress(status: str, total: int):
+        publish_upload_progress(upload_id, status, total, successful_imports, failed_imports, screening)
+    
+    async def screen_employee(employee: Employee):
+        # New employees have no prior results to reuse, so checks go straight to the sources
+        flagged = False
+        for verification_type in verification_types:
+            try:
+                result = await dispatch_verification_check(employee, verification_type.value)
+                if result and result.status == VerificationStatus.FAILED:
+                    flagged = True
+            finally:
+                screening["completed_checks"] += 1
+        if flagged:
+            screening["flagged_employees"] += 1
+        publish_progress("processing", total_rows)
+    
     try:
         logger.info(f"Starting CSV processing for upload {upload_id}")
-        
-        # Parse CSV/Excel file
-        employees_data = []
-        errors = []
-        
-        if filename.endswith('.csv'):
-            # Parse CSV
-            try:
-                csv_content = file_content.decode('utf-8')
-                csv_reader = csv.DictReader(io.StringIO(csv_content))
-                employees_data = list(csv_reader)
-            except UnicodeDecodeError:
-                # Try different encoding
-                csv_content = file_content.decode('latin-1')
-                csv_reader = csv.DictReader(io.StringIO(csv_content))
-                employees_data = list(csv_reader)
+        file_size = os.path.getsize(file_path)
+        
+        # Rows are parsed in a worker thread one chunk at a time. A session prefix read
+        # blocks on missing chunks, so it gets the bounded upload parse executor.
+        if assembly is not None:
+            stream = assembly.prefix_reader(parsed_bytes)
+            row_chunks = matching.iter_employee_row_chunks(
+                file_path, filename, UPLOAD_CHUNK_ROWS, stream=stream,
+                offset=parsed_bytes, header=resume["header"] if resume else None
+            )
+            parse_executor = upload_sessions.parse_executor()
+            parse_next = lambda default: asyncio.get_running_loop().run_in_executor(parse_executor, next, row_chunks, default)
         else:
-            # Parse Excel
-            df = pd.read_excel(io.BytesIO(file_content))
-            employees_data = df.to_dict('records')
-        
-        total_rows = len(employees_data)
-        successful_imports = 0
-        failed_imports = 0
-        
-        # Update total rows
-        await db.batch_uploads.update_one(
-            {"upload_id": upload_id},
-            {"$set": {"total_rows": total_rows}}
-        )
-        
-        logger.info(f"Processing {total_rows} rows for upload {upload_id}")
+            row_chunks = matching.iter_employee_row_chunks(file_path, filename, UPLOAD_CHUNK_ROWS)
+            parse_next = lambda default: asyncio.to_thread(next, row_chunks, default)
+        
+        # Resolve header columns to employee fields once for the whole file
+        header = await parse_next([])
+        column_plan = matching.EmployeeColumnPlan(header)
+        if not resume:
+            await db.batch_uploads.update_one(
+                {"upload_id": upload_id},
+                {"$set": {
+                    "mapped_columns": column_plan.mapped_columns,
+                    "unmatched_columns": column_plan.unmatched_columns
+                }}
+            )
+            logger.info(f"Upload {upload_id} mapped columns {column_plan.mapped_columns}, unmatched {column_plan.unmatched_columns}")
         
-        # Process each employee
-        for row_index, row_data in enumerate(employees_data):
-            try:
-                # Map CSV columns to employee fields (flexible column mapping)
-                employee_data = map_csv_row_to_employee(row_data)
-                
-                # Validate required fields
-                if not employee_data.get('first_name') or not employee_data.get('last_name'):
-                    errors.append({
-                        "row": row_index + 1,
-                        "error": "Missing required fields: first_name and last_name",
-                        "data": row_data
-                    })
-                    failed_imports += 1
-                    continue
-                
-                # Add user_id and create employee
-                employee_data['user_id'] = user_id
-                employee = Employee(**employee_data)
-                
-                # Check if employee already exists (by name + SSN)
-                existing = await db.employees.find_one({
-                    "user_id": user_id,
-                    "first_name": employee.first_name,
-                    "last_name": employee.last_name,
-                    "ssn": employee.ssn
-                })
-                
-                if existing:
-                    errors.append({
-                        "row": row_index + 1,
-                        "error": "Employee already exists",
-                        "data": {"name": f"{employee.first_name} {employee.last_name}", "ssn": employee.ssn[-4:] if employee.ssn else "N/A"}
-                    })
-                    failed_imports += 1
-                    continue
-                
-                # Insert employee
-                await db.employees.insert_one(employee.dict())
-                successful_imports += 1
-                
-                # Update progress every 10 employees
-                if (row_index + 1) % 10 == 0:
-                    await db.batch_uploads.update_one(
-                        {"upload_id": upload_id},
-                        {
-                            "$set": {
-                                "successful_imports": successful_imports,
-                                "failed_imports": failed_imports,
-                                "errors": errors[:100]  # Keep only first 100 errors
-                            }
-                        }
-                    )
+        while True:
+            chunk = await parse_next(None)
+            if chunk is None:
+                break
+            rows, bytes_processed = chunk
+            
+            inserted, chunk_errors = await import_employee_chunk(user_id, column_plan, total_rows + 1, rows, upload_id)
+            total_rows += len(rows)
+            successful_imports += len(inserted)
+            failed_imports += len(chunk_errors)
+            await store_upload_errors(upload_id, user_id, chunk_errors)
+            parsed_bytes = bytes_processed
+            
+            if verification_types:
+                screening["total_checks"] += len(inserted) * len(verification_types)
+                for document in inserted:
+                    employee = Employee(**document)
+                    future = verification_scheduler.submit_bulk(user_id, lambda employee=employee: screen_employee(employee))
+                    screenings.add(future)
+                    future.add_done_callback(screenings.discard)
                 
-            except Exception as e:
-                errors.append({
-                    "row": row_index + 1,
-                    "error": str(e),
-                    "data": row_data
-                })
-                failed_imports += 1
-                logger.warning(f"Error processing row {row_index + 1}: {e}")
+                # Bound the backlog so a huge file cannot queue unlimited screening work
+                while len(screenings) > MAX_PENDING_UPLOAD_SCREENINGS:
+                    await asyncio.wait(set(screenings), return_when=asyncio.FIRST_COMPLETED)
+            
+            # Row total is extrapolated from bytes read until the whole file is parsed
+            estimated_rows = max(total_rows, round(total_rows * file_size / bytes_processed)) if bytes_processed else total_rows
+            await db.batch_uploads.update_one(
+                {"upload_id": upload_id},
+                {
+                    "$set": {
+                        "status": "processing",
+                        "total_rows": estimated_rows,
+                        "bytes_processed": bytes_processed,
+                        "successful_imports": successful_imports,
+                        "failed_imports": failed_imports,
+                        **screening
+                    }
+                }
+            )
+            publish_progress("processing", estimated_rows)
+        
+        # Every row is imported; wait for the screening still queued
+        if screenings:
+            await db.batch_uploads.update_one(
+                {"upload_id": upload_id},
+                {"$set": {"total_rows": total_rows, "bytes_processed": file_size, **screening}}
+            )
+            publish_progress("processing", total_rows)
+            results = await asyncio.gather(*screenings, return_exceptions=True)
+            failures = [r for r in results if isinstance(r, Exception)]
+            for failure in failures[:5]:
+                logger.warning(f"Upload screening error (upload {upload_id}): {failure}")
         
         # Final update
         await db.batch_uploads.update_one(
             {"upload_id": upload_id},
             {
                 "$set": {
+                    "total_rows": total_rows,
+                    "bytes_processed": file_size,
                     "successful_imports": successful_imports,
                     "failed_imports": failed_imports,
-                    "errors": errors[:100],
+                    **screening,
                     "status": "completed",
                     "completed_at": datetime.utcnow()
                 }
             }
         )
         
-        logger.info(f"Completed CSV processing for upload {upload_id}: {successful_imports} successful, {failed_imports} failed")
-        
+        publish_progress("completed", total_rows)
+        logger.info(f"Completed CSV processing for upload {upload_id}: {successful_imports} successful, {failed_imports} failed"
+                    + (f", {screening['flagged_employees']} flagged in screening" if verification_types else ""))
+        
+    except PrefixStalled:
+        # Keep the rows imported so far; the next chunk resumes after the last full row chunk
+        logger.info(f"Upload {upload_id} is waiting for chunks after {total_rows} rows")
+        keep_spool = True
+        resume = {
+            # Only a resume past the first row chunk starts below the header line
+            "header": header if parsed_bytes else None,
+            "bytes_processed": parsed_bytes,
+            "total_rows": total_rows,
+            "successful_imports": successful_imports,
+            "failed_imports": failed_imports,
+            "screening": screening,
+            "screenings": screenings
+        }
+        # Hand over before any await, so a chunk or abort arriving meanwhile sees the stall
+        assembly.parse_resume = resume
+        assembly.parse_started = False
+        task = asyncio.create_task(expire_stalled_upload_session(upload_id, assembly, resume))
+        stalled_upload_tasks.add(task)
+        task.add_done_callback(stalled_upload_tasks.discard)
+        await db.batch_uploads.update_one(
+            {"upload_id": upload_id},
+            {"$set": {"status": "waiting_for_chunks", "successful_imports": successful_imports, "failed_imports": failed_imports, **screening}}
+        )
+        publish_progress("waiting_for_chunks", total_rows)
+    
     except Exception as e:
         logger.error(f"Error in CSV processing for upload {upload_id}: {e}")
+        for future in screenings:
+            future.cancel()
+        rolled_back = {}
+        if assembly is not None:
+            # Nothing from an unverified session file is kept
+            try:
+                rolled_back = {"successful_imports": 0, "rolled_back_imports": await rollback_upload_import(upload_id, user_id)}
+            except Exception as rollback_error:
+                logger.error(f"Could not roll back rows of upload {upload_id}: {rollback_error}")
+        progress_broker.publish(upload_id, {"type": "batch_upload", "upload_id": upload_id, "status": "failed", "error": str(e)})
         await db.batch_uploads.update_one(
             {"upload_id": upload_id},
             {
                 "$set": {
                     "status": "failed",
                     "errors": [{"error": f"Processing failed: {str(e)}"}],
+                    **rolled_back,
                     "completed_at": datetime.utcnow()
                 }
             }
         )
+    
+    finally:
+        if stream is not None:
+            stream.close()
+        if not keep_spool:
+            try:
+                os.unlink(file_path)
+            except OSError as e:
+                logger.warning(f"Could not remove spooled upload {file_path}: {e}")
 
-def map_csv_row_to_employee(row_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Map CSV row data to employee fields with flexible column naming"""
-    
-    # Define possible column name variations
-    column_mappings = {
-        'first_name': ['first_name', 'firstname', 'first name', 'fname', 'given_name'],
-        'last_name': ['last_name', 'lastname', 'last name', 'lname', 'surname', 'family_name'],
-        'middle_name': ['middle_name', 'middlename', 'middle name', 'mname', 'middle_initial'],
-        'ssn': ['ssn', 'social_security_number', 'social security number', 'social_security', 'ss_number'],
-        'date_of_birth': ['date_of_birth', 'dob', 'birth_date', 'birthdate', 'date of birth'],
-        'email': ['email', 'email_address', 'email address', 'e_mail', 'work_email'],
-        'phone': ['phone', 'phone_number', 'phone number', 'telephone', 'mobile', 'cell'],
-        'license_number': ['license_number', 'license number', 'license_no', 'license', 'professional_license'],
-        'license_type': ['license_type', 'license type', 'license_category', 'profession', 'credential'],
-        'license_state': ['license_state', 'license state', 'state', 'license_jurisdiction']
-    }
+async def rollback_upload_import(upload_id: str, user_id: str) -> int:
+    """Delete the employees an upload imported, with any screening results they got"""
+    imported = await db.employees.find(
+        {"user_id": user_id, "upload_id": upload_id}, {"_id": 0, "id": 1, "first_name": 1, "last_name": 1}
+    ).to_list(None)
+    if not imported:
+        return 0
+    employee_ids = [employee["id"] for employee in imported]
+    await db.employees.delete_many({"user_id": user_id, "upload_id": upload_id})
+    await db.verification_results.delete_many({"employee_id": {"$in": employee_ids}})
+    employee_name_index.remove_many(imported)
+    logger.info(f"Rolled back {len(imported)} employees imported by upload {upload_id}")
+    return len(imported)
+
+async def store_upload_errors(upload_id: str, user_id: str, errors: List[tuple]):
+    """Append a chunk's rejected rows to batch_upload_errors in one unordered insert"""
+    if not errors:
+        return
+    await db.batch_upload_errors.insert_many([
+        {"upload_id": upload_id, "user_id": user_id, "row": row_number, "error": error}
+        for row_number, error in sorted(errors)
+    ], ordered=False)
+
+async def encrypt_employee_documents(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Employee documents as stored, with PHI fields encrypted when PHI_ENCRYPTION_AT_REST is on"""
+    if not PHI_ENCRYPTION_AT_REST or not documents:
+        return documents
+    return await asyncio.to_thread(phi_encryption.encrypt_employees, documents)
+
+async def decrypt_employee_documents(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Stored employee documents with PHI fields decrypted (plaintext values pass through)"""
+    if not HIPAA_ENABLED or not documents:
+        return documents
+    return await asyncio.to_thread(phi_encryption.decrypt_employees, documents)
+
+async def decrypt_employee_document(document: Dict[str, Any]) -> Dict[str, Any]:
+    return (await decrypt_employee_documents([document]))[0]
+
+async def lazy_employee_documents(documents: List[Dict[str, Any]]) -> List[Mapping]:
+    """Stored employee documents as views that decrypt each PHI field only when it is read"""
+    if not HIPAA_ENABLED or not documents:
+        return documents
+    # Only the first use of a salt derives keys, but that is too slow for the event loop
+    return await asyncio.to_thread(phi_encryption.lazy_employees, documents)
+
+def parse_employee_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Employee fields requested as "fields=first_name,last_name" (id is always included)"""
+    if not fields:
+        return None
+    requested = list(dict.fromkeys(["id"] + [field.strip() for field in fields.split(",") if field.strip()]))
+    unknown = [field for field in requested if field not in Employee.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown employee fields: {', '.join(unknown)}")
+    return requested
+
+def project_employee(employee: Mapping, fields: List[str]) -> Dict[str, Any]:
+    return {field: employee.get(field) for field in fields}
+
+# Version 2 keys are a keyed HMAC, so stored keys can't be brute-forced back to an SSN
+IDENTITY_KEY_VERSION = 2 if HIPAA_ENABLED else 1
+
+def employee_identity_key(user_id: str, first_name: str, last_name: str, ssn: Optional[str]) -> str:
+    """Per-tenant duplicate detection key over normalized name and SSN digits"""
+    ssn_digits = re.sub(r"\D", "", ssn or "")
+    payload = "|".join([user_id, normalize_name(first_name), normalize_name(last_name), ssn_digits])
+    if IDENTITY_KEY_VERSION == 2:
+        return phi_encryption.keyed_digest(payload)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+async def ensure_employee_identity_keys():
+    """Create the unique identity key index and backfill keys of older employees"""
+    try:
+        await db.employees.create_index(
+            "identity_key",
+            unique=True,
+            partialFilterExpression={"identity_key": {"$type": "string"}}
+        )
+        # Equality lookups on encrypted SSNs go through their blind index
+        await db.employees.create_index([("user_id", 1), ("ssn_bidx", 1)])
+        
+        backfilled = 0
+        skipped = 0
+        updates = []
+        
+        async def flush():
+            nonlocal backfilled, skipped
+            try:
+                result = await db.employees.bulk_write(updates, ordered=False)
+                backfilled += result.modified_count
+            except BulkWriteError as e:
+                # Duplicates that predate the index keep no key rather than failing the backfill
+                backfilled += e.details.get("nModified", 0)
+                skipped += len(e.details.get("writeErrors", []))
+            updates.clear()
+        
+        # Missing keys, and keys computed by another key version
+        cursor = db.employees.find(
+            {"identity_key_version": {"$ne": IDENTITY_KEY_VERSION}},
+            {"_id": 1, "user_id": 1, "first_name": 1, "last_name": 1, "ssn": 1}
+        )
+        async for employee_data in cursor:
+            ssn = employee_data.get("ssn")
+            if HIPAA_ENABLED:
+                ssn = phi_encryption.decrypt_field(ssn)
+            identity_key = employee_identity_key(
+                employee_data.get("user_id", ""), employee_data.get("first_name"), employee_data.get("last_name"), ssn
+            )
+            updates.append(UpdateOne(
+                {"_id": employee_data["_id"]},
+                {"$set": {"identity_key": identity_key, "identity_key_version": IDENTITY_KEY_VERSION}}
+            ))
+            if len(updates) >= 1000:
+                await flush()
+        if updates:
+            await flush()
+        
+        if backfilled or skipped:
+            logger.info(f"Backfilled identity keys for {backfilled} employees ({skipped} existing duplicates left on their previous key)")
+    except Exception as e:
+        logger.warning(f"Could not prepare employee identity keys: {e}")
+
+async def import_employee_chunk(user_id: str, column_plan: matching.EmployeeColumnPlan, first_row_number: int,
+                                rows: List[Sequence[Any]], upload_id: Optional[str] = None):
+    """Validate and insert one chunk of upload rows with a single lookup and bulk insert.
+
+    Rows are validated and normalized column-wise in a worker thread. Stored rows are
+    tagged with upload_id so a failed upload can be rolled back. Returns the inserted
+    employee documents and a (row number, reason) list of rejected rows.
+    """
+    accepted, rejected = await asyncio.to_thread(matching.validate_employee_chunk, column_plan, rows)
+    errors = [(first_row_number + position, reason) for position, reason in rejected]
+    candidates = {}  # identity key -> (row number, employee document)
+    now = datetime.utcnow()
     
-    employee_data = {}
+    for position, fields in accepted:
+        identity_key = employee_identity_key(user_id, fields["first_name"], fields["last_name"], fields["ssn"])
+        if identity_key in candidates:
+            errors.append((first_row_number + position, "Duplicate employee in file"))
+            continue
+        
+        # Same document shape as Employee.dict(), without a model instance per row
+        document = {
+            "id": str(uuid.uuid4()), "user_id": user_id, **fields, "created_at": now, "updated_at": now,
+            "identity_key": identity_key, "identity_key_version": IDENTITY_KEY_VERSION, "upload_id": upload_id
+        }
+        candidates[identity_key] = (first_row_number + position, document)
     
-    # Normalize column names (lowercase, strip spaces)
-    normalized_row = {k.lower().strip(): v for k, v in row_data.items() if v is not None and str(v).strip()}
+    if not candidates:
+        return [], errors
     
-    # Map fields
-    for field_name, possible_columns in column_mappings.items():
-        for col_name in possible_columns:
-            if col_name in normalized_row and str(normalized_row[col_name]).strip():
-                employee_data[field_name] = str(normalized_row[col_name]).strip()
-                break
+    # One lookup for every employee of the chunk that already exists
+    async for existing in db.employees.find({"identity_key": {"$in": list(candidates)}}, {"_id": 0, "identity_key": 1}):
+        row_number, _ = candidates.pop(existing["identity_key"])
+        errors.append((row_number, "Employee already exists"))
     
-    return employee_data
+    pending = list(candidates.values())
+    if not pending:
+        return [], errors
+    
+    # Unordered insert, the unique index rejects rows that raced in (e.g. from an earlier chunk)
+    failed_indexes = set()
+    stored = await encrypt_employee_documents([document for _, document in pending])
+    try:
+        await db.employees.insert_many(stored, ordered=False)
+    except BulkWriteError as e:
+        for write_error in e.details.get("writeErrors", []):
+            row_number, _ = pending[write_error["index"]]
+            failed_indexes.add(write_error["index"])
+            if write_error.get("code") == 11000:
+                errors.append((row_number, "Employee already exists"))
+            else:
+                errors.append((row_number, write_error.get("errmsg", "Insert failed")))
+    
+    inserted = [document for index, (_, document) in enumerate(pending) if index not in failed_indexes]
+    employee_name_index.add_many(inserted)
+    return inserted, errors
 
 @api_router.post("/employees", response_model=Employee)
 async def create_employee(
@@ -2676,7 +4126,14 @@ async def create_employee(
         employee_dict['user_id'] = current_user.id  # Associate with current user
         employee = Employee(**employee_dict)
         
-        await db.employees.insert_one(employee.dict())
+        document = employee.dict()
+        document["identity_key"] = employee_identity_key(current_user.id, employee.first_name, employee.last_name, employee.ssn)
+        document["identity_key_version"] = IDENTITY_KEY_VERSION
+        try:
+            await db.employees.insert_one((await encrypt_employee_documents([document]))[0])
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Employee already exists")
+        employee_name_index.add(employee.id, employee.first_name, employee.last_name)
         
         logger.info(f"Created employee: {employee.first_name} {employee.last_name} for user {current_user.email}")
         return employee
@@ -2686,24 +4143,61 @@ async def create_employee(
         logger.error(f"Error creating employee: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
-@api_router.get("/employees", response_model=List[Employee])
-async def get_employees(current_user: User = Depends(get_current_user)):
-    """Get all employees for current user"""
+async def find_employees_by_ssn(user_id: str, ssn: str) -> List[Dict[str, Any]]:
+    """A tenant's employees with this SSN, found by index without decrypting other rows"""
+    ssn_digits = re.sub(r"\D", "", ssn)
+    query = {"user_id": user_id, "ssn": {"$in": [ssn_digits, f"{ssn_digits[:3]}-{ssn_digits[3:5]}-{ssn_digits[5:]}"]}}
+    if HIPAA_ENABLED:
+        # Encrypted rows match by blind index, rows stored before encryption by value
+        query = {"user_id": user_id, "$or": [
+            {"ssn" + BLIND_INDEX_SUFFIX: phi_encryption.blind_index("ssn", ssn)},
+            {"ssn": query["ssn"]}
+        ]}
+    return await decrypt_employee_documents(await db.employees.find(query).to_list(100))
+
+@api_router.post("/employees/lookup", response_model=List[Employee])
+async def lookup_employees(lookup: EmployeeLookup, current_user: User = Depends(get_current_user)):
+    """Find employees by SSN (sent in the body so it stays out of URLs and access logs)"""
+    if len(re.sub(r"\D", "", lookup.ssn)) != 9:
+        raise HTTPException(status_code=400, detail="SSN must have 9 digits")
+    try:
+        return [Employee(**employee) for employee in await find_employees_by_ssn(current_user.id, lookup.ssn)]
+    except Exception as e:
+        logger.error(f"Error looking up employees by SSN: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/employees", response_model=Union[List[Employee], List[Dict[str, Any]]])
+async def get_employees(fields: Optional[str] = None, current_user: User = Depends(get_current_user)):
+    """Get all employees for current user.
+
+    With fields= only those fields are read and returned, and PHI fields that
+    aren't requested are never decrypted.
+    """
+    requested = parse_employee_fields(fields)
     try:
+        if requested:
+            projection = {"_id": 0, **{field: 1 for field in requested}}
+            employees = await db.employees.find({"user_id": current_user.id}, projection).to_list(1000)
+            return [project_employee(emp, requested) for emp in await lazy_employee_documents(employees)]
+        
         employees = await db.employees.find({"user_id": current_user.id}).to_list(1000)
-        return [Employee(**emp) for emp in employees]
+        return [Employee(**emp) for emp in await decrypt_employee_documents(employees)]
     except Exception as e:
         logger.error(f"Error fetching employees: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.get("/employees/{employee_id}", response_model=Employee)
-async def get_employee(employee_id: str, current_user: User = Depends(get_current_user)):
-    """Get a specific employee"""
+@api_router.get("/employees/{employee_id}", response_model=Union[Employee, Dict[str, Any]])
+async def get_employee(employee_id: str, fields: Optional[str] = None, current_user: User = Depends(get_current_user)):
+    """Get a specific employee, optionally only the given fields"""
+    requested = parse_employee_fields(fields)
     try:
-        employee = await db.employees.find_one({"id": employee_id, "user_id": current_user.id})
+        projection = {"_id": 0, **{field: 1 for field in requested}} if requested else None
+        employee = await db.employees.find_one({"id": employee_id, "user_id": current_user.id}, projection)
         if not employee:
             raise HTTPException(status_code=404, detail="Employee not found")
-        return Employee(**employee)
+        if requested:
+            return project_employee((await lazy_employee_documents([employee]))[0], requested)
+        return Employee(**await decrypt_employee_document(employee))
     except HTTPException:
         raise
     except Exception as e:
@@ -2730,28 +4224,12 @@ async def verify_employee(
         if not employee_data:
             raise HTTPException(status_code=404, detail="Employee not found")
         
-        employee = Employee(**employee_data)
+        employee = Employee(**await decrypt_employee_document(employee_data))
         results = []
         
         for verification_type in verification_types:
-            if verification_type == VerificationType.OIG:
-                result = await check_oig_exclusion(employee)
-                results.append(result)
-            elif verification_type == VerificationType.SAM:
-                result = await check_sam_exclusion(employee)
-                results.append(result)
-            elif verification_type.startswith('medicaid_'):
-                # Extract state code from verification type (e.g., medicaid_ca -> CA)
-                state_code = verification_type.split('_')[1].upper()
-                result = await check_state_medicaid_exclusion(employee, state_code)
-                results.append(result)
-            elif verification_type in ['npi', 'license_md_ca', 'license_md_tx', 'license_md_fl', 'license_md_ny', 'license_rn_ca', 'license_rn_tx', 'license_rn_fl', 'license_rn_ny']:
-                # License verification
-                result = await check_license_verification(employee, verification_type)
-                results.append(result)
-            elif verification_type in ['nsopw_national', 'nsopw_ca', 'nsopw_tx', 'nsopw_fl', 'nsopw_ny', 'fbi_wanted']:
-                # Criminal background check
-                result = await check_criminal_background(employee, verification_type)
+            result = await verification_scheduler.run_interactive(run_verification_check(employee, verification_type))
+            if result:
                 results.append(result)
             else:
                 # Placeholder for other verification types
@@ -2820,14 +4298,32 @@ async def verify_batch(
                 detail="Some employees do not belong to your account"
             )
         
+        job_id = str(uuid.uuid4())
+        job_record = {
+            "job_id": job_id,
+            "user_id": current_user.id,
+            "employee_count": len(request.employee_ids),
+            "verification_types": [v.value for v in request.verification_types],
+            "total_checks": len(request.employee_ids) * len(request.verification_types),
+            "completed_checks": 0,
+            "processed_employees": 0,
+            "status": "processing",
+            "created_at": datetime.utcnow(),
+            "completed_at": None
+        }
+        await db.batch_verifications.insert_one(job_record)
+        progress_broker.publish(job_id, verification_progress_event(job_record))
+        
         background_tasks.add_task(
             process_batch_verification_authenticated, 
             request.employee_ids, 
             request.verification_types,
-            current_user.id
+            current_user.id,
+            job_id
         )
         
         return {
+            "job_id": job_id,
             "message": "Batch verification started",
             "employee_count": len(request.employee_ids),
             "verification_types": request.verification_types,
@@ -2842,37 +4338,129 @@ async def verify_batch(
 async def process_batch_verification_authenticated(
     employee_ids: List[str], 
     verification_types: List[VerificationType],
-    user_id: str
+    user_id: str,
+    job_id: Optional[str] = None
 ):
-    """Background task to process batch verification for authenticated user"""
-    try:
-        for employee_id in employee_ids:
+    """Background task to process batch verification for authenticated user.
+
+    Employees are queued on the scheduler's bulk lane under the user's tenant queue, so
+    large batches share workers fairly and never use the interactive share of API quota.
+    """
+    job_record = {
+        "job_id": job_id,
+        "status": "processing",
+        "employee_count": len(employee_ids),
+        "total_checks": len(employee_ids) * len(verification_types),
+        "completed_checks": 0,
+        "processed_employees": 0,
+        "failed_employees": 0
+    }
+    last_persisted = time.monotonic()
+    
+    async def persist_progress():
+        # The broker only reaches this process; status reads elsewhere reload the record
+        nonlocal last_persisted
+        if not job_id or time.monotonic() - last_persisted < BATCH_PROGRESS_PERSIST_SECONDS:
+            return
+        last_persisted = time.monotonic()
+        try:
+            await db.batch_verifications.update_one(
+                {"job_id": job_id},
+                {"$set": {
+                    "completed_checks": job_record["completed_checks"],
+                    "processed_employees": job_record["processed_employees"]
+                }}
+            )
+        except Exception as e:
+            logger.warning(f"Could not store progress of batch verification {job_id}: {e}")
+    
+    async def verify_batch_employee(employee_id: str):
+        checks_done = 0
+        try:
             employee_data = await db.employees.find_one({"id": employee_id, "user_id": user_id})
             if employee_data:
-                employee = Employee(**employee_data)
+                employee = Employee(**await decrypt_employee_document(employee_data))
                 
                 for verification_type in verification_types:
-                    if verification_type == VerificationType.OIG:
-                        await check_oig_exclusion(employee)
-                    elif verification_type == VerificationType.SAM:
-                        await check_sam_exclusion(employee)
-                    elif verification_type.startswith('medicaid_'):
-                        # Extract state code from verification type (e.g., medicaid_ca -> CA)
-                        state_code = verification_type.split('_')[1].upper()
-                        await check_state_medicaid_exclusion(employee, state_code)
-                    elif verification_type in ['npi', 'license_md_ca', 'license_md_tx', 'license_md_fl', 'license_md_ny', 'license_rn_ca', 'license_rn_tx', 'license_rn_fl', 'license_rn_ny']:
-                        # License verification
-                        await check_license_verification(employee, verification_type)
-                    elif verification_type in ['nsopw_national', 'nsopw_ca', 'nsopw_tx', 'nsopw_fl', 'nsopw_ny', 'fbi_wanted']:
-                        # Criminal background check
-                        await check_criminal_background(employee, verification_type)
-                    
-                    # Add small delay to prevent overwhelming external APIs
-                    await asyncio.sleep(0.1)
-        
-        logger.info(f"Completed batch verification for {len(employee_ids)} employees (user: {user_id})")
+                    await run_verification_check(employee, verification_type)
+                    checks_done += 1
+                    job_record["completed_checks"] += 1
+                    if job_id:
+                        progress_broker.publish(job_id, verification_progress_event(job_record))
+        finally:
+            # Checks that raised (or never ran) are still done as far as progress goes
+            job_record["completed_checks"] += len(verification_types) - checks_done
+            job_record["processed_employees"] += 1
+            await persist_progress()
+    
+    try:
+        # External API pacing is enforced by the bulk lane's share of each source's rate limit
+        results = await asyncio.gather(*[
+            verification_scheduler.submit_bulk(user_id, lambda employee_id=employee_id: verify_batch_employee(employee_id))
+            for employee_id in employee_ids
+        ], return_exceptions=True)
+        
+        # Cancelled bulk futures raise CancelledError, which is not an Exception
+        failures = [r for r in results if isinstance(r, BaseException)]
+        for failure in failures[:5]:
+            logger.warning(f"Batch verification error (job {job_id}): {failure!r}")
+        
+        # Employees cancelled before they started never reached the counters above
+        job_record["completed_checks"] = job_record["total_checks"]
+        job_record["processed_employees"] = job_record["employee_count"]
+        job_record["failed_employees"] = len(failures)
+        if not failures:
+            job_record["status"] = "completed"
+        elif len(failures) < len(employee_ids):
+            job_record["status"] = "completed_with_errors"
+        else:
+            job_record["status"] = "failed"
+        logger.info(f"Finished batch verification for {len(employee_ids)} employees (user: {user_id}, {len(failures)} errors): {job_record['status']}")
     except Exception as e:
+        job_record["status"] = "failed"
         logger.error(f"Error in batch verification: {e}")
+    
+    if job_id:
+        progress_broker.publish(job_id, verification_progress_event(job_record))
+        await db.batch_verifications.update_one(
+            {"job_id": job_id},
+            {"$set": {
+                "status": job_record["status"],
+                "completed_checks": job_record["completed_checks"],
+                "processed_employees": job_record["processed_employees"],
+                "failed_employees": job_record["failed_employees"],
+                "completed_at": datetime.utcnow()
+            }}
+        )
+
+@api_router.get("/verify-batch/{job_id}/status", response_model=BatchVerificationStatus)
+async def get_batch_verification_status(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get progress of a batch verification job"""
+    event = progress_broker.latest(job_id)
+    job_record = await db.batch_verifications.find_one({"job_id": job_id, "user_id": current_user.id})
+    if not job_record:
+        raise HTTPException(status_code=404, detail="Batch verification job not found")
+    
+    return BatchVerificationStatus(**(event or verification_progress_event(job_record)))
+
+@api_router.get("/verify-batch/{job_id}/events")
+async def stream_batch_verification_progress(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream batch verification progress as server-sent events"""
+    job_record = await db.batch_verifications.find_one({"job_id": job_id, "user_id": current_user.id})
+    if not job_record:
+        raise HTTPException(status_code=404, detail="Batch verification job not found")
+    
+    async def reload_event():
+        record = await db.batch_verifications.find_one({"job_id": job_id})
+        return verification_progress_event(record) if record else None
+    
+    return progress_stream_response(job_id, reload_event)
 
 @api_router.get("/verification-results")
 async def get_all_verification_results(current_user: User = Depends(get_current_user)):
@@ -2950,6 +4538,35 @@ async def get_verification_summary(current_user: User = Depends(get_current_user
         logger.error(f"Error getting verification summary: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.get("/monitoring/alerts")
+async def get_monitoring_alerts(
+    alert_status: Optional[str] = Query("open", alias="status"),
+    limit: int = 100,
+    current_user: User = Depends(get_current_user)
+):
+    """Get continuous monitoring alerts for the current user's employees"""
+    try:
+        query = {"user_id": current_user.id}
+        if alert_status:
+            query["status"] = alert_status
+        
+        alerts = await db.monitoring_alerts.find(query, {"_id": 0}).sort("created_at", -1).to_list(min(max(limit, 1), 1000))
+        return {"alerts": alerts, "count": len(alerts)}
+    except Exception as e:
+        logger.error(f"Error fetching monitoring alerts: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.post("/monitoring/alerts/{alert_id}/acknowledge")
+async def acknowledge_monitoring_alert(alert_id: str, current_user: User = Depends(get_current_user)):
+    """Mark a monitoring alert as reviewed"""
+    result = await db.monitoring_alerts.update_one(
+        {"id": alert_id, "user_id": current_user.id},
+        {"$set": {"status": "acknowledged", "acknowledged_at": datetime.utcnow()}}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return {"id": alert_id, "status": "acknowledged"}
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -2966,6 +4583,16 @@ async def startup_event():
     """Initialize the application"""
     logger.info("Health Verify Now API starting up...")
     
+    # Matcher processes keep CPU-bound parsing and matching off the event loop
+    matcher_pool.start(MATCHER_PROCESSES)
+    
+    # Audit events are written in the background after replaying any left from a crash
+    if audit_logger:
+        try:
+            await audit_logger.start()
+        except Exception as e:
+            logger.error(f"Could not start audit log writer, audit events will be written inline: {e}")
+    
     # Download and load OIG data on startup
     logger.info("Initializing OIG exclusion database...")
     if await load_oig_data_to_memory():
@@ -2975,6 +4602,50 @@ async def startup_event():
     
     # SAM API v4 integration - no local data needed
     logger.info("SAM exclusion checks will use SAM.gov API v4 directly")
+    try:
+        await sam_response_cache.ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Could not create SAM response cache indexes: {e}")
+    
+    # Lookup index for reusing results of unchanged employees and sources
+    try:
+        await db.verification_results.create_index([
+            ("employee_id", 1),
+            ("verification_type", 1),
+            ("employee_fingerprint", 1),
+            ("source_version", 1),
+            ("checked_at", -1)
+        ])
+    except Exception as e:
+        logger.warning(f"Could not create verification result indexes: {e}")
+    
+    # Name index of all employees for monitoring, built in the background
+    index_task = asyncio.create_task(rebuild_employee_name_index())
+    monitoring_tasks.add(index_task)
+    index_task.add_done_callback(monitoring_tasks.discard)
+    
+    # Duplicate detection key index for employee imports
+    await ensure_employee_identity_keys()
+    
+    # A key rotation interrupted by a restart picks up from its checkpoint
+    if PHI_ENCRYPTION_AT_REST:
+        try:
+            await resume_phi_key_rotation()
+        except Exception as e:
+            logger.warning(f"Could not resume PHI key rotation: {e}")
+    
+    try:
+        await db.monitoring_alerts.create_index([("user_id", 1), ("status", 1), ("created_at", -1)])
+    except Exception as e:
+        logger.warning(f"Could not create monitoring alert indexes: {e}")
+    
+    try:
+        await db.upload_sessions.create_index("session_id", unique=True)
+        await db.batch_upload_errors.create_index([("upload_id", 1), ("row", 1)])
+        # Rows of a failed resumable upload are found by upload_id to roll them back
+        await db.employees.create_index("upload_id", sparse=True)
+    except Exception as e:
+        logger.warning(f"Could not create batch upload indexes: {e}")
     
     # Initialize License Verification databases
     logger.info("Initializing License Verification databases...")
@@ -2994,6 +4665,9 @@ async def startup_event():
     else:
         logger.warning("⚠️ Some criminal background databases failed to load - will attempt download on first check")
     
+    # Bulk lane workers for batch verifications
+    verification_scheduler.start(BULK_VERIFICATION_CONCURRENCY)
+    
     # Start background data updates
     start_background_updates()
     
@@ -3007,4 +4681,9 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await verification_scheduler.stop()
+    if audit_logger:
+        await audit_logger.stop()
+    matcher_pool.shutdown()
+    await http_pool.aclose()
     client.close()
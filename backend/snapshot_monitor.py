@@ -0,0 +1,79 @@
+"""
+Exclusion Snapshot Deltas for Health Verify Now
+Diffs each newly loaded exclusion list snapshot against the previous one for continuous monitoring
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import logging
+
+from matching import exclusion_fingerprint
+
+logger = logging.getLogger(__name__)
+
+class SnapshotDeltaStore:
+    """Keeps the record fingerprints of the last monitored snapshot of each source on disk.
+
+    Fingerprint files survive restarts, so a list published while the server was down
+    is still diffed against the snapshot customers were last screened against.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._pending: Dict[str, tuple] = {}
+
+    def _path(self, source: str) -> Path:
+        return self.directory / f"{source}.fingerprints"
+
+    def monitored_version(self, source: str) -> Optional[str]:
+        """Version of the last snapshot diffed for a source"""
+        path = self._path(source)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.readline().strip() or None
+
+    def compute_delta(self, source: str, version: str, records: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """Return records added or changed since the last monitored snapshot.
+
+        Returns None when there is nothing to compare (first snapshot seen, or the
+        same version again). The new snapshot becomes the baseline only on commit(),
+        so an interrupted monitoring run is redone. Blocking; run it in a worker thread.
+        """
+        previous_version = self.monitored_version(source)
+        if previous_version == version:
+            return None
+
+        fingerprints = [exclusion_fingerprint(record) for record in records]
+
+        delta = None
+        if previous_version is not None:
+            with open(self._path(source), 'r', encoding='utf-8') as f:
+                next(f)
+                previous = {line.rstrip('\n') for line in f}
+            delta = [record for record, fingerprint in zip(records, fingerprints) if fingerprint not in previous]
+            logger.info(f"{source} snapshot {previous_version} -> {version}: {len(delta)} added or changed of {len(records)} entries")
+        else:
+            logger.info(f"{source} snapshot {version} recorded as monitoring baseline ({len(records)} entries)")
+
+        self._pending[source] = (version, fingerprints)
+        if delta is None:
+            self.commit(source, version)
+        return delta
+
+    def commit(self, source: str, version: str):
+        """Make a diffed snapshot the baseline for the next delta"""
+        pending = self._pending.get(source)
+        if pending is None or pending[0] != version:
+            return
+        fingerprints = pending[1]
+
+        # Replace atomically so a crash never leaves a half-written baseline
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path(source).with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(version + '\n')
+            f.writelines(fingerprint + '\n' for fingerprint in fingerprints)
+        os.replace(tmp_path, self._path(source))
+        del self._pending[source]
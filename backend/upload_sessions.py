@@ -0,0 +1,194 @@
+"""
+Resumable Upload Sessions for Health Verify Now
+Assembles chunked roster uploads on disk and exposes the verified prefix to the parser
+"""
+
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+# A parser waiting on the next chunk stops after this long and resumes when one arrives
+PREFIX_WAIT_TIMEOUT = 60
+# A session whose parse is waiting for chunks is failed after this long without one
+STALLED_SESSION_TIMEOUT = 3600
+# Threads parsing session prefixes; they block on missing chunks, so they are kept
+# off the default executor
+PARSE_WORKERS = 4
+
+class UploadAborted(Exception):
+    """The upload session was aborted or failed verification"""
+
+class PrefixStalled(Exception):
+    """No chunk arrived in time; the parse can resume from its last row chunk once one does"""
+
+class ChunkedUploadAssembly:
+    """Chunks of one upload session, written in place into a preallocated spool file.
+
+    Chunks may arrive in any order and more than once. The contiguous run of received
+    chunks from the start of the file can be read while later chunks are still missing;
+    readers see end of file only after the session is sealed.
+    """
+
+    def __init__(self, path: str, total_size: int, chunk_size: int, received: Iterable[int] = ()):
+        self.path = path
+        self.total_size = total_size
+        self.chunk_size = chunk_size
+        self.chunk_count = max(1, -(-total_size // chunk_size))
+        self.received = set(received)
+        self.parse_started = False
+        # Progress of a parse that stopped waiting for chunks, for the next one to resume from
+        self.parse_resume: Optional[Dict[str, Any]] = None
+        self._condition = threading.Condition()
+        self._sealed = False
+        self._error: Optional[str] = None
+
+    def chunk_length(self, index: int) -> int:
+        """Expected size of a chunk"""
+        if index < 0 or index >= self.chunk_count:
+            raise ValueError(f"Chunk index must be between 0 and {self.chunk_count - 1}")
+        return min(self.chunk_size, self.total_size - index * self.chunk_size)
+
+    @property
+    def contiguous_bytes(self) -> int:
+        """Length of the readable prefix"""
+        with self._condition:
+            return self._contiguous_bytes()
+
+    def _contiguous_bytes(self) -> int:
+        index = 0
+        while index in self.received:
+            index += 1
+        return min(index * self.chunk_size, self.total_size)
+
+    def missing_chunks(self) -> List[int]:
+        with self._condition:
+            return [index for index in range(self.chunk_count) if index not in self.received]
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing_chunks()
+
+    def allocate(self):
+        """Create the spool file at its final size, keeping chunks already written"""
+        mode = 'r+b' if os.path.exists(self.path) else 'wb'
+        with open(self.path, mode) as f:
+            f.truncate(self.total_size)
+
+    def write_chunk(self, index: int, data: bytes):
+        """Write a verified chunk into place. Blocking; run it in a worker thread."""
+        with open(self.path, 'r+b') as f:
+            f.seek(index * self.chunk_size)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        with self._condition:
+            self.received.add(index)
+            self._condition.notify_all()
+
+    def sha256(self) -> str:
+        """Digest of the assembled file. Blocking; run it in a worker thread."""
+        digest = hashlib.sha256()
+        with open(self.path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def seal(self):
+        """Mark every chunk as verified, letting readers reach end of file"""
+        with self._condition:
+            self._sealed = True
+            self._condition.notify_all()
+
+    def fail(self, reason: str):
+        """Stop readers waiting on this upload"""
+        with self._condition:
+            self._error = reason
+            self._condition.notify_all()
+
+    def wait_readable(self, position: int, timeout: float = PREFIX_WAIT_TIMEOUT) -> int:
+        """Block until bytes past position are readable; returns the readable end (position at EOF)"""
+        with self._condition:
+            while True:
+                if self._error:
+                    raise UploadAborted(self._error)
+                contiguous = self._contiguous_bytes()
+                if contiguous > position or (self._sealed and position >= self.total_size):
+                    return contiguous
+                if not self._condition.wait(timeout):
+                    raise PrefixStalled(f"No chunk received for {timeout} seconds")
+
+    def prefix_reader(self, offset: int = 0) -> io.BufferedReader:
+        """Binary stream from offset that blocks at the end of the received prefix"""
+        return io.BufferedReader(_PrefixReader(self, offset), buffer_size=1024 * 1024)
+
+class _PrefixReader(io.RawIOBase):
+    def __init__(self, assembly: ChunkedUploadAssembly, offset: int = 0):
+        self._assembly = assembly
+        self._file = open(assembly.path, 'rb')
+        self._position = offset
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        readable_end = self._assembly.wait_readable(self._position)
+        length = min(len(buffer), readable_end - self._position)
+        if length <= 0:
+            return 0
+        self._file.seek(self._position)
+        data = self._file.read(length)
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+class UploadSessionRegistry:
+    """Assemblies of the upload sessions receiving chunks in this process"""
+
+    def __init__(self):
+        self._assemblies: Dict[str, ChunkedUploadAssembly] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def get(self, session_id: str) -> Optional[ChunkedUploadAssembly]:
+        with self._lock:
+            return self._assemblies.get(session_id)
+
+    def open(self, session_id: str, path: str, total_size: int, chunk_size: int,
+             received: Iterable[int] = ()) -> ChunkedUploadAssembly:
+        """Register a session's assembly, reusing the one already open"""
+        with self._lock:
+            assembly = self._assemblies.get(session_id)
+            if assembly is None:
+                assembly = ChunkedUploadAssembly(path, total_size, chunk_size, received)
+                self._assemblies[session_id] = assembly
+            return assembly
+
+    def discard(self, session_id: str):
+        with self._lock:
+            self._assemblies.pop(session_id, None)
+
+    def parse_executor(self) -> ThreadPoolExecutor:
+        """Bounded pool for parses that read a session prefix"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="upload-parse")
+            return self._executor
+
+    def stats(self) -> dict:
+        """Open sessions for status endpoints"""
+        with self._lock:
+            return {"open_sessions": len(self._assemblies)}
+
+# Global upload session registry instance
+upload_sessions = UploadSessionRegistry()
@@ -0,0 +1,134 @@
+"""
+Verification Scheduling for Health Verify Now
+Separates interactive checks from bulk re-screens with per-tenant fair queuing of bulk work
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+import logging
+
+from http_pool import current_lane, BULK_LANE, INTERACTIVE_LANE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BULK_CONCURRENCY = 4
+
+class VerificationScheduler:
+    """Runs bulk verification work on a bounded worker pool, round-robin across tenants.
+
+    Interactive checks are not queued: they run on the request's own task in the
+    interactive lane, so a large batch can only ever occupy the bulk workers and the
+    bulk share of each remote source's quota.
+    """
+
+    def __init__(self):
+        self._queues: Dict[str, Deque[Tuple[Callable[[], Awaitable[Any]], asyncio.Future]]] = {}
+        self._tenant_order: Deque[str] = deque()
+        self._work_available: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+        self.bulk_concurrency = 0
+        self.active_bulk = 0
+        self.completed_bulk = 0
+
+    def start(self, bulk_concurrency: int = DEFAULT_BULK_CONCURRENCY):
+        """Start the bulk workers on the running event loop"""
+        if self._workers:
+            return
+        self.bulk_concurrency = max(1, bulk_concurrency)
+        self._work_available = asyncio.Event()
+        if self._queues:
+            self._work_available.set()
+        self._workers = [
+            asyncio.get_running_loop().create_task(self._bulk_worker())
+            for _ in range(self.bulk_concurrency)
+        ]
+        logger.info(f"Verification scheduler started with {self.bulk_concurrency} bulk workers")
+
+    async def stop(self):
+        """Stop the bulk workers and cancel work still queued"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        for queue in self._queues.values():
+            for _, future in queue:
+                future.cancel()
+        self._queues.clear()
+        self._tenant_order.clear()
+
+    def submit_bulk(self, tenant_id: str, work: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """Queue bulk work for a tenant; the returned future resolves with its result"""
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues.get(tenant_id)
+        if queue is None:
+            queue = self._queues[tenant_id] = deque()
+            self._tenant_order.append(tenant_id)
+        queue.append((work, future))
+
+        if not self._workers:
+            self.start()
+        self._work_available.set()
+        return future
+
+    async def run_interactive(self, work: Awaitable[Any]) -> Any:
+        """Run latency-sensitive work in the interactive lane"""
+        token = current_lane.set(INTERACTIVE_LANE)
+        try:
+            return await work
+        finally:
+            current_lane.reset(token)
+
+    def _next_bulk_item(self) -> Optional[Tuple[Callable[[], Awaitable[Any]], asyncio.Future]]:
+        """Take one item from the next tenant in rotation"""
+        while self._tenant_order:
+            tenant_id = self._tenant_order.popleft()
+            queue = self._queues[tenant_id]
+            item = queue.popleft()
+            if queue:
+                self._tenant_order.append(tenant_id)
+            else:
+                del self._queues[tenant_id]
+            if not item[1].cancelled():
+                return item
+        return None
+
+    async def _bulk_worker(self):
+        # Remote calls made from this task are charged to the bulk lane's quota
+        current_lane.set(BULK_LANE)
+        while True:
+            item = self._next_bulk_item()
+            if item is None:
+                self._work_available.clear()
+                await self._work_available.wait()
+                continue
+
+            work, future = item
+            self.active_bulk += 1
+            try:
+                result = await work()
+                if not future.done():
+                    future.set_result(result)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.active_bulk -= 1
+                self.completed_bulk += 1
+
+    def stats(self) -> dict:
+        """Queue depths for status endpoints"""
+        return {
+            "bulk_workers": len(self._workers),
+            "active_bulk": self.active_bulk,
+            "completed_bulk": self.completed_bulk,
+            "queued_bulk": sum(len(queue) for queue in self._queues.values()),
+            "queued_tenants": len(self._queues)
+        }
+
+# Global verification scheduler instance
+verification_scheduler = VerificationScheduler()
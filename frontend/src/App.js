@@ -12,6 +12,9 @@ import BatchUpload from "./components/BatchUpload";
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+// Columns shown in the employee list; other PHI fields are never fetched or decrypted for it
+const EMPLOYEE_LIST_FIELDS = 'first_name,middle_name,last_name,email,ssn,license_number,license_type,license_state';
+
 // Components
 const EmployeeForm = ({ onEmployeeAdded }) => {
   const [formData, setFormData] = useState({
@@ -608,7 +611,9 @@ const MainApp = () => {
 
   const fetchEmployees = async () => {
     try {
-      const response = await axios.get(`${API}/employees`);
+      const response = await axios.get(`${API}/employees`, {
+        params: { fields: EMPLOYEE_LIST_FIELDS }
+      });
       setEmployees(response.data);
     } catch (error) {
       console.error('Error fetching employees:', error);
@@ -1,18 +1,45 @@
-import React, { useState, useCallback } from 'react';
+import React, { useState, useCallback, useEffect, useRef } from 'react';
 import axios from 'axios';
 import { useAuth } from '../AuthContext';
 
+// Larger files use the resumable upload protocol, one checksummed chunk per request
+const CHUNKED_UPLOAD_THRESHOLD = 16 * 1024 * 1024;
+const UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024;
+const CHUNK_ATTEMPTS = 3;
+
+const sha256Hex = async (buffer) => {
+  const digest = await crypto.subtle.digest('SHA-256', buffer);
+  return Array.from(new Uint8Array(digest))
+    .map((byte) => byte.toString(16).padStart(2, '0'))
+    .join('');
+};
+
 const BatchUpload = ({ onUploadComplete }) => {
   const [dragActive, setDragActive] = useState(false);
   const [uploading, setUploading] = useState(false);
   const [uploadStatus, setUploadStatus] = useState(null);
   const [uploadId, setUploadId] = useState(null);
-  const [pollInterval, setPollInterval] = useState(null);
+  const [screenOnImport, setScreenOnImport] = useState(false);
+  const pollIntervalRef = useRef(null);
+  const streamAbortRef = useRef(null);
 
   const { user } = useAuth();
   const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
   const API = `${BACKEND_URL}/api`;
 
+  const stopTracking = () => {
+    if (pollIntervalRef.current) {
+      clearInterval(pollIntervalRef.current);
+      pollIntervalRef.current = null;
+    }
+    if (streamAbortRef.current) {
+      streamAbortRef.current.abort();
+      streamAbortRef.current = null;
+    }
+  };
+
+  useEffect(() => stopTracking, []);
+
   const handleDrag = useCallback((e) => {
     e.preventDefault();
     e.stopPropagation();
@@ -31,7 +58,7 @@ const BatchUpload = ({ onUploadComplete }) => {
     if (e.dataTransfer.files && e.dataTransfer.files[0]) {
       handleFile(e.dataTransfer.files[0]);
     }
-  }, []);
+  }, [screenOnImport]);
 
   const handleFileInput = (e) => {
     if (e.target.files && e.target.files[0]) {
@@ -49,18 +76,29 @@ const BatchUpload = ({ onUploadComplete }) => {
       return;
     }
 
-    // Validate file size (10MB max)
-    if (file.size > 10 * 1024 * 1024) {
-      alert('File size must be less than 10MB');
+    // Validate file size (500MB max, matches the server's MAX_UPLOAD_BYTES default)
+    if (file.size > 500 * 1024 * 1024) {
+      alert('File size must be less than 500MB');
       return;
     }
 
     setUploading(true);
     setUploadStatus(null);
 
+    // Screen each chunk of new employees as soon as it is imported
+    const verificationTypes = screenOnImport ? ['oig', 'sam'] : [];
+
     try {
+      if (file.size > CHUNKED_UPLOAD_THRESHOLD) {
+        await uploadInChunks(file, verificationTypes);
+        return;
+      }
+
       const formData = new FormData();
       formData.append('file', file);
+      if (verificationTypes.length > 0) {
+        formData.append('verification_types', verificationTypes.join(','));
+      }
 
       const response = await axios.post(`${API}/employees/batch-upload`, formData, {
         headers: {
@@ -70,20 +108,112 @@ const BatchUpload = ({ onUploadComplete }) => {
 
       setUploadId(response.data.upload_id);
       
-      // Start polling for status updates
-      const interval = setInterval(() => {
-        pollUploadStatus(response.data.upload_id);
-      }, 2000);
-      
-      setPollInterval(interval);
+      // Follow progress over the event stream, polling if it is unavailable
+      streamUploadStatus(response.data.upload_id);
 
     } catch (error) {
       console.error('Upload error:', error);
+      stopTracking();
       alert('Failed to upload file: ' + (error.response?.data?.detail || error.message));
       setUploading(false);
     }
   };
 
+  const uploadInChunks = async (file, verificationTypes) => {
+    const { data: session } = await axios.post(`${API}/employees/batch-upload/sessions`, {
+      filename: file.name,
+      total_size: file.size,
+      chunk_size: UPLOAD_CHUNK_SIZE,
+      verification_types: verificationTypes,
+    });
+
+    // CSV rows are imported while later chunks are still uploading
+    setUploadId(session.upload_id);
+    streamUploadStatus(session.upload_id);
+
+    for (const index of session.missing_chunks) {
+      const start = index * session.chunk_size;
+      const buffer = await file.slice(start, start + session.chunk_size).arrayBuffer();
+      const checksum = await sha256Hex(buffer);
+
+      for (let attempt = 1; ; attempt++) {
+        try {
+          await axios.put(`${API}/employees/batch-upload/sessions/${session.session_id}/chunks/${index}`, buffer, {
+            headers: {
+              'Content-Type': 'application/octet-stream',
+              'X-Chunk-SHA256': checksum,
+            },
+          });
+          break;
+        } catch (error) {
+          // Only this chunk is resent after a dropped connection
+          if (attempt >= CHUNK_ATTEMPTS || (error.response && error.response.status < 500)) {
+            throw error;
+          }
+          await new Promise((resolve) => setTimeout(resolve, 1000 * attempt));
+        }
+      }
+    }
+
+    await axios.post(`${API}/employees/batch-upload/sessions/${session.session_id}/complete`, {});
+  };
+
+  const streamUploadStatus = async (uploadId) => {
+    const controller = new AbortController();
+    streamAbortRef.current = controller;
+
+    try {
+      const response = await fetch(`${API}/employees/batch-upload/${uploadId}/events`, {
+        headers: { Authorization: axios.defaults.headers.common['Authorization'] },
+        signal: controller.signal,
+      });
+      if (!response.ok || !response.body) {
+        throw new Error(`Progress stream unavailable (${response.status})`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          const message = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          const data = message
+            .split('\n')
+            .filter((line) => line.startsWith('data:'))
+            .map((line) => line.slice(5).trim())
+            .join('');
+          if (!data) continue;
+
+          const event = JSON.parse(data);
+          if (event.status === 'completed' || event.status === 'failed') {
+            // The final status carries the row errors
+            await pollUploadStatus(uploadId);
+            return;
+          }
+          setUploadStatus((previous) => ({ ...previous, ...event }));
+        }
+      }
+      throw new Error('Progress stream closed before the upload finished');
+    } catch (error) {
+      if (controller.signal.aborted) return;
+      console.warn('Progress stream error, falling back to polling:', error);
+      pollIntervalRef.current = setInterval(() => {
+        pollUploadStatus(uploadId);
+      }, 2000);
+    } finally {
+      if (streamAbortRef.current === controller) {
+        streamAbortRef.current = null;
+      }
+    }
+  };
+
   const pollUploadStatus = async (uploadId) => {
     try {
       const response = await axios.get(`${API}/employees/batch-upload/${uploadId}/status`);
@@ -92,8 +222,7 @@ const BatchUpload = ({ onUploadComplete }) => {
       setUploadStatus(status);
 
       if (status.status === 'completed' || status.status === 'failed') {
-        clearInterval(pollInterval);
-        setPollInterval(null);
+        stopTracking();
         setUploading(false);
         
         if (onUploadComplete) {
@@ -102,12 +231,28 @@ const BatchUpload = ({ onUploadComplete }) => {
       }
     } catch (error) {
       console.error('Status polling error:', error);
-      clearInterval(pollInterval);
-      setPollInterval(null);
+      stopTracking();
       setUploading(false);
     }
   };
 
+  const downloadErrors = async () => {
+    try {
+      const response = await axios.get(`${API}/employees/batch-upload/${uploadId}/errors.csv`, {
+        responseType: 'blob',
+      });
+      const url = window.URL.createObjectURL(response.data);
+      const a = document.createElement('a');
+      a.href = url;
+      a.download = 'upload_errors.csv';
+      a.click();
+      window.URL.revokeObjectURL(url);
+    } catch (error) {
+      console.error('Error report download failed:', error);
+      alert('Failed to download error report');
+    }
+  };
+
   const downloadTemplate = () => {
     const csvContent = `first_name,last_name,middle_name,ssn,date_of_birth,email,phone,license_number,license_type,license_state
 John,Doe,Michael,123-45-6789,1980-01-15,john.doe@example.com,555-123-4567,12345,MD,CA
@@ -185,8 +330,18 @@ Jane,Smith,,987-65-4321,1975-05-20,jane.smith@example.com,555-987-6543,67890,RN,
             </label>
             
             <p className="text-sm text-gray-500 mt-2">
-              Supports CSV, Excel (.xlsx, .xls) • Max 10MB
+              Supports CSV, Excel (.xlsx, .xls) • Max 500MB
             </p>
+
+            <label className="flex items-center text-sm text-gray-700 mt-4">
+              <input
+                type="checkbox"
+                checked={screenOnImport}
+                onChange={(e) => setScreenOnImport(e.target.checked)}
+                className="mr-2"
+              />
+              Screen against OIG and SAM exclusions while importing
+            </label>
           </div>
         </div>
       )}
@@ -208,6 +363,11 @@ Jane,Smith,,987-65-4321,1975-05-20,jane.smith@example.com,555-987-6543,67890,RN,
               <p className="text-sm text-gray-600">
                 {uploadStatus.processed_rows} of {uploadStatus.total_rows} processed
               </p>
+              {uploadStatus.total_checks > 0 && (
+                <p className="text-sm text-gray-600">
+                  {uploadStatus.completed_checks} of {uploadStatus.total_checks} checks screened
+                </p>
+              )}
             </div>
           )}
         </div>
@@ -238,11 +398,29 @@ Jane,Smith,,987-65-4321,1975-05-20,jane.smith@example.com,555-987-6543,67890,RN,
             </div>
           </div>
 
+          {uploadStatus.verification_types && uploadStatus.verification_types.length > 0 && (
+            <p className="text-sm text-gray-700 mb-4">
+              Screened {uploadStatus.completed_checks} of {uploadStatus.total_checks} checks
+              ({uploadStatus.verification_types.join(', ').toUpperCase()}):{' '}
+              <span className={uploadStatus.flagged_employees > 0 ? 'text-red-600 font-medium' : 'text-green-600 font-medium'}>
+                {uploadStatus.flagged_employees} employees flagged
+              </span>
+            </p>
+          )}
+
           {uploadStatus.errors && uploadStatus.errors.length > 0 && (
             <div>
-              <h4 className="font-medium text-gray-900 mb-2">
-                Errors ({uploadStatus.errors.length} shown):
-              </h4>
+              <div className="flex justify-between items-center mb-2">
+                <h4 className="font-medium text-gray-900">
+                  Errors ({uploadStatus.errors.length} of {uploadStatus.failed_imports} shown):
+                </h4>
+                <button
+                  onClick={downloadErrors}
+                  className="text-sm text-blue-600 hover:text-blue-800"
+                >
+                  Download all errors (CSV)
+                </button>
+              </div>
               <div className="max-h-40 overflow-y-auto">
                 {uploadStatus.errors.map((error, index) => (
                   <div key={index} className="text-sm text-red-600 mb-1">